@@ -0,0 +1,135 @@
+from fastapi import Depends, Header, HTTPException, Query, Request, status
+import hmac
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from typing import Optional
+from uuid import UUID
+from app.db.session import DBSession, get_db, replicas
+from app.core.cache import user_cache
+from app.core.config import settings
+from app.core.security import decode_token
+from app.crud.user import crud_user
+from app.models import User
+from app.utils.pagination import Cursor, decode_cursor
+
+# Column attributes copied into the user cache
+USER_COLUMNS = tuple(attr.key for attr in inspect(User).column_attrs)
+
+
+def _snapshot(user: User) -> dict:
+    """Plain column values of a user, safe to share between requests."""
+    return {key: getattr(user, key) for key in USER_COLUMNS}
+
+
+def _from_snapshot(snapshot: dict) -> User:
+    """Build a per-request detached User from a cached snapshot.
+
+    The instance is detached rather than transient, so endpoints can still
+    hand it to ``crud_user.update`` and get an UPDATE, not an INSERT.
+    """
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+
+# Methods after which the user's reads stay on the primary for a while
+READ_METHODS = ("GET", "HEAD")
+
+
+async def get_current_user(
+    request: Request,
+    authorization: str = Header(None),
+    db: DBSession = Depends(get_db)
+) -> User:
+    """Get current authenticated user from JWT token.
+    
+    Users making a write request are pinned to the primary database for
+    their next reads (see ``get_read_db``).
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing or invalid authorization header"
+        )
+
+    token = authorization.split(" ")[1]
+    payload = decode_token(token)
+    if not payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+
+    try:
+        user_id = UUID(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+
+    if replicas and request.method not in READ_METHODS:
+        replicas.note_write(user_id)
+
+    snapshot = user_cache.get(user_id)
+    if snapshot is not None:
+        return _from_snapshot(snapshot)
+
+    user = await crud_user.aio.get_by_id(db, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+
+    if not crud_user.is_active(user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is inactive"
+        )
+
+    user_cache.set(user_id, _snapshot(user))
+    return user
+
+
+async def get_read_db(
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+) -> DBSession:
+    """The request's session, reading from a replica when one is usable.
+
+    For read-only endpoints that tolerate REPLICA_MAX_LAG_SECONDS of
+    staleness. Users who wrote recently, and every user while no replica
+    is healthy and caught up, read from the primary.
+    """
+    replica = replicas.choose(current_user.id) if replicas else None
+    if replica is not None:
+        db.info["replica"] = replica.bind_for(db)
+    return db
+
+
+def require_ingest_key(x_api_key: str = Header(None)) -> None:
+    """Authenticate a device (badge reader, kiosk) by its ingestion API key."""
+    if not x_api_key or not any(
+        hmac.compare_digest(x_api_key.encode(), key.encode())
+        for key in settings.INGEST_API_KEYS
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key"
+        )
+
+
+def get_cursor(
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor")
+) -> Optional[Cursor]:
+    """Decode the keyset pagination cursor of a list request."""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
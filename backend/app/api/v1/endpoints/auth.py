@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
 from datetime import timedelta
-from app.db.session import get_db
+from app.db.session import DBSession, get_db, release_connection
 from app.crud.user import crud_user
 from app.core.security import create_access_token, create_refresh_token, decode_token
+from app.core.hashing import HashingOverloaded, password_hasher
 from app.schemas.auth import LoginRequest, RegisterRequest, TokenResponse, RefreshTokenRequest
 from app.schemas.user import UserResponse
 from app.models import User
@@ -11,6 +11,15 @@ from app.models import User
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
 
 
+def hashing_unavailable() -> HTTPException:
+    """Fast 503 returned when the password hashing queue is full."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, please retry",
+        headers={"Retry-After": "1"}
+    )
+
+
 # OPTIONS handlers for CORS preflight
 @router.options("/register")
 async def register_options():
@@ -31,21 +40,28 @@ async def refresh_options():
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(request: RegisterRequest, db: Session = Depends(get_db)):
+async def register(request: RegisterRequest, db: DBSession = Depends(get_db)):
     """Register a new user."""
     # Check if user already exists
-    existing_user = crud_user.get_by_email(db, request.email)
+    existing_user = await crud_user.aio.get_by_email(db, request.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Create new user
-    user = crud_user.create(
+    # Hash in the dedicated pool, then create the user. The hashing queue
+    # is longer than the connection pool: wait without holding a connection
+    await release_connection(db)
+    try:
+        hashed_password = await password_hasher.hash(request.password)
+    except HashingOverloaded:
+        raise hashing_unavailable()
+    
+    user = await crud_user.aio.create(
         db,
         email=request.email,
-        password=request.password,
+        hashed_password=hashed_password,
         full_name=request.full_name
     )
     
@@ -53,21 +69,41 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(request: LoginRequest, db: Session = Depends(get_db)):
+async def login(request: LoginRequest, db: DBSession = Depends(get_db)):
     """Login with email and password."""
-    user = crud_user.authenticate(db, request.email, request.password)
+    user = await crud_user.aio.get_by_email(db, request.email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
+    # No connection is held while bcrypt runs; a rehash checks one out again
+    await release_connection(db)
+    try:
+        valid, new_hash = await password_hasher.verify_and_update(
+            request.password, user.hashed_password
+        )
+    except HashingOverloaded:
+        raise hashing_unavailable()
+    
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password"
+        )
+    
+    # Before any write: a deactivated account is left untouched
     if not crud_user.is_active(user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is inactive"
         )
     
+    # Transparently rehash when BCRYPT_ROUNDS has changed
+    if new_hash:
+        user = await crud_user.aio.update(db, user, hashed_password=new_hash)
+    
     # Create tokens
     access_token = create_access_token(
         data={"sub": str(user.id), "email": user.email}
@@ -84,7 +120,7 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/refresh", response_model=TokenResponse)
-def refresh_token(request: RefreshTokenRequest, db: Session = Depends(get_db)):
+async def refresh_token(request: RefreshTokenRequest, db: DBSession = Depends(get_db)):
     """Refresh access token using refresh token."""
     payload = decode_token(request.refresh_token)
     if not payload or payload.get("type") != "refresh":
@@ -94,7 +130,7 @@ def refresh_token(request: RefreshTokenRequest, db: Session = Depends(get_db)):
         )
     
     user_id = payload.get("sub")
-    user = crud_user.get_by_id(db, user_id)
+    user = await crud_user.aio.get_by_id(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
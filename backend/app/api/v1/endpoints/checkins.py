@@ -1,68 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from starlette.concurrency import run_in_threadpool
+from datetime import date, datetime, timedelta
+from typing import Optional
 from uuid import UUID
-from app.db.session import get_db
-from app.core.security import decode_token
-from app.crud.user import crud_user
+from app.db.session import DBSession, get_db
+from app.api.deps import get_current_user, get_cursor, get_read_db, require_ingest_key
+from app.core.cache import invalidate_team_caches, team_analytics_cache, team_presence_cache
+from app.core.config import settings
+from app.crud.base import stream_partitions
 from app.crud.checkin import crud_checkin
+from app.crud.daily_stats import crud_daily_stats
 from app.crud.mood import crud_mood
-from app.schemas.checkin import CheckinCreate, CheckoutCreate, CheckinResponse, DailyStatsResponse, MoodResponse
+from app.crud.presence import start_of_today
+from app.crud.team import crud_team
+from app.db.archive import archive_enabled, archived_checkins, archived_moods, export_rows
+from app.schemas.checkin import (
+    CheckinCreate,
+    CheckoutCreate,
+    CheckinResponse,
+    CheckinEvent,
+    DailyStatsResponse,
+    IngestResponse,
+    MoodResponse,
+    SummaryResponse,
+)
 from app.models import User
-from fastapi import Header, Depends
+from app.utils.export import MEDIA_TYPES, PARTITION_SIZE, encode_rows, export_filename, with_archived
+from app.utils.ingest import ingest_format, iter_records, validate_batch
+from app.utils.pagination import Cursor, paginate
+from app.utils.serialization import json_response
 
 router = APIRouter(prefix="/api/v1/checkins", tags=["checkins"])
 
+# Longest range served by /summary, in days
+MAX_SUMMARY_DAYS = 366
+# Per-row errors listed in a bulk ingestion report
+MAX_REPORTED_ERRORS = 1000
+
+checkin_events = TypeAdapter(list[CheckinEvent])
+checkin_list = TypeAdapter(list[CheckinResponse])
+mood_list = TypeAdapter(list[MoodResponse])
 
-def get_current_user(
-    authorization: str = Header(None),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token."""
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing or invalid authorization header"
-        )
-    
-    token = authorization.split(" ")[1]
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
-        )
-    
-    user_id = payload.get("sub")
-    user = crud_user.get_by_id(db, user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    return user
+
+async def invalidate_user_teams(db: DBSession, user_id: UUID) -> None:
+    """Drop cached team rosters/analytics that include this user's data."""
+    invalidate_team_caches(await crud_team.aio.get_user_team_ids(db, user_id))
 
 
 @router.post("/check-in", response_model=CheckinResponse, status_code=status.HTTP_201_CREATED)
-def check_in(
+async def check_in(
     request: CheckinCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
-    # สร้าง Mood ก่อน (ถ้ามี)
-    mood = None
-    if request.mood:
-        mood = crud_mood.create(
-            db,
-            user_id=current_user.id,
-            mood_level=request.mood.mood_level,
-            emotion=request.mood.emotion,
-            notes=request.mood.notes,
-            # ไม่ส่ง checkin_id
-        )
-
-    # สร้าง Checkin พร้อม mood_id
-    checkin = crud_checkin.create_checkin(
+    """Create a check-in record, with its mood in the same transaction."""
+    checkin = await crud_checkin.aio.create_checkin(
         db,
         user_id=current_user.id,
         location_latitude=request.location_latitude,
@@ -70,89 +64,240 @@ def check_in(
         location_name=request.location_name,
         notes=request.notes,
         goal_id=request.goal_id,
-        mood_id=mood.id if mood else None   # ← เพิ่ม
+        mood=request.mood
     )
-
-    if mood:
-        checkin.mood = mood
-
+    
+    await invalidate_user_teams(db, current_user.id)
     return checkin
 
 
 @router.post("/check-out", response_model=CheckinResponse, status_code=status.HTTP_201_CREATED)
-def check_out(
+async def check_out(
     request: CheckoutCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
-    """Create a check-out record."""
-    checkout = crud_checkin.create_checkout(
+    """Create a check-out record, with its mood in the same transaction."""
+    checkout = await crud_checkin.aio.create_checkout(
         db,
         user_id=current_user.id,
-        notes=request.notes
+        notes=request.notes,
+        mood=request.mood
     )
     
-    # Add mood if provided
-    if request.mood:
-        mood = crud_mood.create(
-            db,
-            user_id=current_user.id,
-            mood_level=request.mood.mood_level,
-            emotion=request.mood.emotion,
-            notes=request.mood.notes,
-            checkin_id=checkout.id
+    await invalidate_user_teams(db, current_user.id)
+    return checkout
+
+
+@router.post("/bulk", response_model=IngestResponse, dependencies=[Depends(require_ingest_key)])
+async def bulk_ingest(
+    request: Request,
+    db: DBSession = Depends(get_db)
+):
+    """Ingest buffered check-in/out events from devices (NDJSON or CSV).
+    
+    The body is parsed as it streams in and written in batches of
+    INGEST_BATCH_SIZE events, one transaction per batch. Rows that fail
+    validation are reported by line number and do not block the others.
+    """
+    fmt = ingest_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send application/x-ndjson or text/csv"
         )
-        checkout.mood = mood
     
-    return checkout
+    received = inserted = 0
+    errors = []
+    batch = []
+    
+    async def flush():
+        nonlocal inserted
+        events, invalid = validate_batch(checkin_events, batch)
+        errors.extend(invalid)
+        if events:
+            count, rejected = await crud_checkin.aio.bulk_create(db, events)
+            inserted += count
+            errors.extend(rejected)
+        batch.clear()
+    
+    async for line, record, error in iter_records(request.stream(), fmt):
+        received += 1
+        if error:
+            errors.append((line, error))
+            continue
+        batch.append((line, record))
+        if len(batch) >= settings.INGEST_BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+    
+    if inserted:
+        # Events can touch any number of teams
+        team_presence_cache.clear()
+        team_analytics_cache.clear()
+    
+    errors.sort()
+    return {
+        "received": received,
+        "inserted": inserted,
+        "rejected": len(errors),
+        "errors": [
+            {"line": line, "error": error} for line, error in errors[:MAX_REPORTED_ERRORS]
+        ],
+        "errors_truncated": len(errors) > MAX_REPORTED_ERRORS
+    }
 
 
 @router.get("/today", response_model=DailyStatsResponse)
-def get_today_stats(
+async def get_today_stats(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
-    """Get today's check-in statistics."""
-    today_checkins = crud_checkin.get_user_checkins_today(db, current_user.id)
-    moods = crud_mood.get_user_moods(db, current_user.id, skip=0, limit=10)
+    """Get today's check-in statistics (from the daily rollup)."""
+    stats = await crud_daily_stats.aio.get(db, current_user.id, datetime.utcnow().date())
+    moods = await crud_mood.aio.get_user_moods(db, current_user.id, skip=0, limit=10)
+    is_checked_in = await crud_checkin.aio.is_checked_in(db, current_user.id)
     
-    total_duration = 0
-    is_checked_in = False
+    if not stats:
+        return {
+            "total_checkins_today": 0,
+            "is_checked_in": is_checked_in,
+            "total_duration_minutes": 0,
+            "mood_history": moods
+        }
     
-    for checkin in today_checkins:
-        if checkin.status == "checked_in":
-            is_checked_in = True
-        if checkin.duration_minutes:
-            total_duration += checkin.duration_minutes
+    total_checkins = stats.checkin_count + stats.checkout_count
+    latest_checkin = None
+    if total_checkins:
+        latest_checkin = await crud_checkin.aio.get_latest_checkin(
+            db, current_user.id, since=start_of_today()
+        )
     
     return {
-        "total_checkins_today": len(today_checkins),
+        "total_checkins_today": total_checkins,
         "is_checked_in": is_checked_in,
-        "latest_checkin": today_checkins[0] if today_checkins else None,
-        "total_duration_minutes": total_duration,
+        "latest_checkin": latest_checkin,
+        "total_duration_minutes": stats.worked_minutes,
+        "first_in": stats.first_in,
+        "last_out": stats.last_out,
+        "mood_min": stats.mood_min,
+        "mood_avg": stats.mood_avg,
+        "mood_max": stats.mood_max,
         "mood_history": moods
     }
 
 
+@router.get("/summary", response_model=SummaryResponse)
+async def get_summary(
+    start: Optional[date] = Query(None, description="First day (UTC), default 29 days before end"),
+    end: Optional[date] = Query(None, description="Last day (UTC), default today"),
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_read_db)
+):
+    """Get per-day totals and moods for a date range (from the daily rollup)."""
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=29)
+    if start > end or (end - start).days >= MAX_SUMMARY_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range must be 1 to {MAX_SUMMARY_DAYS} days"
+        )
+    
+    days = await crud_daily_stats.aio.get_range(db, current_user.id, start, end)
+    mood_count = sum(day.mood_count for day in days)
+    
+    return {
+        "start": start,
+        "end": end,
+        "days_worked": sum(1 for day in days if day.checkin_count),
+        "total_checkins": sum(day.checkin_count + day.checkout_count for day in days),
+        "total_duration_minutes": sum(day.worked_minutes for day in days),
+        "mood_avg": sum(day.mood_sum for day in days) / mood_count if mood_count else None,
+        "days": days
+    }
+
+
 @router.get("", response_model=list[CheckinResponse])
-def get_checkins(
+async def get_checkins(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Cursor = Depends(get_cursor),
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_read_db)
+):
+    """Get user's check-in history with pagination.
+    
+    Pass the X-Next-Cursor header of a page as ``cursor`` to fetch the next one.
+    Cursor pages continue into the archived months; offset pages stop at them.
+    """
+    checkins = await crud_checkin.aio.get_user_checkins(
+        db, current_user.id, skip=skip, limit=limit + 1, cursor=cursor
+    )
+    if len(checkins) <= limit and not skip and archive_enabled():
+        # Live history ran out: the rest of the page comes from the archive
+        after = (checkins[-1].timestamp, checkins[-1].id) if checkins else cursor
+        checkins += await run_in_threadpool(
+            archived_checkins, current_user.id, limit + 1 - len(checkins), after,
+            {checkin.id for checkin in checkins}
+        )
+    return json_response(checkin_list, paginate(response, checkins, limit, "timestamp"), response)
+
+
+@router.get("/moods", response_model=list[MoodResponse])
+async def get_moods(
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Cursor = Depends(get_cursor),
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_read_db)
+):
+    """Get user's mood history with cursor pagination."""
+    moods = await crud_mood.aio.get_user_moods(
+        db, current_user.id, limit=limit + 1, cursor=cursor
+    )
+    if len(moods) <= limit and archive_enabled():
+        after = (moods[-1].created_at, moods[-1].id) if moods else cursor
+        moods += await run_in_threadpool(
+            archived_moods, current_user.id, limit + 1 - len(moods), after, {mood.id for mood in moods}
+        )
+    return json_response(mood_list, paginate(response, moods, limit, "created_at"), response)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_checkins(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    start: Optional[date] = Query(None, description="First day (UTC)"),
+    end: Optional[date] = Query(None, description="Last day (UTC)"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_read_db)
 ):
-    """Get user's check-in history with pagination."""
-    return crud_checkin.get_user_checkins(db, current_user.id, skip=skip, limit=limit)
+    """Stream the user's check-in history as CSV or NDJSON, archived months included."""
+    stmt = crud_checkin.export_query(user_id=current_user.id, start=start, end=end)
+    columns = list(stmt.selected_columns.keys())
+    partitions = stream_partitions(db, stmt, PARTITION_SIZE)
+    if archive_enabled():
+        partitions = with_archived(
+            partitions, [current_user], lambda user: export_rows(user, columns, start, end)
+        )
+    return StreamingResponse(
+        encode_rows(partitions, columns, format),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_filename("checkins", format, start, end)}"'
+        }
+    )
 
 
 @router.get("/{checkin_id}", response_model=CheckinResponse)
-def get_checkin(
+async def get_checkin(
     checkin_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Get a specific check-in record."""
-    checkin = crud_checkin.get_by_id(db, checkin_id)
+    checkin = await crud_checkin.aio.get_by_id(db, checkin_id)
     if not checkin or checkin.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -162,21 +307,21 @@ def get_checkin(
 
 
 @router.patch("/{checkin_id}", response_model=CheckinResponse)
-def update_checkin(
+async def update_checkin(
     checkin_id: UUID,
     request: CheckinCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Update a check-in record."""
-    checkin = crud_checkin.get_by_id(db, checkin_id)
+    checkin = await crud_checkin.aio.get_by_id(db, checkin_id)
     if not checkin or checkin.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Check-in not found"
         )
     
-    updated = crud_checkin.update(
+    updated = await crud_checkin.aio.update(
         db,
         checkin,
         notes=request.notes,
@@ -187,18 +332,20 @@ def update_checkin(
 
 
 @router.delete("/{checkin_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_checkin(
+async def delete_checkin(
     checkin_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Delete a check-in record."""
-    checkin = crud_checkin.get_by_id(db, checkin_id)
+    # Only ownership is checked before deleting; the mood is not needed
+    checkin = await crud_checkin.aio.get_by_id(db, checkin_id, options=())
     if not checkin or checkin.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Check-in not found"
         )
     
-    crud_checkin.delete(db, checkin)
+    await crud_checkin.aio.delete(db, checkin)
+    await invalidate_user_teams(db, current_user.id)
     return None
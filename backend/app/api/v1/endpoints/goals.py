@@ -1,54 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from pydantic import TypeAdapter
 from uuid import UUID
-from app.db.session import get_db
-from app.core.security import decode_token
-from app.crud.user import crud_user
+from app.db.session import DBSession, get_db
+from app.api.deps import get_current_user, get_cursor, get_read_db
 from app.crud.goal import crud_goal
 from app.schemas.checkin import GoalCreate, GoalResponse, GoalUpdate
 from app.models import User
+from app.utils.pagination import Cursor, paginate
+from app.utils.serialization import json_response
 
 router = APIRouter(prefix="/api/v1/goals", tags=["goals"])
 
-
-def get_current_user(
-    authorization: str = Header(None),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token."""
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing or invalid authorization header"
-        )
-    
-    token = authorization.split(" ")[1]
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
-        )
-    
-    user_id = payload.get("sub")
-    user = crud_user.get_by_id(db, user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    return user
+goal_list = TypeAdapter(list[GoalResponse])
 
 
 @router.post("", response_model=GoalResponse, status_code=status.HTTP_201_CREATED)
-def create_goal(
+async def create_goal(
     request: GoalCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Create a new goal."""
-    goal = crud_goal.create(
+    goal = await crud_goal.aio.create(
         db,
         user_id=current_user.id,
         title=request.title,
@@ -60,30 +33,39 @@ def create_goal(
 
 
 @router.get("", response_model=list[GoalResponse])
-def get_goals(
+async def get_goals(
+    response: Response,
     completed: bool = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Cursor = Depends(get_cursor),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_read_db)
 ):
-    """Get user's goals."""
-    if completed is not None:
-        goals = crud_goal.get_user_goals_by_completed(db, current_user.id, completed)
-    else:
-        goals = crud_goal.get_user_goals(db, current_user.id, skip=skip, limit=limit)
+    """Get user's goals.
+    
+    Pass the X-Next-Cursor header of a page as ``cursor`` to fetch the next one.
+    """
+    goals = await crud_goal.aio.get_user_goals(
+        db,
+        current_user.id,
+        skip=skip,
+        limit=limit + 1,
+        cursor=cursor,
+        is_completed=completed
+    )
     
-    return goals
+    return json_response(goal_list, paginate(response, goals, limit, "created_at"), response)
 
 
 @router.get("/{goal_id}", response_model=GoalResponse)
-def get_goal(
+async def get_goal(
     goal_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Get a specific goal."""
-    goal = crud_goal.get_by_id(db, goal_id)
+    goal = await crud_goal.aio.get_by_id(db, goal_id)
     if not goal or goal.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -94,21 +76,21 @@ def get_goal(
 
 
 @router.patch("/{goal_id}", response_model=GoalResponse)
-def update_goal(
+async def update_goal(
     goal_id: UUID,
     request: GoalUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Update a goal."""
-    goal = crud_goal.get_by_id(db, goal_id)
+    goal = await crud_goal.aio.get_by_id(db, goal_id)
     if not goal or goal.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Goal not found"
         )
     
-    updated = crud_goal.update(
+    updated = await crud_goal.aio.update(
         db,
         goal,
         title=request.title,
@@ -121,18 +103,18 @@ def update_goal(
 
 
 @router.delete("/{goal_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_goal(
+async def delete_goal(
     goal_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Delete a goal."""
-    goal = crud_goal.get_by_id(db, goal_id)
+    goal = await crud_goal.aio.get_by_id(db, goal_id)
     if not goal or goal.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Goal not found"
         )
     
-    crud_goal.delete(db, goal)
+    await crud_goal.aio.delete(db, goal)
     return None
@@ -1,55 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from starlette.concurrency import run_in_threadpool
+from datetime import date, datetime, timedelta
+from typing import Optional
 from uuid import UUID
-from app.db.session import get_db
-from app.core.security import decode_token
-from app.crud.user import crud_user
+from app.db.session import DBSession, get_db
+from app.api.deps import get_current_user, get_cursor, get_read_db
+from app.core.cache import invalidate_team_caches, team_analytics_cache, team_presence_cache
+from app.crud.analytics import GRANULARITIES, crud_analytics
+from app.crud.base import stream_partitions
 from app.crud.team import crud_team
 from app.crud.checkin import crud_checkin
-from app.schemas.team import TeamCreate, TeamResponse, TeamDetailResponse, TeamJoinRequest
+from app.db.archive import archive_enabled, archived_users, export_rows
+from app.schemas.team import (
+    TeamCreate,
+    TeamResponse,
+    TeamDetailResponse,
+    TeamJoinRequest,
+    TeamMemberProfileResponse,
+    TeamPresenceResponse,
+    TeamAnalyticsResponse,
+)
 from app.models import User
+from app.utils.export import MEDIA_TYPES, PARTITION_SIZE, encode_rows, export_filename, with_archived
+from app.utils.pagination import Cursor, paginate
+from app.utils.serialization import json_response
 
 router = APIRouter(prefix="/api/v1/teams", tags=["teams"])
 
+# Longest range served by /analytics, in days
+MAX_ANALYTICS_DAYS = 366
+# Distinct (range, granularity) results cached per team
+MAX_ANALYTICS_RESULTS_PER_TEAM = 32
 
-def get_current_user(
-    authorization: str = Header(None),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token."""
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing or invalid authorization header"
-        )
-    
-    token = authorization.split(" ")[1]
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
-        )
-    
-    user_id = payload.get("sub")
-    user = crud_user.get_by_id(db, user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    return user
+team_list = TypeAdapter(list[TeamResponse])
+roster_list = TypeAdapter(list[TeamMemberProfileResponse])
 
 
 @router.post("", response_model=TeamResponse, status_code=status.HTTP_201_CREATED)
-def create_team(
+async def create_team(
     request: TeamCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Create a new team."""
-    team = crud_team.create(
+    team = await crud_team.aio.create(
         db,
         name=request.name,
         description=request.description,
@@ -60,22 +56,22 @@ def create_team(
 
 
 @router.get("", response_model=list[TeamResponse])
-def get_user_teams(
+async def get_user_teams(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_read_db)
 ):
     """Get all teams for the current user."""
-    return crud_team.get_user_teams(db, current_user.id)
+    return json_response(team_list, await crud_team.aio.get_user_teams(db, current_user.id))
 
 
 @router.get("/{team_id}", response_model=TeamDetailResponse)
-def get_team(
+async def get_team(
     team_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_read_db)
 ):
     """Get team details with member list."""
-    team = crud_team.get_by_id(db, team_id)
+    team = await crud_team.aio.get_by_id(db, team_id)
     if not team:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -83,13 +79,13 @@ def get_team(
         )
     
     # Check if user is a member
-    if not crud_team.is_member(db, team_id, current_user.id):
+    if not await crud_team.aio.is_member(db, team_id, current_user.id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not a member of this team"
         )
     
-    members = crud_team.get_team_members(db, team_id)
+    members = await crud_team.aio.get_team_members(db, team_id)
     
     return {
         **team.__dict__,
@@ -97,14 +93,148 @@ def get_team(
     }
 
 
+@router.get("/{team_id}/members", response_model=list[TeamMemberProfileResponse])
+async def get_team_roster(
+    team_id: UUID,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Cursor = Depends(get_cursor),
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_read_db)
+):
+    """Team members with their profiles and roles, oldest membership first.
+    
+    Pass the X-Next-Cursor header of a page as ``cursor`` to fetch the next one.
+    """
+    # Unknown teams have no members, so this also covers a missing team
+    if not await crud_team.aio.is_member(db, team_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not a member of this team"
+        )
+    
+    members = await crud_team.aio.get_team_roster(db, team_id, limit=limit + 1, cursor=cursor)
+    return json_response(roster_list, paginate(response, members, limit, "joined_at"), response)
+
+
+@router.get("/{team_id}/presence", response_model=TeamPresenceResponse)
+async def get_team_presence(
+    team_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_read_db)
+):
+    """Live roster: every member's status, last check-in and latest mood."""
+    # Unknown teams have no members, so this also covers a missing team
+    if not await crud_team.aio.is_member(db, team_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not a member of this team"
+        )
+    
+    roster = team_presence_cache.get(team_id)
+    if roster is None:
+        members = await crud_team.aio.get_team_presence(db, team_id)
+        roster = TeamPresenceResponse(
+            team_id=team_id,
+            checked_in_count=sum(m["status"] == "checked_in" for m in members),
+            members=members
+        )
+        team_presence_cache.set(team_id, roster)
+    
+    return roster
+
+
+@router.get("/{team_id}/analytics", response_model=TeamAnalyticsResponse)
+async def get_team_analytics(
+    team_id: UUID,
+    start: Optional[date] = Query(None, description="First day (UTC), default 12 weeks before end"),
+    end: Optional[date] = Query(None, description="Last day (UTC), default today"),
+    granularity: str = Query("week", pattern=f"^({'|'.join(GRANULARITIES)})$"),
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_read_db)
+):
+    """Worked hours, attendance rate and mood per member and week/month.
+    
+    Results are cached per worker. A check-in clears the cache of the worker
+    that handled it only, so the others may answer with results up to
+    TEAM_ANALYTICS_CACHE_TTL_SECONDS old.
+    """
+    if not await crud_team.aio.is_member(db, team_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not a member of this team"
+        )
+    
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(weeks=12) + timedelta(days=1)
+    if start > end or (end - start).days >= MAX_ANALYTICS_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range must be 1 to {MAX_ANALYTICS_DAYS} days"
+        )
+    
+    # One cache entry per team, so a check-in can drop all of its results
+    results = team_analytics_cache.get(team_id)
+    if results is None:
+        results = {}
+        team_analytics_cache.set(team_id, results)
+    key = (start, end, granularity)
+    analytics = results.get(key)
+    if analytics is None:
+        analytics = await crud_analytics.aio.get_team_analytics(
+            db, team_id, start, end, granularity
+        )
+        if len(results) >= MAX_ANALYTICS_RESULTS_PER_TEAM:
+            results.clear()
+        results[key] = analytics
+    
+    return analytics
+
+
+@router.get("/{team_id}/export", response_class=StreamingResponse)
+async def export_team_checkins(
+    team_id: UUID,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    start: Optional[date] = Query(None, description="First day (UTC)"),
+    end: Optional[date] = Query(None, description="Last day (UTC)"),
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_read_db)
+):
+    """Stream the check-in history of every team member (owners and managers only)."""
+    role = await crud_team.aio.get_member_role(db, team_id, current_user.id)
+    if role not in ("owner", "manager"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only team owners and managers can export team history"
+        )
+    
+    stmt = crud_checkin.export_query(team_id=team_id, start=start, end=end)
+    columns = list(stmt.selected_columns.keys())
+    partitions = stream_partitions(db, stmt, PARTITION_SIZE)
+    if archive_enabled():
+        members = await crud_team.aio.get_member_profiles(db, team_id)
+        archived = await run_in_threadpool(archived_users, [member.id for member in members], start, end)
+        partitions = with_archived(
+            partitions,
+            [member for member in members if member.id in archived],
+            lambda user: export_rows(user, columns, start, end)
+        )
+    filename = export_filename(f"team-{team_id}-checkins", format, start, end)
+    return StreamingResponse(
+        encode_rows(partitions, columns, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.post("/join", response_model=TeamResponse)
-def join_team(
+async def join_team(
     request: TeamJoinRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Join a team using team code."""
-    team = crud_team.get_by_code(db, request.team_code)
+    team = await crud_team.aio.get_by_code(db, request.team_code)
     if not team:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -112,27 +242,28 @@ def join_team(
         )
     
     # Check if already a member
-    if crud_team.is_member(db, team.id, current_user.id):
+    if await crud_team.aio.is_member(db, team.id, current_user.id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You are already a member of this team"
         )
     
     # Add user to team
-    crud_team.add_member(db, team.id, current_user.id, role="member")
+    await crud_team.aio.add_member(db, team.id, current_user.id, role="member")
+    invalidate_team_caches([team.id])
     
     return team
 
 
 @router.post("/{team_id}/members/{user_id}/remove", status_code=status.HTTP_204_NO_CONTENT)
-def remove_team_member(
+async def remove_team_member(
     team_id: UUID,
     user_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Remove a member from a team (team owners only)."""
-    team = crud_team.get_by_id(db, team_id)
+    team = await crud_team.aio.get_by_id(db, team_id)
     if not team:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -140,12 +271,13 @@ def remove_team_member(
         )
     
     # Check if requester is owner
-    requester_role = crud_team.get_member_role(db, team_id, current_user.id)
+    requester_role = await crud_team.aio.get_member_role(db, team_id, current_user.id)
     if requester_role != "owner":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only team owners can remove members"
         )
     
-    crud_team.remove_member(db, team_id, user_id)
+    await crud_team.aio.remove_member(db, team_id, user_id)
+    invalidate_team_caches([team_id])
     return None
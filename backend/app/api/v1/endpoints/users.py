@@ -1,8 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from uuid import UUID
-from app.db.session import get_db
-from app.core.security import decode_token
+from app.db.session import DBSession, get_db
+from app.api.deps import get_current_user
 from app.crud.user import crud_user
 from app.schemas.user import UserResponse, UserUpdate
 from app.models import User
@@ -10,38 +9,8 @@ from app.models import User
 router = APIRouter(prefix="/api/v1/users", tags=["users"])
 
 
-def get_current_user(
-    authorization: str = Header(None),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token."""
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing or invalid authorization header"
-        )
-    
-    token = authorization.split(" ")[1]
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
-        )
-    
-    user_id = payload.get("sub")
-    user = crud_user.get_by_id(db, user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    return user
-
-
 @router.get("/me", response_model=UserResponse)
-def get_current_user_profile(
+async def get_current_user_profile(
     current_user: User = Depends(get_current_user)
 ):
     """Get current user's profile."""
@@ -49,13 +18,13 @@ def get_current_user_profile(
 
 
 @router.put("/me", response_model=UserResponse)
-def update_user_profile(
+async def update_user_profile(
     request: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Update current user's profile."""
-    updated_user = crud_user.update(
+    updated_user = await crud_user.aio.update(
         db,
         current_user,
         full_name=request.full_name,
@@ -67,13 +36,13 @@ def update_user_profile(
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(
+async def get_user(
     user_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Get a user's public profile (only if in same team)."""
-    user = crud_user.get_by_id(db, user_id)
+    user = await crud_user.aio.get_by_id(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,24 @@
+"""Maintenance commands.
+
+Run from the backend directory:
+
+    python -m app.commands <command> [options]
+"""
+import argparse
+from app.commands import archive, daily_stats, partitions, presence, seed
+
+COMMANDS = (presence, daily_stats, partitions, archive, seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.commands", description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for module in COMMANDS:
+        module.register(subparsers)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from app.db.archive import archive_enabled, archive_month
+from app.db.partitions import add_months, month_start
+from app.db.session import SessionLocal
+from app.models import Checkin, Mood
+
+
+def archive_history(args) -> None:
+    """Move every month that ended more than --older-than-days ago to ARCHIVE_DIR."""
+    if not archive_enabled():
+        print("ARCHIVE_DIR is not set: nothing to do")
+        return
+    cutoff = datetime.utcnow().date() - timedelta(days=args.older_than_days)
+    with SessionLocal() as db:
+        oldest = [
+            db.scalar(select(func.min(Checkin.timestamp))),
+            db.scalar(select(func.min(Mood.created_at))),
+        ]
+    oldest = [ts for ts in oldest if ts is not None]
+    if not oldest:
+        print("No history to archive")
+        return
+
+    month = month_start(min(oldest).date())
+    total = 0
+    # One transaction per month: its rows leave the database only once
+    # its segments are on disk
+    while add_months(month, 1) <= cutoff:
+        with SessionLocal() as db:
+            archived = archive_month(db, month)
+            db.commit()
+        if any(archived.values()):
+            print(f"{month:%Y-%m}: {archived['checkins']} check-in(s), {archived['moods']} mood(s)")
+        total += sum(archived.values())
+        month = add_months(month, 1)
+    print(f"Archived {total} row(s) from months ending by {cutoff}")
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "archive-history", help="move closed months of checkins and moods to ARCHIVE_DIR"
+    )
+    parser.add_argument(
+        "--older-than-days", type=int, default=90, help="archive months that ended at least this long ago"
+    )
+    parser.set_defaults(func=archive_history)
@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, select
+from app.crud.daily_stats import crud_daily_stats
+from app.db.archive import archive_boundary
+from app.db.session import SessionLocal
+from app.models import Checkin, Mood
+
+
+def _chunks(start: date, end: date, days: int) -> list[tuple[date, date]]:
+    """Split an inclusive day range into consecutive inclusive chunks."""
+    chunks = []
+    while start <= end:
+        chunk_end = min(start + timedelta(days=days - 1), end)
+        chunks.append((start, chunk_end))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def _rebuild_chunk(chunk: tuple[date, date]) -> int:
+    with SessionLocal() as db:
+        rows = crud_daily_stats.rebuild(db, *chunk)
+        db.commit()
+    return rows
+
+
+def backfill_daily_stats(args) -> None:
+    """Rebuild daily_user_stats in parallel, one transaction per chunk of days."""
+    start, end = args.start, args.end or datetime.utcnow().date()
+    if start is None:
+        with SessionLocal() as db:
+            oldest = [
+                db.scalar(select(func.min(Checkin.timestamp))),
+                db.scalar(select(func.min(Mood.created_at))),
+            ]
+        oldest = [ts for ts in oldest if ts is not None]
+        if not oldest:
+            print("No history to backfill")
+            return
+        start = min(oldest).date()
+    # Archived days have no rows left to rebuild from
+    boundary = archive_boundary()
+    if boundary is not None and start < boundary:
+        print(f"Keeping the rollups of archived days before {boundary}")
+        start = boundary
+
+    chunks = _chunks(start, end, args.chunk_days)
+    total = 0
+    # Chunks cover disjoint days, so they never touch the same rollup rows
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for (chunk_start, chunk_end), rows in zip(chunks, pool.map(_rebuild_chunk, chunks)):
+            total += rows
+            print(f"{chunk_start}..{chunk_end}: {rows} row(s)")
+    print(f"Backfilled {total} daily stats row(s) from {start} to {end}")
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "backfill-daily-stats", help="rebuild the daily_user_stats rollup from history"
+    )
+    parser.add_argument("--start", type=date.fromisoformat, help="first day, YYYY-MM-DD (default: oldest row)")
+    parser.add_argument("--end", type=date.fromisoformat, help="last day, YYYY-MM-DD (default: today)")
+    parser.add_argument("--chunk-days", type=int, default=31, help="days rebuilt per transaction")
+    parser.add_argument("--workers", type=int, default=4, help="chunks rebuilt concurrently")
+    parser.set_defaults(func=backfill_daily_stats)
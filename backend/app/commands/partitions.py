@@ -0,0 +1,35 @@
+from datetime import date
+from app.core.config import settings
+from app.db.partitions import ensure_partitions, is_partitioned, retire_partitions
+from app.db.session import SessionLocal
+
+
+def partition_checkins(args) -> None:
+    """Create upcoming monthly partitions of checkins and retire old ones."""
+    with SessionLocal() as db:
+        if not is_partitioned(db):
+            print("checkins is not partitioned (PostgreSQL only): nothing to do")
+            return
+        created = ensure_partitions(db, args.months_ahead, args.since)
+        db.commit()
+        for month in created:
+            print(f"Created partition for {month:%Y-%m}")
+        if args.detach_before:
+            retired = retire_partitions(db, args.detach_before, drop=args.drop)
+            db.commit()
+            for month in retired:
+                print(f"{'Dropped' if args.drop else 'Detached'} partition for {month:%Y-%m}")
+    print(f"Partitions in place through {args.months_ahead} month(s) ahead")
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "partition-checkins", help="create upcoming monthly checkins partitions, retire old ones"
+    )
+    parser.add_argument(
+        "--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD, help="future months to create"
+    )
+    parser.add_argument("--since", type=date.fromisoformat, help="also create months from YYYY-MM-DD (default: this month)")
+    parser.add_argument("--detach-before", type=date.fromisoformat, help="detach months that end by YYYY-MM-DD")
+    parser.add_argument("--drop", action="store_true", help="drop detached partitions instead of keeping them")
+    parser.set_defaults(func=partition_checkins)
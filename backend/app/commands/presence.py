@@ -0,0 +1,19 @@
+from uuid import UUID
+from app.crud.presence import crud_presence
+from app.db.session import SessionLocal
+
+
+def rebuild_presence(args) -> None:
+    """Recompute user_presence from the checkins history."""
+    with SessionLocal() as db:
+        rows = crud_presence.rebuild(db, args.user_id)
+        db.commit()
+    print(f"Rebuilt presence for {rows} user(s)")
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "rebuild-presence", help="recompute user presence from check-in history"
+    )
+    parser.add_argument("--user-id", type=UUID, help="only rebuild this user")
+    parser.set_defaults(func=rebuild_presence)
@@ -0,0 +1,295 @@
+import csv
+import io
+import random
+import time
+import uuid
+from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.pool import NullPool
+from app.commands.daily_stats import backfill_daily_stats
+from app.core.config import settings
+from app.core.security import hash_password
+from app.crud.presence import crud_presence
+from app.db.partitions import ensure_partitions, is_partitioned
+from app.db.session import SessionLocal, engine
+from app.models import Checkin, Goal, Mood, Team, TeamMember, User
+
+FIRST_NAMES = (
+    "Ada", "Ben", "Chloe", "Dev", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jonas",
+    "Kemi", "Liam", "Maya", "Nils", "Olga", "Priya", "Quinn", "Rosa", "Sam", "Tariq",
+)
+LAST_NAMES = (
+    "Adams", "Berg", "Costa", "Dubois", "Eze", "Fischer", "Garcia", "Haddad", "Ito", "Jensen",
+    "Kowalski", "Lopez", "Moreau", "Nakamura", "Okafor", "Petrov", "Rossi", "Silva", "Tanaka", "Weber",
+)
+TIMEZONES = ("UTC", "Europe/London", "Europe/Berlin", "America/New_York", "America/Los_Angeles", "Asia/Tokyo")
+LOCATIONS = (("Office", 52.5200, 13.4050), ("Home", None, None), ("Cafe", 52.5163, 13.3777))
+EMOTIONS = ("stressed", "tired", "neutral", "focused", "happy")  # roughly by mood level
+GOAL_TITLES = (
+    "Ship the release", "Review open PRs", "Write the design doc", "Fix flaky tests",
+    "Plan the sprint", "Pair on onboarding", "Clean up the backlog", "Prepare the demo",
+)
+CODE_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+# Engine of a loader process, created by _init_worker
+_worker_engine = None
+
+
+def _rng(seed: int, *keys) -> random.Random:
+    """Independent, reproducible random stream for ``keys`` under ``seed``."""
+    return random.Random(":".join(map(str, (seed, *keys))))
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _plan_org(args, start: date, hashed_password: str) -> tuple[list, list, list]:
+    """Users, teams (power-law sizes) and memberships."""
+    rng = _rng(args.seed, "org")
+    origin = datetime.combine(start, datetime.min.time())
+    users = []
+    for i in range(args.users):
+        created_at = origin - timedelta(days=rng.randrange(30), seconds=rng.randrange(86400))
+        users.append({
+            "id": _uuid(rng),
+            "email": f"user{i}@{args.email_domain}",
+            "hashed_password": hashed_password,
+            "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "avatar_url": None,
+            "timezone": rng.choice(TIMEZONES),
+            "is_active": rng.random() >= 0.02,
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+
+    teams, members, codes = [], [], set()
+    period = max(args.days - 1, 1)
+    for t in range(args.teams):
+        # Pareto tail: most teams are small, a few are very large
+        size = min(int(args.min_team_size * rng.paretovariate(args.team_size_alpha)), args.max_team_size, args.users)
+        team_members = rng.sample(range(args.users), size)
+        code = "".join(rng.choices(CODE_CHARS, k=6))
+        while code in codes:
+            code = "".join(rng.choices(CODE_CHARS, k=6))
+        codes.add(code)
+        created_at = origin + timedelta(days=rng.randrange(period // 4 + 1))
+        team_id = _uuid(rng)
+        teams.append({
+            "id": team_id,
+            "name": f"Team {t}",
+            "code": code,
+            "description": None,
+            "created_by": users[team_members[0]]["id"],
+            "is_active": True,
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+        for rank, index in enumerate(team_members):
+            members.append({
+                "id": _uuid(rng),
+                "user_id": users[index]["id"],
+                "team_id": team_id,
+                "role": "owner" if rank == 0 else "manager" if rng.random() < 0.1 else "member",
+                "joined_at": created_at if rank == 0 else created_at + timedelta(
+                    days=rng.randrange(period - period // 4 + 1), seconds=rng.randrange(86400)
+                ),
+            })
+    return users, teams, members
+
+
+def _user_history(seed: int, index: int, user_id: uuid.UUID, start: date, end: date) -> tuple[list, list, list]:
+    """Moods, goals and paired check-in/check-out rows of one user.
+
+    Every day is closed with a check-out except, for about half of the
+    users, the last one, which stays open.
+    """
+    rng = _rng(seed, "history", index)
+    attendance = rng.uniform(0.8, 0.97)
+    arrival = rng.uniform(7.5, 10.0)  # mean check-in hour, UTC
+    baseline = rng.uniform(2.5, 4.5)  # mean mood level
+    location = rng.choices(LOCATIONS, weights=(6, 3, 1))[0]
+    leave_open = rng.random() < 0.5
+
+    moods, goals, checkins = [], [], []
+    day = start
+    while day <= end:
+        workday = day.weekday() < 5
+        if rng.random() < (attendance if workday else 0.03):
+            checked_in = datetime.combine(day, datetime.min.time()) + timedelta(
+                hours=min(max(rng.gauss(arrival, 0.75), 5.0), 13.0), seconds=rng.randrange(60)
+            )
+            if rng.random() < 0.2:
+                created_at = checked_in - timedelta(minutes=rng.randrange(5, 30))
+                goals.append({
+                    "id": _uuid(rng),
+                    "user_id": user_id,
+                    "title": rng.choice(GOAL_TITLES),
+                    "description": None,
+                    "is_completed": rng.random() < (0.7 if (end - day).days > 7 else 0.2),
+                    "priority": rng.choices(("high", "medium", "low"), weights=(2, 5, 3))[0],
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                })
+            mood_id = None
+            if rng.random() < 0.6:
+                level = min(max(round(rng.gauss(baseline, 0.8)), 1), 5)
+                mood_id = _uuid(rng)
+                moods.append({
+                    "id": mood_id,
+                    "user_id": user_id,
+                    "mood_level": level,
+                    "emotion": EMOTIONS[level - 1] if rng.random() < 0.7 else rng.choice(EMOTIONS),
+                    "notes": None,
+                    "created_at": checked_in,
+                })
+            goal_id = rng.choice(goals[-5:])["id"] if goals and rng.random() < 0.3 else None
+            name, latitude, longitude = location if rng.random() < 0.8 else rng.choice(LOCATIONS)
+            checkins.append({
+                "id": _uuid(rng),
+                "user_id": user_id,
+                "status": "checked_in",
+                "timestamp": checked_in,
+                "location_latitude": latitude,
+                "location_longitude": longitude,
+                "location_name": name,
+                "notes": None,
+                "duration_minutes": None,
+                "created_at": checked_in,
+                "updated_at": checked_in,
+                "mood_id": mood_id,
+                "goal_id": goal_id,
+            })
+            if day < end or not leave_open:
+                minutes = max(int(rng.gauss(480, 60)), 30)
+                checked_out = checked_in + timedelta(minutes=minutes)
+                checkins.append({
+                    "id": _uuid(rng),
+                    "user_id": user_id,
+                    "status": "checked_out",
+                    "timestamp": checked_out,
+                    "location_latitude": latitude,
+                    "location_longitude": longitude,
+                    "location_name": name,
+                    "notes": None,
+                    "duration_minutes": minutes,
+                    "created_at": checked_out,
+                    "updated_at": checked_out,
+                    "mood_id": None,
+                    "goal_id": None,
+                })
+        day += timedelta(days=1)
+    return moods, goals, checkins
+
+
+def _bulk_insert(connection, table, rows: list[dict]) -> None:
+    """COPY ``rows`` into ``table`` on psycopg2, multi-row INSERT elsewhere.
+
+    Every row must have the same keys, in the same order.
+    """
+    if not rows:
+        return
+    if connection.dialect.driver != "psycopg2":
+        connection.execute(insert(table), rows)
+        return
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(row.values() for row in rows)  # None is written as NULL
+    buffer.seek(0)
+    with connection.connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(rows[0])}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+
+
+def _init_worker() -> None:
+    global _worker_engine
+    # Connections inherited from the parent must not be reused here
+    engine.dispose(close=False)
+    _worker_engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+
+
+def _load_shard(task: tuple) -> tuple[int, int, int]:
+    """Generate and load the history of a shard of users, in one transaction."""
+    seed, start, end, users = task
+    moods, goals, checkins = [], [], []
+    for index, user_id in users:
+        user_moods, user_goals, user_checkins = _user_history(seed, index, user_id, start, end)
+        moods += user_moods
+        goals += user_goals
+        checkins += user_checkins
+    with _worker_engine.begin() as connection:
+        _bulk_insert(connection, Mood.__table__, moods)
+        _bulk_insert(connection, Goal.__table__, goals)
+        _bulk_insert(connection, Checkin.__table__, checkins)
+    return len(checkins), len(moods), len(goals)
+
+
+def seed_data(args) -> None:
+    """Generate a deterministic organization and its history, then the rollups."""
+    end = args.end or datetime.utcnow().date()
+    start = end - timedelta(days=args.days - 1)
+    workers = args.workers
+    if engine.dialect.name == "sqlite" and workers > 1:
+        print("SQLite allows one writer at a time: loading with 1 worker")
+        workers = 1
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        if db.scalar(select(User.id).where(User.email == f"user0@{args.email_domain}")) is not None:
+            raise SystemExit(f"Users @{args.email_domain} already exist: pick another --email-domain")
+        if is_partitioned(db):
+            # History must land in monthly partitions, not the default one
+            ensure_partitions(db, 3, since=start)
+            db.commit()
+    users, teams, members = _plan_org(args, start, hash_password(args.password))
+    with engine.begin() as connection:
+        _bulk_insert(connection, User.__table__, users)
+        _bulk_insert(connection, Team.__table__, teams)
+        _bulk_insert(connection, TeamMember.__table__, members)
+    print(f"Loaded {len(users)} user(s), {len(teams)} team(s), {len(members)} membership(s)")
+
+    shards = [
+        (args.seed, start, end, [(i, users[i]["id"]) for i in range(first, min(first + args.shard_users, len(users)))])
+        for first in range(0, len(users), args.shard_users)
+    ]
+    totals = [0, 0, 0]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for shard, counts in zip(shards, pool.map(_load_shard, shards)):
+            totals = [total + count for total, count in zip(totals, counts)]
+            print(f"users {shard[3][0][0]}..{shard[3][-1][0]}: {counts[0]} check-in(s)")
+    elapsed = time.perf_counter() - started
+    print(
+        f"Loaded {totals[0]} check-in(s), {totals[1]} mood(s), {totals[2]} goal(s)"
+        f" from {start} to {end} in {elapsed:.1f}s ({sum(totals) / elapsed:.0f} rows/s)"
+    )
+
+    with SessionLocal() as db:
+        rows = crud_presence.rebuild(db)
+        db.commit()
+    print(f"Rebuilt presence for {rows} user(s)")
+    backfill_daily_stats(Namespace(start=start, end=end, chunk_days=31, workers=workers))
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("ANALYZE"))
+        print("Analyzed")
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "seed-data", help="generate a synthetic organization for scale testing"
+    )
+    parser.add_argument("--users", type=int, default=1000, help="users to create")
+    parser.add_argument("--teams", type=int, default=100, help="teams to create")
+    parser.add_argument("--days", type=int, default=365, help="days of history per user")
+    parser.add_argument("--end", type=date.fromisoformat, help="last day of history, YYYY-MM-DD (default: today)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed; same seed and --end, same data")
+    parser.add_argument("--min-team-size", type=int, default=3, help="smallest team")
+    parser.add_argument("--max-team-size", type=int, default=1000, help="largest team")
+    parser.add_argument("--team-size-alpha", type=float, default=1.2, help="Pareto shape of team sizes")
+    parser.add_argument("--email-domain", default="seed.example.com", help="domain of the generated emails")
+    parser.add_argument("--password", default="password123", help="password of every generated user")
+    parser.add_argument("--shard-users", type=int, default=50, help="users generated per transaction")
+    parser.add_argument("--workers", type=int, default=4, help="loader processes")
+    parser.set_defaults(func=seed_data)
@@ -0,0 +1,102 @@
+import asyncio
+from collections import deque
+from time import perf_counter
+from app.core.metrics import AdmissionMetrics, admission_metrics
+
+# Weight of the latest request in a class's moving average service time
+SERVICE_TIME_WEIGHT = 0.2
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed instead of queued."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Overloaded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class RouteLimiter:
+    """Concurrency limit and bounded FIFO wait queue of one route class.
+
+    At most ``concurrency`` requests are served at once. Up to ``queue_size``
+    more wait for a slot, for at most ``max_wait`` seconds. A request is
+    shed straight away when the queue is full, or when the wait expected
+    from the queue length and the class's average service time already
+    exceeds ``max_wait``. Only the event loop touches a limiter, so it
+    needs no lock.
+    """
+
+    def __init__(self, name: str, concurrency: int, queue_size: int, max_wait: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.active = 0
+        self.service_time = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+        self.metrics = admission_metrics[name] = AdmissionMetrics()
+        self.metrics.limiter = self
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def expected_wait(self, position: int) -> float:
+        """Seconds until the request at ``position`` in the queue gets a slot."""
+        return position * self.service_time / self.concurrency
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting in line if needed; raises ``Overloaded`` if shed."""
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            self.metrics.observe(0.0)
+            return
+
+        position = len(self._waiters) + 1
+        expected = self.expected_wait(position)
+        if position > self.queue_size or expected > self.max_wait:
+            self.metrics.shed += 1
+            raise Overloaded(expected)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = perf_counter()
+        try:
+            # Returns normally once release() has handed this request a slot
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.metrics.shed += 1
+            raise Overloaded(self.expected_wait(len(self._waiters)))
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        self.metrics.observe(perf_counter() - started)
+
+    def release(self, seconds: float) -> None:
+        """Give the slot back after ``seconds`` of service; the next in line takes it."""
+        self.service_time += SERVICE_TIME_WEIGHT * (seconds - self.service_time)
+        self._hand_over()
+
+    def _hand_over(self) -> None:
+        """Pass a slot on to the next request in line, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        """Leave the queue without being served.
+
+        A request timed out or cancelled right after ``release()`` handed
+        it a slot passes that slot on, so it is not lost.
+        """
+        if waiter.done() and not waiter.cancelled():
+            self._hand_over()
+            return
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass  # already popped by release()
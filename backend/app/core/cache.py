@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+from app.core.config import settings
+
+
+class TTLCache:
+    """Bounded in-process LRU cache whose entries expire after a TTL.
+
+    Safe to share between the event loop and threadpool workers. Each
+    gunicorn worker has its own copy, so invalidation is per process and the
+    TTL bounds how long another worker can serve a stale entry.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Invalidate a single entry."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Invalidate every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Column snapshots of active users, keyed by the JWT "sub" (user id)
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+# Team live rosters, keyed by team id; kept short so the board stays live
+team_presence_cache = TTLCache(
+    maxsize=settings.TEAM_PRESENCE_CACHE_MAX_SIZE,
+    ttl=settings.TEAM_PRESENCE_CACHE_TTL_SECONDS
+)
+
+# Team analytics results, keyed by team id; each entry maps
+# (start, end, granularity) to a result so a team is invalidated at once.
+# Only the worker that handles a check-in clears it, so the TTL is as short
+# as the roster's to bound what the other workers serve
+team_analytics_cache = TTLCache(
+    maxsize=settings.TEAM_ANALYTICS_CACHE_MAX_SIZE,
+    ttl=settings.TEAM_ANALYTICS_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_team_caches(team_ids) -> None:
+    """Drop the cached roster and analytics of teams whose data changed."""
+    for team_id in team_ids:
+        team_presence_cache.pop(team_id)
+        team_analytics_cache.pop(team_id)
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from app.core.config import settings
+from app.core.security import hash_password, verify_and_update_password
+
+
+class HashingOverloaded(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+def _timed(fn, *args):
+    """Run fn in a pool process and report when it started."""
+    return time.monotonic(), fn(*args)
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated process pool with admission control.
+
+    At most ``workers`` hashes run at once and at most ``queue_size`` more
+    wait for a free process; anything beyond that is rejected immediately
+    with ``HashingOverloaded`` instead of tying up a request thread.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.workers + self.queue_size:
+                self.rejected += 1
+                raise HashingOverloaded("Password hashing queue is full")
+            self._pending += 1
+
+        submitted = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            started, result = await loop.run_in_executor(
+                self._get_pool(), _timed, fn, *args
+            )
+        except BrokenProcessPool:
+            with self._lock:
+                self._pool = None
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+        wait = max(0.0, started - submitted)
+        with self._lock:
+            self.completed += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+        return result
+
+    async def hash(self, password: str) -> str:
+        """Hash a password off the event loop."""
+        return await self._run(hash_password, password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> tuple[bool, Optional[str]]:
+        """Verify a password; also returns a new hash if it needs rehashing."""
+        return await self._run(verify_and_update_password, password, hashed_password)
+
+    def stats(self) -> dict:
+        """Queue depth and wait-time metrics."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self._pending,
+                "queue_depth": max(0, self._pending - self.workers),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_seconds_avg": (
+                    self.wait_seconds_total / self.completed if self.completed else 0.0
+                ),
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
@@ -0,0 +1,428 @@
+import asyncio
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Optional
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool, QueuePool
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+
+# Histogram bucket upper bounds; +Inf is implicit
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+QUEUE_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Layout of one request series: a flat list of counters
+_LATENCY_SUM = len(LATENCY_BUCKETS) + 1
+_SIZE = _LATENCY_SUM + 1
+_SIZE_SUM = _SIZE + len(SIZE_BUCKETS) + 1
+_SERIES_LENGTH = _SIZE_SUM + 1
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+class RequestMetrics:
+    """Per-process HTTP request metrics, recorded by ``MetricsMiddleware``.
+
+    Only the event loop writes here, so recording a request is a dict
+    lookup and a few list increments, without a lock. Each (method, route,
+    status) series is one flat list: latency bucket counts, latency sum,
+    response size bucket counts, response size sum.
+    """
+
+    def __init__(self):
+        self.series: dict[tuple, list] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status: int, seconds: float, size: int) -> None:
+        key = (method, route, status)
+        values = self.series.get(key)
+        if values is None:
+            values = self.series[key] = [0] * _SERIES_LENGTH
+        values[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        values[_LATENCY_SUM] += seconds
+        values[_SIZE + bisect_left(SIZE_BUCKETS, size)] += 1
+        values[_SIZE_SUM] += size
+
+
+class PoolMetrics:
+    """Checkout counters of one engine's connection pool.
+
+    Checkouts happen on threadpool workers as well as on the event loop,
+    hence the lock. The counters outlive pool re-creation (``dispose``).
+    ``waiting`` counts checkouts in progress: queued for a connection or
+    opening one. ``in_use`` stands in for the pool's own count on pools
+    that keep none (NullPool).
+    """
+
+    def __init__(self):
+        self.pool: Optional[Pool] = None
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait = [0] * (len(POOL_WAIT_BUCKETS) + 1)
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.waiting = 0
+        self.in_use = 0
+        self._lock = threading.Lock()
+
+    def start_wait(self) -> None:
+        with self._lock:
+            self.waiting += 1
+
+    def observe(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.in_use += not timed_out
+            self.wait[bisect_left(POOL_WAIT_BUCKETS, seconds)] += 1
+            self.wait_sum += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def abandon_wait(self) -> None:
+        """A checkout failed for another reason than a timeout (e.g. connect error)."""
+        with self._lock:
+            self.waiting -= 1
+
+    def checked_in(self) -> None:
+        with self._lock:
+            self.in_use -= 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait": list(self.wait),
+                "wait_sum": self.wait_sum,
+                "wait_max": self.wait_max,
+            }
+            waiting, in_use = self.waiting, self.in_use
+        pool = self.pool
+        if isinstance(pool, QueuePool):
+            counters.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                waiting=waiting,
+            )
+        elif pool is not None:
+            counters.update(size=0, checked_out=in_use, checked_in=0, overflow=0, waiting=waiting)
+        return counters
+
+
+class AdmissionMetrics:
+    """Admission counters of one route class, recorded by its ``RouteLimiter``.
+
+    Like ``RequestMetrics`` it is only written from the event loop. The
+    in-flight and queued gauges are read from the limiter itself.
+    """
+
+    def __init__(self):
+        self.limiter = None
+        self.admitted = 0
+        self.shed = 0
+        self.wait = [0] * (len(QUEUE_WAIT_BUCKETS) + 1)
+        self.wait_sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.admitted += 1
+        self.wait[bisect_left(QUEUE_WAIT_BUCKETS, seconds)] += 1
+        self.wait_sum += seconds
+
+    def snapshot(self) -> dict:
+        counters = {
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "wait": list(self.wait),
+            "wait_sum": self.wait_sum,
+        }
+        limiter = self.limiter
+        if limiter is not None:
+            counters.update(in_flight=limiter.active, queued=limiter.queued)
+        return counters
+
+
+request_metrics = RequestMetrics()
+# By engine: "sync" and, when DATABASE_ASYNC is on, "async"
+pool_metrics: dict[str, PoolMetrics] = {}
+# By route class, when admission control is on
+admission_metrics: dict[str, AdmissionMetrics] = {}
+
+
+def timed_pool(base: type, name: str) -> type:
+    """Subclass of a pool class (QueuePool, NullPool) that records checkouts as ``name``.
+
+    The wait covers everything a checkout blocks on: the queue when the
+    pool is exhausted, opening a connection when it is not, and the
+    pre-ping. It is measured around ``connect`` because QueuePool's
+    ``_do_get`` may call itself.
+    """
+    metrics = pool_metrics[name] = PoolMetrics()
+
+    class TimedPool(base):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            metrics.pool = self
+
+        def connect(self):
+            started = time.perf_counter()
+            metrics.start_wait()
+            try:
+                connection = super().connect()
+            except exc.TimeoutError:
+                metrics.observe(time.perf_counter() - started, timed_out=True)
+                raise
+            except BaseException:
+                metrics.abandon_wait()
+                raise
+            metrics.observe(time.perf_counter() - started)
+            return connection
+
+        def _do_return_conn(self, record):
+            metrics.checked_in()
+            super()._do_return_conn(record)
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+def pool_stats() -> dict:
+    """Live state of this process's connection pools, for the readiness check."""
+    stats = {}
+    for name, metrics in pool_metrics.items():
+        counters = metrics.snapshot()
+        checkouts = counters["checkouts"]
+        stats[name] = {
+            **{gauge: counters[gauge] for gauge in ("size", "checked_out", "checked_in", "overflow", "waiting")
+               if gauge in counters},
+            "checkouts": checkouts,
+            "timeouts": counters["timeouts"],
+            "wait_seconds_avg": counters["wait_sum"] / checkouts if checkouts else 0.0,
+            "wait_seconds_max": counters["wait_max"],
+        }
+    return stats
+
+
+def snapshot() -> dict:
+    """Current metrics of this process. Call it from the event loop."""
+    return {
+        "pid": os.getpid(),
+        "in_flight": request_metrics.in_flight,
+        "requests": [[*key, list(values)] for key, values in request_metrics.series.items()],
+        "pools": {name: metrics.snapshot() for name, metrics in pool_metrics.items()},
+        "admission": {name: metrics.snapshot() for name, metrics in admission_metrics.items()},
+    }
+
+
+# Multi-worker aggregation
+#
+# Each gunicorn worker only sees its own requests. With METRICS_DIR set,
+# every worker writes its snapshot to METRICS_DIR/<pid>.json every
+# METRICS_FLUSH_SECONDS, and whichever worker serves /metrics merges all
+# of them. Counters of workers that have exited are kept, so totals never
+# go backwards; gauges only come from workers that flushed recently.
+
+
+def _snapshot_path(pid: int) -> str:
+    return os.path.join(settings.METRICS_DIR, f"{pid}.json")
+
+
+def write_snapshot(data: dict) -> None:
+    """Atomically replace this worker's snapshot file."""
+    path = _snapshot_path(data["pid"])
+    partial = f"{path}.tmp"
+    with open(partial, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(partial, path)
+
+
+def read_snapshots(own: dict) -> list[tuple[dict, bool]]:
+    """Every worker's snapshot, with whether it is live (flushed recently)."""
+    stale_before = time.time() - 3 * settings.METRICS_FLUSH_SECONDS
+    snapshots = [(own, True)]
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, "*.json")):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            live = os.path.getmtime(path) >= stale_before
+        except (OSError, ValueError):
+            continue  # removed or being replaced
+        if data.get("pid") != own["pid"]:
+            snapshots.append((data, live))
+    return snapshots
+
+
+async def flush_periodically() -> None:
+    """Write this worker's snapshot every METRICS_FLUSH_SECONDS, until cancelled."""
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    try:
+        while True:
+            await run_in_threadpool(write_snapshot, snapshot())
+            await asyncio.sleep(settings.METRICS_FLUSH_SECONDS)
+    finally:
+        write_snapshot(snapshot())
+
+
+# Prometheus text exposition format
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _histogram(
+    lines: list,
+    name: str,
+    series: list[tuple[str, list, float]],
+    buckets: tuple
+) -> None:
+    """Append the bucket/sum/count samples of ``(labels, counts, sum)`` series."""
+    bounds = [repr(float(bound)) for bound in buckets] + ["+Inf"]
+    for labels, counts, total in series:
+        cumulative = 0
+        prefix = f"{labels}," if labels else ""
+        for bound, count in zip(bounds, counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {total}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+
+
+def render(snapshots: list[tuple[dict, bool]]) -> str:
+    """Merge worker snapshots into one Prometheus text exposition."""
+    requests: dict[tuple, list] = {}
+    pools: dict[str, dict] = {}
+    admission: dict[str, dict] = {}
+    in_flight = 0
+    for data, live in snapshots:
+        if live:
+            in_flight += data["in_flight"]
+        for method, route, status, values in data["requests"]:
+            merged = requests.get((method, route, status))
+            if merged is None:
+                requests[(method, route, status)] = list(values)
+            else:
+                for i, value in enumerate(values):
+                    merged[i] += value
+        for name, counters in data["pools"].items():
+            merged = pools.setdefault(name, {
+                "checkouts": 0, "timeouts": 0, "wait": [0] * len(counters["wait"]), "wait_sum": 0.0,
+            })
+            merged["checkouts"] += counters["checkouts"]
+            merged["timeouts"] += counters["timeouts"]
+            merged["wait_sum"] += counters["wait_sum"]
+            merged["wait"] = [a + b for a, b in zip(merged["wait"], counters["wait"])]
+            if live and "size" in counters:
+                for gauge in ("size", "checked_out", "checked_in", "overflow", "waiting"):
+                    merged[gauge] = merged.get(gauge, 0) + counters.get(gauge, 0)
+        for name, counters in data.get("admission", {}).items():
+            merged = admission.setdefault(name, {
+                "admitted": 0, "shed": 0, "wait": [0] * len(counters["wait"]), "wait_sum": 0.0,
+            })
+            merged["admitted"] += counters["admitted"]
+            merged["shed"] += counters["shed"]
+            merged["wait_sum"] += counters["wait_sum"]
+            merged["wait"] = [a + b for a, b in zip(merged["wait"], counters["wait"])]
+            if live and "in_flight" in counters:
+                for gauge in ("in_flight", "queued"):
+                    merged[gauge] = merged.get(gauge, 0) + counters[gauge]
+
+    ordered = sorted(requests.items())
+    lines = [
+        "# HELP http_requests_in_flight Requests being served.",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {in_flight}",
+        "# HELP http_request_duration_seconds Time to serve a request, by route template.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    _histogram(lines, "http_request_duration_seconds", [
+        (_labels(method=method, route=route, status=status), values[:_LATENCY_SUM], values[_LATENCY_SUM])
+        for (method, route, status), values in ordered
+    ], LATENCY_BUCKETS)
+    lines += [
+        "# HELP http_response_size_bytes Response body size, by route template.",
+        "# TYPE http_response_size_bytes histogram",
+    ]
+    _histogram(lines, "http_response_size_bytes", [
+        (_labels(method=method, route=route, status=status), values[_SIZE:_SIZE_SUM], values[_SIZE_SUM])
+        for (method, route, status), values in ordered
+    ], SIZE_BUCKETS)
+
+    if pools:
+        lines += [
+            "# HELP db_pool_checkouts_total Connections checked out of the pool.",
+            "# TYPE db_pool_checkouts_total counter",
+        ]
+        lines += [f'db_pool_checkouts_total{{pool="{name}"}} {p["checkouts"]}' for name, p in pools.items()]
+        lines += [
+            "# HELP db_pool_checkout_timeouts_total Checkouts that gave up waiting for a connection.",
+            "# TYPE db_pool_checkout_timeouts_total counter",
+        ]
+        lines += [f'db_pool_checkout_timeouts_total{{pool="{name}"}} {p["timeouts"]}' for name, p in pools.items()]
+        lines += [
+            "# HELP db_pool_checkout_wait_seconds Time blocked checking a connection out.",
+            "# TYPE db_pool_checkout_wait_seconds histogram",
+        ]
+        _histogram(lines, "db_pool_checkout_wait_seconds", [
+            (f'pool="{name}"', p["wait"], p["wait_sum"]) for name, p in pools.items()
+        ], POOL_WAIT_BUCKETS)
+        for gauge, help_text in (
+            ("size", "Configured pool size, summed over workers."),
+            ("checked_out", "Connections in use."),
+            ("checked_in", "Idle connections held by the pool."),
+            ("overflow", "Connections open beyond the pool size."),
+            ("waiting", "Checkouts waiting for a connection, queued or connecting."),
+        ):
+            lines += [f"# HELP db_pool_{gauge} {help_text}", f"# TYPE db_pool_{gauge} gauge"]
+            lines += [
+                f'db_pool_{gauge}{{pool="{name}"}} {p[gauge]}'
+                for name, p in pools.items() if gauge in p
+            ]
+
+    if admission:
+        lines += [
+            "# HELP admission_requests_total Requests admitted or shed, by route class.",
+            "# TYPE admission_requests_total counter",
+        ]
+        for name, a in admission.items():
+            lines.append(f'admission_requests_total{{class="{name}",outcome="admitted"}} {a["admitted"]}')
+            lines.append(f'admission_requests_total{{class="{name}",outcome="shed"}} {a["shed"]}')
+        lines += [
+            "# HELP admission_queue_wait_seconds Time admitted requests waited for a slot.",
+            "# TYPE admission_queue_wait_seconds histogram",
+        ]
+        _histogram(lines, "admission_queue_wait_seconds", [
+            (f'class="{name}"', a["wait"], a["wait_sum"]) for name, a in admission.items()
+        ], QUEUE_WAIT_BUCKETS)
+        for gauge, help_text in (
+            ("in_flight", "Admitted requests being served."),
+            ("queued", "Requests waiting for a slot."),
+        ):
+            lines += [f"# HELP admission_{gauge} {help_text}", f"# TYPE admission_{gauge} gauge"]
+            lines += [
+                f'admission_{gauge}{{class="{name}"}} {a[gauge]}'
+                for name, a in admission.items() if gauge in a
+            ]
+    lines.append("")
+    return "\n".join(lines)
+
+
+async def collect() -> str:
+    """Metrics of this worker, or of every worker when METRICS_DIR is set."""
+    own = snapshot()
+    if not settings.METRICS_DIR:
+        return render([(own, True)])
+    await run_in_threadpool(write_snapshot, own)
+    return render(await run_in_threadpool(read_snapshots, own))
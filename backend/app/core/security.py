@@ -1,11 +1,22 @@
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.cache import TTLCache
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing; hashes at any other cost factor are flagged for rehash
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
+# Verified token payloads, keyed by token digest and expiring at the token's exp
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
 
 
 def hash_password(password: str) -> str:
@@ -18,6 +29,13 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """Verify a password and return a new hash if the stored one is outdated."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -49,8 +67,8 @@ def create_refresh_token(data: dict) -> str:
     return encoded_jwt
 
 
-def decode_token(token: str) -> Optional[dict]:
-    """Decode and validate a JWT token."""
+def verify_token(token: str) -> Optional[dict]:
+    """Decode a JWT token and verify its signature and claims."""
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -58,3 +76,31 @@ def decode_token(token: str) -> Optional[dict]:
         return payload
     except JWTError:
         return None
+
+
+def decode_token(token: str) -> Optional[dict]:
+    """Decode and validate a JWT token.
+
+    Verified payloads are cached by token digest until the token's ``exp``,
+    so a client replaying the same token skips the signature check.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        if payload["exp"] > time.time():
+            return dict(payload)
+        token_cache.pop(key)
+
+    payload = verify_token(token)
+    if payload is None:
+        return None
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        # jose compares exp against whole seconds; be exact so the cached
+        # and uncached paths agree on when a token stops being valid
+        remaining = exp - time.time()
+        if remaining <= 0:
+            return None
+        token_cache.set(key, dict(payload), ttl=remaining)
+    return payload
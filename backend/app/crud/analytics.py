@@ -0,0 +1,189 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import Date, DateTime, and_, case, cast, extract, func, select
+from datetime import date, timedelta
+from app.models import DailyUserStats, TeamMember, User
+from app.crud.base import CRUDBase
+from uuid import UUID
+
+GRANULARITIES = ("week", "month")
+
+
+def _period_start(db: Session, day, granularity: str):
+    """SQL expression truncating a DATE column to the start of its week/month.
+
+    Weeks start on Monday, as with PostgreSQL's ``date_trunc('week', ...)``.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return cast(func.date_trunc(granularity, cast(day, DateTime)), Date)
+    if dialect == "sqlite":
+        modifiers = ("-6 days", "weekday 1") if granularity == "week" else ("start of month",)
+        return func.date(day, *modifiers, type_=Date)
+    raise NotImplementedError(f"Analytics are not supported on '{dialect}'")
+
+
+def _is_weekday(db: Session, day):
+    """SQL condition: a DATE column falls on Monday-Friday."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return extract("isodow", day) < 6
+    if dialect == "sqlite":
+        return func.strftime("%w", day).notin_(("0", "6"))
+    raise NotImplementedError(f"Analytics are not supported on '{dialect}'")
+
+
+def _period_end(period: date, granularity: str) -> date:
+    """Last day of the week/month starting at ``period``."""
+    if granularity == "week":
+        return period + timedelta(days=6)
+    next_month = (period.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
+def _workdays(start: date, end: date) -> int:
+    """Number of Monday-Friday days in the inclusive range."""
+    if end < start:
+        return 0
+    days = (end - start).days + 1
+    weeks, extra = divmod(days, 7)
+    return weeks * 5 + sum(
+        1 for offset in range(extra) if (start.weekday() + offset) % 7 < 5
+    )
+
+
+def _ratio(numerator: float, denominator: float) -> float | None:
+    return numerator / denominator if denominator else None
+
+
+class CRUDAnalytics(CRUDBase):
+    def get_team_analytics(
+        self,
+        db: Session,
+        team_id: UUID,
+        start: date,
+        end: date,
+        granularity: str = "week"
+    ) -> dict:
+        """Worked hours, attendance and mood per member and period for a team.
+
+        Aggregates the ``daily_user_stats`` rollup in one statement: rows are
+        grouped per (member, period) and the team totals of each period are
+        window sums over the same result, so only members x periods rows
+        leave the database.
+
+        Attendance rates are weekdays with a check-in over the weekdays in
+        range; weekend days count towards ``days_worked`` only. Periods
+        without any activity are left out: of a member's series when that
+        member has none, of the team's when no member has any.
+        """
+        stats = DailyUserStats
+        period = _period_start(db, stats.day, granularity).label("period")
+        per_member = (
+            select(
+                TeamMember.user_id,
+                User.full_name,
+                period,
+                func.coalesce(func.sum(stats.worked_minutes), 0).label("worked_minutes"),
+                func.count(case((stats.checkin_count > 0, 1))).label("days_worked"),
+                func.count(case((and_(stats.checkin_count > 0, _is_weekday(db, stats.day)), 1))).label(
+                    "weekdays_worked"
+                ),
+                func.coalesce(func.sum(stats.mood_sum), 0).label("mood_sum"),
+                func.coalesce(func.sum(stats.mood_count), 0).label("mood_count"),
+            )
+            .select_from(TeamMember)
+            .join(User, User.id == TeamMember.user_id)
+            .outerjoin(stats, and_(
+                stats.user_id == TeamMember.user_id,
+                stats.day >= start,
+                stats.day <= end
+            ))
+            .where(TeamMember.team_id == team_id)
+            .group_by(TeamMember.user_id, User.full_name, period)
+            .subquery()
+        )
+        by_period = {"partition_by": per_member.c.period}
+        rows = db.execute(
+            select(
+                per_member,
+                func.sum(per_member.c.worked_minutes).over(**by_period).label("team_worked_minutes"),
+                func.sum(per_member.c.weekdays_worked).over(**by_period).label("team_weekdays_worked"),
+                func.sum(per_member.c.mood_sum).over(**by_period).label("team_mood_sum"),
+                func.sum(per_member.c.mood_count).over(**by_period).label("team_mood_count"),
+                func.count(case((per_member.c.days_worked > 0, 1))).over(**by_period).label("active_members"),
+            ).order_by(per_member.c.full_name, per_member.c.user_id, per_member.c.period)
+        ).all()
+
+        workdays = {}
+        members = {}
+        periods = {}
+        # Rows are unpacked positionally: far cheaper than Row attribute access
+        for user_id, full_name, period, worked, days_worked, weekdays_worked, mood_sum, mood_count, *team in rows:
+            member = members.get(user_id)
+            if member is None:
+                member = members[user_id] = {
+                    "user_id": user_id,
+                    "full_name": full_name,
+                    "worked_minutes": 0,
+                    "days_worked": 0,
+                    "weekdays_worked": 0,
+                    "mood_sum": 0,
+                    "mood_count": 0,
+                    "periods": [],
+                }
+            if period is None:  # no activity in the range
+                continue
+            days = workdays.get(period)
+            if days is None:
+                days = workdays[period] = _workdays(
+                    max(period, start), min(_period_end(period, granularity), end)
+                )
+                periods[period] = team
+            member["periods"].append({
+                "period_start": period,
+                "worked_hours": worked / 60,
+                "days_worked": days_worked,
+                "attendance_rate": _ratio(weekdays_worked, days),
+                "mood_avg": _ratio(mood_sum, mood_count),
+            })
+            member["worked_minutes"] += worked
+            member["days_worked"] += days_worked
+            member["weekdays_worked"] += weekdays_worked
+            member["mood_sum"] += mood_sum
+            member["mood_count"] += mood_count
+
+        team_size = len(members)
+        total_workdays = _workdays(start, end)
+        return {
+            "team_id": team_id,
+            "start": start,
+            "end": end,
+            "granularity": granularity,
+            "team_size": team_size,
+            "periods": [
+                {
+                    "period_start": period,
+                    "worked_hours": worked / 60,
+                    "active_members": active_members,
+                    "attendance_rate": _ratio(weekdays_worked, team_size * workdays[period]),
+                    "mood_avg": _ratio(mood_sum, mood_count),
+                }
+                for period, (worked, weekdays_worked, mood_sum, mood_count, active_members)
+                in sorted(periods.items())
+            ],
+            "members": [
+                {
+                    "user_id": member["user_id"],
+                    "full_name": member["full_name"],
+                    "worked_hours": member["worked_minutes"] / 60,
+                    "days_worked": member["days_worked"],
+                    "attendance_rate": _ratio(member["weekdays_worked"], total_workdays),
+                    "mood_avg": _ratio(member["mood_sum"], member["mood_count"]),
+                    "periods": member["periods"],
+                }
+                for member in members.values()
+            ],
+        }
+
+
+crud_analytics = CRUDAnalytics()
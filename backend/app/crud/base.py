@@ -0,0 +1,59 @@
+from typing import AsyncIterator
+from sqlalchemy import Row, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+
+class AsyncCRUD:
+    """Awaitable view over a CRUD object's methods.
+
+    The CRUD methods are written once against the ``Session`` API. Given an
+    ``AsyncSession`` they run through ``run_sync``, so every statement is
+    awaited on the event loop by the async driver; given a plain ``Session``
+    they run in the threadpool, as sync endpoints did before.
+    """
+
+    def __init__(self, crud):
+        self._crud = crud
+
+    def __getattr__(self, name: str):
+        method = getattr(self._crud, name)
+
+        async def call(db, *args, **kwargs):
+            if isinstance(db, AsyncSession):
+                return await db.run_sync(method, *args, **kwargs)
+            return await run_in_threadpool(method, db, *args, **kwargs)
+
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        setattr(self, name, call)
+        return call
+
+
+class CRUDBase:
+    """Base class for the CRUD singletons."""
+
+    @property
+    def aio(self) -> AsyncCRUD:
+        """Async versions of this object's methods."""
+        aio = self.__dict__.get("_aio")
+        if aio is None:
+            aio = self.__dict__["_aio"] = AsyncCRUD(self)
+        return aio
+
+
+async def stream_partitions(db, stmt: Select, size: int) -> AsyncIterator[list[Row]]:
+    """Run ``stmt`` on a server-side cursor and yield rows ``size`` at a time.
+
+    Only one partition is held in memory at once, whatever the result size.
+    With a plain ``Session`` each fetch runs in the threadpool.
+    """
+    stmt = stmt.execution_options(yield_per=size)
+    if isinstance(db, AsyncSession):
+        result = await db.stream(stmt)
+        async for partition in result.partitions():
+            yield partition
+        return
+    result = await run_in_threadpool(db.execute, stmt)
+    async for partition in iterate_in_threadpool(result.partitions()):
+        yield partition
@@ -1,12 +1,72 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from datetime import datetime, timedelta
-from app.models import Checkin, Mood, Goal
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import Select, and_, insert, or_, select, tuple_
+from datetime import date, datetime, timedelta
+from app.models import Checkin, Mood, Goal, TeamMember, User
+from app.crud.base import CRUDBase
+from app.crud.daily_stats import crud_daily_stats
+from app.crud.presence import crud_presence
+from app.schemas.checkin import CheckinEvent, MoodCreate
+from app.utils.pagination import Cursor
 from uuid import UUID
 import uuid
 
+# Relationship loading for the read methods, overridable per call. Every
+# CheckinResponse carries the mood, so it is loaded with the rows rather
+# than lazily, one SELECT per row, while serializing:
+# - one row: joined into the same statement
+# - a page: one extra "WHERE id IN (...)" by primary key, which keeps the
+#   paged query a plain index scan on (user_id, timestamp)
+# Pass e.g. ``(*ROW_LOADS, joinedload(Checkin.goal))`` where the goal is
+# needed, or ``()`` where no relationship is read.
+ROW_LOADS = (joinedload(Checkin.mood),)
+PAGE_LOADS = (selectinload(Checkin.mood),)
 
-class CRUDCheckin:
+# History pages look this far back before reading the rest of the history,
+# so on a partitioned table they usually touch the latest few months only
+HISTORY_WINDOW = timedelta(days=92)
+
+
+class CRUDCheckin(CRUDBase):
+    def _insert(self, db: Session, model, **values):
+        """INSERT ... RETURNING a fully loaded instance, instead of add + refresh."""
+        return db.scalar(insert(model).values(id=uuid.uuid4(), **values).returning(model))
+    
+    def _write_transition(
+        self,
+        db: Session,
+        user_id: UUID,
+        mood: MoodCreate | None,
+        **values
+    ) -> Checkin:
+        """Unit of work behind check-in and check-out.
+        
+        The mood (if any), the check-in row, the presence record and the
+        daily rollup are written in one transaction, one statement each,
+        with no refresh afterwards. The mood is linked through
+        ``Checkin.mood_id`` and attached to the returned check-in.
+        """
+        timestamp = datetime.utcnow()
+        mood_row = None
+        if mood is not None:
+            mood_row = self._insert(
+                db, Mood, user_id=user_id, created_at=timestamp, **mood.model_dump()
+            )
+        checkin = self._insert(
+            db,
+            Checkin,
+            user_id=user_id,
+            timestamp=timestamp,
+            mood_id=mood_row.id if mood_row else None,
+            **values
+        )
+        crud_presence.record(db, checkin)
+        crud_daily_stats.record_checkin(db, checkin, mood_row)
+        db.commit()
+        # Populate the relationship without a lazy load
+        set_committed_value(checkin, "mood", mood_row)
+        return checkin
+    
     def create_checkin(
         self, 
         db: Session, 
@@ -15,68 +75,133 @@ class CRUDCheckin:
         location_longitude: float = None,
         location_name: str = None,
         notes: str = None,
-        goal_id: UUID = None
+        goal_id: UUID = None,
+        mood: MoodCreate = None
     ) -> Checkin:
-        """Create a new check-in record."""
-        checkin = Checkin(
-            id=uuid.uuid4(),
-            user_id=user_id,
+        """Create a new check-in record, with its mood if given."""
+        return self._write_transition(
+            db,
+            user_id,
+            mood,
             status="checked_in",
-            timestamp=datetime.utcnow(),
             location_latitude=location_latitude,
             location_longitude=location_longitude,
             location_name=location_name,
             notes=notes,
             goal_id=goal_id
         )
-        db.add(checkin)
-        db.commit()
-        db.refresh(checkin)
-        return checkin
     
     def create_checkout(
         self,
         db: Session,
         user_id: UUID,
-        notes: str = None
+        notes: str = None,
+        mood: MoodCreate = None
     ) -> Checkin:
-        """Create a check-out record."""
-        # Get the latest check-in for today
-        today = datetime.utcnow().date()
-        latest_checkin = db.query(Checkin).filter(
-            and_(
-                Checkin.user_id == user_id,
-                Checkin.status == "checked_in",
-                Checkin.timestamp >= datetime.combine(today, datetime.min.time())
-            )
-        ).order_by(Checkin.timestamp.desc()).first()
+        """Create a check-out record, with its mood if given."""
+        # The open check-in for today comes from the presence record
+        checked_in_at = crud_presence.get_open_checkin_time(db, user_id)
         
         duration_minutes = None
-        if latest_checkin:
-            duration = datetime.utcnow() - latest_checkin.timestamp
+        if checked_in_at:
+            duration = datetime.utcnow() - checked_in_at
             duration_minutes = int(duration.total_seconds() / 60)
         
-        checkout = Checkin(
-            id=uuid.uuid4(),
-            user_id=user_id,
+        return self._write_transition(
+            db,
+            user_id,
+            mood,
             status="checked_out",
-            timestamp=datetime.utcnow(),
             notes=notes,
             duration_minutes=duration_minutes
         )
-        db.add(checkout)
-        db.commit()
-        db.refresh(checkout)
-        return checkout
     
-    def get_by_id(self, db: Session, checkin_id: UUID) -> Checkin | None:
-        """Get check-in by ID."""
-        return db.query(Checkin).filter(Checkin.id == checkin_id).first()
+    def bulk_create(
+        self,
+        db: Session,
+        events: list[tuple[int, CheckinEvent]]
+    ) -> tuple[int, list[tuple[int, str]]]:
+        """Write a batch of ``(line, event)`` pairs in one transaction.
+        
+        Events are replayed in time order: each check-out is paired with the
+        user's preceding check-in of the same day (from the batch, or the
+        presence record) to compute its duration. Rows go out as one
+        multi-row INSERT, followed by one presence and one daily-stats
+        upsert. Returns the inserted count and ``(line, message)`` errors.
+        """
+        user_ids = list({event.user_id for _, event in events})
+        known = set(db.scalars(select(User.id).where(User.id.in_(user_ids))))
+        open_at = crud_presence.get_open_checkin_times(db, list(known))
+        
+        rows, errors = [], []
+        for line, event in sorted(events, key=lambda item: item[1].timestamp):
+            if event.user_id not in known:
+                errors.append((line, "Unknown user_id"))
+                continue
+            
+            duration_minutes = None
+            if event.status == "checked_in":
+                # A replayed older check-in must not hide a newer open one
+                if event.timestamp >= open_at.get(event.user_id, datetime.min):
+                    open_at[event.user_id] = event.timestamp
+            else:
+                # A replayed older check-out must not close a newer open one
+                checked_in_at = open_at.get(event.user_id)
+                if checked_in_at and checked_in_at <= event.timestamp:
+                    del open_at[event.user_id]
+                    if checked_in_at.date() == event.timestamp.date():
+                        duration = event.timestamp - checked_in_at
+                        duration_minutes = int(duration.total_seconds() / 60)
+            
+            rows.append({
+                "id": uuid.uuid4(),
+                "user_id": event.user_id,
+                "status": event.status,
+                "timestamp": event.timestamp,
+                "location_latitude": event.location_latitude,
+                "location_longitude": event.location_longitude,
+                "location_name": event.location_name,
+                "notes": event.notes,
+                "duration_minutes": duration_minutes,
+            })
+        
+        if rows:
+            # Core executemany: no ORM bookkeeping, batched by the driver
+            db.execute(insert(Checkin.__table__), rows)
+            crud_presence.record_latest(db, rows)
+            crud_daily_stats.record_checkins(db, rows)
+            db.commit()
+        return len(rows), errors
+    
+    def get_by_id(
+        self,
+        db: Session,
+        checkin_id: UUID,
+        options: tuple = ROW_LOADS
+    ) -> Checkin | None:
+        """Get check-in by ID.
+        
+        Ids carry no time, so the lookup cannot be bounded up front. It
+        reads the last HISTORY_WINDOW first, which on a partitioned table
+        touches the latest few months only; only ids not found there
+        cost a probe of every older partition.
+        """
+        query = db.query(Checkin).options(*options).filter(Checkin.id == checkin_id)
+        window_start = datetime.utcnow() - HISTORY_WINDOW
+        checkin = query.filter(Checkin.timestamp >= window_start).first()
+        if checkin is None:
+            checkin = query.filter(Checkin.timestamp < window_start).first()
+        return checkin
     
-    def get_user_checkins_today(self, db: Session, user_id: UUID) -> list[Checkin]:
+    def get_user_checkins_today(
+        self,
+        db: Session,
+        user_id: UUID,
+        options: tuple = PAGE_LOADS
+    ) -> list[Checkin]:
         """Get all check-ins for a user today."""
         today = datetime.utcnow().date()
-        return db.query(Checkin).filter(
+        return db.query(Checkin).options(*options).filter(
             and_(
                 Checkin.user_id == user_id,
                 Checkin.timestamp >= datetime.combine(today, datetime.min.time()),
@@ -89,29 +214,113 @@ class CRUDCheckin:
         db: Session, 
         user_id: UUID,
         skip: int = 0,
-        limit: int = 50
+        limit: int = 50,
+        cursor: Cursor = None,
+        options: tuple = PAGE_LOADS
     ) -> list[Checkin]:
-        """Get user's check-ins with pagination."""
-        return db.query(Checkin).filter(
+        """Get user's check-ins with pagination, newest first.
+        
+        ``cursor`` is the (timestamp, id) of the last row already seen; rows
+        after it are found by index seek, so every page costs the same.
+        
+        Every query carries plain timestamp bounds, which the planner can
+        use to skip partitions (it cannot use the row comparison). A page
+        first reads the HISTORY_WINDOW before the cursor. Only when that
+        does not fill it is the older history read, in a second query.
+        ``skip`` pages go the same way; one skipping past the whole window
+        counts its rows to know how many older ones to skip.
+        """
+        query = db.query(Checkin).options(*options).filter(
             Checkin.user_id == user_id
-        ).order_by(Checkin.timestamp.desc()).offset(skip).limit(limit).all()
+        )
+        newest = datetime.utcnow()
+        if cursor is not None:
+            newest = cursor[0]
+            query = query.filter(
+                Checkin.timestamp <= newest,
+                tuple_(Checkin.timestamp, Checkin.id) < cursor
+            )
+        query = query.order_by(Checkin.timestamp.desc(), Checkin.id.desc())
+        
+        window_start = newest - HISTORY_WINDOW
+        recent = query.filter(Checkin.timestamp >= window_start)
+        checkins = recent.offset(skip or None).limit(limit).all()
+        if len(checkins) < limit:
+            older_skip = None
+            if skip and not checkins:
+                older_skip = skip - recent.order_by(None).count()
+            checkins += query.filter(
+                Checkin.timestamp < window_start
+            ).offset(older_skip).limit(limit - len(checkins)).all()
+        return checkins
+    
+    def export_query(
+        self,
+        user_id: UUID = None,
+        team_id: UUID = None,
+        start: date = None,
+        end: date = None
+    ) -> Select:
+        """Plain-column SELECT of check-in history for export.
+        
+        Covers one user or every member of a team, over an optional
+        inclusive day range; rows come out grouped by user, oldest first.
+        Run it with ``stream_partitions`` so nothing is materialized as ORM
+        objects.
+        """
+        stmt = (
+            select(
+                Checkin.id,
+                Checkin.user_id,
+                User.email,
+                User.full_name,
+                Checkin.status,
+                Checkin.timestamp,
+                Checkin.duration_minutes,
+                Checkin.location_name,
+                Checkin.location_latitude,
+                Checkin.location_longitude,
+                Checkin.notes,
+                Mood.mood_level,
+                Mood.emotion,
+            )
+            .join(User, User.id == Checkin.user_id)
+            .outerjoin(Mood, Mood.id == Checkin.mood_id)
+            .order_by(Checkin.user_id, Checkin.timestamp, Checkin.id)
+        )
+        if user_id is not None:
+            stmt = stmt.where(Checkin.user_id == user_id)
+        if team_id is not None:
+            stmt = stmt.join(TeamMember, TeamMember.user_id == Checkin.user_id).where(
+                TeamMember.team_id == team_id
+            )
+        if start is not None:
+            stmt = stmt.where(Checkin.timestamp >= datetime.combine(start, datetime.min.time()))
+        if end is not None:
+            stmt = stmt.where(
+                Checkin.timestamp < datetime.combine(end + timedelta(days=1), datetime.min.time())
+            )
+        return stmt
     
     def is_checked_in(self, db: Session, user_id: UUID) -> bool:
         """Check if user is currently checked in."""
-        today = datetime.utcnow().date()
-        latest = db.query(Checkin).filter(
-            and_(
-                Checkin.user_id == user_id,
-                Checkin.timestamp >= datetime.combine(today, datetime.min.time())
-            )
-        ).order_by(Checkin.timestamp.desc()).first()
-        
-        return latest and latest.status == "checked_in" if latest else False
+        return crud_presence.is_checked_in(db, user_id)
     
-    def get_latest_checkin(self, db: Session, user_id: UUID) -> Checkin | None:
-        """Get the latest check-in for a user."""
-        return db.query(Checkin).filter(
-            Checkin.user_id == user_id
+    def get_latest_checkin(
+        self,
+        db: Session,
+        user_id: UUID,
+        since: datetime,
+        options: tuple = ROW_LOADS
+    ) -> Checkin | None:
+        """Get the latest check-in for a user from ``since`` on.
+        
+        The bound is required: without it, a user with no recent rows
+        costs a scan of every partition.
+        """
+        return db.query(Checkin).options(*options).filter(
+            Checkin.user_id == user_id,
+            Checkin.timestamp >= since
         ).order_by(Checkin.timestamp.desc()).first()
     
     def update(self, db: Session, checkin: Checkin, **kwargs) -> Checkin:
@@ -127,6 +336,11 @@ class CRUDCheckin:
     def delete(self, db: Session, checkin: Checkin) -> None:
         """Delete a check-in."""
         db.delete(checkin)
+        db.flush()
+        # The deleted row may have been the user's latest transition
+        crud_presence.rebuild(db, checkin.user_id)
+        day = checkin.timestamp.date()
+        crud_daily_stats.rebuild(db, day, day, user_id=checkin.user_id)
         db.commit()
 
 
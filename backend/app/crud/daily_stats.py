@@ -0,0 +1,226 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import Date, and_, case, delete, func, literal, null, select, true
+from datetime import date, datetime, timedelta
+from app.models import Checkin, DailyUserStats, Mood
+from app.crud.base import CRUDBase
+from app.db.upsert import upsert
+from uuid import UUID
+
+stats_table = DailyUserStats.__table__
+
+COUNTERS = ("checkin_count", "checkout_count", "worked_minutes", "mood_count", "mood_sum")
+
+
+def _least(current, new):
+    """Smaller of two nullable values (portable LEAST that ignores NULL)."""
+    return case((current.is_(None), new), (new < current, new), else_=current)
+
+
+def _greatest(current, new):
+    """Larger of two nullable values (portable GREATEST that ignores NULL)."""
+    return case((current.is_(None), new), (new > current, new), else_=current)
+
+
+def _day_bounds(start: date | None, end: date | None, column) -> list:
+    """Filters selecting ``column`` within the inclusive day range."""
+    bounds = []
+    if start is not None:
+        bounds.append(column >= datetime.combine(start, datetime.min.time()))
+    if end is not None:
+        bounds.append(column < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+    return bounds
+
+
+class CRUDDailyStats(CRUDBase):
+    def get(self, db: Session, user_id: UUID, day: date) -> DailyUserStats | None:
+        """Get a user's rollup row for one day (primary-key read)."""
+        return db.get(DailyUserStats, (user_id, day))
+
+    def get_range(
+        self,
+        db: Session,
+        user_id: UUID,
+        start: date,
+        end: date
+    ) -> list[DailyUserStats]:
+        """Get a user's rollup rows for an inclusive day range, oldest first."""
+        return db.query(DailyUserStats).filter(
+            DailyUserStats.user_id == user_id,
+            DailyUserStats.day >= start,
+            DailyUserStats.day <= end
+        ).order_by(DailyUserStats.day).all()
+
+    def _increment(self, db: Session, rows: list[dict]) -> None:
+        """Add each row's values to its (user_id, day) row, creating it if needed.
+
+        A (user_id, day) pair may appear only once per call. The rows are
+        sent as parameters of one cached statement (executemany), which the
+        driver batches into multi-row INSERTs.
+        """
+        params = [
+            {
+                **dict.fromkeys(COUNTERS, 0),
+                "first_in": None,
+                "last_out": None,
+                "mood_min": None,
+                "mood_max": None,
+                "updated_at": datetime.utcnow(),
+                **row,
+            }
+            for row in rows
+        ]
+        stmt = upsert(db, DailyUserStats)
+        excluded = stmt.excluded
+        set_ = {
+            counter: stats_table.c[counter] + excluded[counter] for counter in COUNTERS
+        }
+        set_.update(
+            first_in=_least(stats_table.c.first_in, excluded.first_in),
+            last_out=_greatest(stats_table.c.last_out, excluded.last_out),
+            mood_min=_least(stats_table.c.mood_min, excluded.mood_min),
+            mood_max=_greatest(stats_table.c.mood_max, excluded.mood_max),
+            updated_at=excluded.updated_at,
+        )
+        db.execute(stmt.on_conflict_do_update(index_elements=["user_id", "day"], set_=set_), params)
+
+    def record_checkin(self, db: Session, checkin: Checkin, mood: Mood = None) -> None:
+        """Fold a new check-in/out row, and the mood given with it, into its day.
+
+        Both go into the same upsert; the caller commits.
+        """
+        self.record_checkins(
+            db,
+            [{
+                "user_id": checkin.user_id,
+                "status": checkin.status,
+                "timestamp": checkin.timestamp,
+                "duration_minutes": checkin.duration_minutes,
+            }],
+            [mood] if mood is not None else []
+        )
+
+    def record_checkins(self, db: Session, checkins: list[dict], moods: list[Mood] = ()) -> None:
+        """Fold new check-in/out rows, given as column dicts, and moods into their days.
+
+        Writes every touched day in one statement; the caller commits.
+        """
+        days = {}
+        for checkin in checkins:
+            key = (checkin["user_id"], checkin["timestamp"].date())
+            row = days.setdefault(key, {"user_id": key[0], "day": key[1]})
+            timestamp = checkin["timestamp"]
+            if checkin["status"] == "checked_in":
+                row["checkin_count"] = row.get("checkin_count", 0) + 1
+                row["first_in"] = min(row.get("first_in") or timestamp, timestamp)
+            else:
+                row["checkout_count"] = row.get("checkout_count", 0) + 1
+                row["worked_minutes"] = (
+                    row.get("worked_minutes", 0) + (checkin.get("duration_minutes") or 0)
+                )
+                row["last_out"] = max(row.get("last_out") or timestamp, timestamp)
+        for mood in moods:
+            key = (mood.user_id, mood.created_at.date())
+            row = days.setdefault(key, {"user_id": key[0], "day": key[1]})
+            level = mood.mood_level
+            row["mood_count"] = row.get("mood_count", 0) + 1
+            row["mood_sum"] = row.get("mood_sum", 0) + level
+            row["mood_min"] = min(row.get("mood_min") or level, level)
+            row["mood_max"] = max(row.get("mood_max") or level, level)
+        if days:
+            self._increment(db, list(days.values()))
+
+    def record_mood(self, db: Session, mood: Mood) -> None:
+        """Fold a new mood into its day. The caller commits."""
+        self.record_checkins(db, [], [mood])
+
+    def rebuild(
+        self,
+        db: Session,
+        start: date = None,
+        end: date = None,
+        user_id: UUID = None
+    ) -> int:
+        """Recompute the rollup from checkins and moods.
+
+        Covers the inclusive day range ``start``..``end`` (open-ended when
+        omitted), for every user or only ``user_id``. Returns the number of
+        rows written; the caller commits.
+        """
+        scope = []
+        if start is not None:
+            scope.append(DailyUserStats.day >= start)
+        if end is not None:
+            scope.append(DailyUserStats.day <= end)
+        checkin_filters = _day_bounds(start, end, Checkin.timestamp)
+        mood_filters = _day_bounds(start, end, Mood.created_at)
+        if user_id is not None:
+            scope.append(DailyUserStats.user_id == user_id)
+            checkin_filters.append(Checkin.user_id == user_id)
+            mood_filters.append(Mood.user_id == user_id)
+        db.execute(delete(DailyUserStats).where(*scope))
+
+        checked_in = Checkin.status == "checked_in"
+        checked_out = Checkin.status == "checked_out"
+        checkin_day = func.date(Checkin.timestamp, type_=Date)
+        db.execute(
+            stats_table.insert().from_select(
+                [
+                    "user_id", "day", "checkin_count", "checkout_count",
+                    "worked_minutes", "first_in", "last_out",
+                    "mood_count", "mood_sum", "mood_min", "mood_max", "updated_at",
+                ],
+                select(
+                    Checkin.user_id,
+                    checkin_day,
+                    func.sum(case((checked_in, 1), else_=0)),
+                    func.sum(case((checked_out, 1), else_=0)),
+                    func.coalesce(
+                        func.sum(case((checked_out, Checkin.duration_minutes))), 0
+                    ),
+                    func.min(case((checked_in, Checkin.timestamp))),
+                    func.max(case((checked_out, Checkin.timestamp))),
+                    literal(0),
+                    literal(0),
+                    null(),
+                    null(),
+                    func.now(),
+                ).where(and_(true(), *checkin_filters)).group_by(Checkin.user_id, checkin_day)
+            )
+        )
+
+        # Moods land on days that may or may not have check-ins already
+        mood_day = func.date(Mood.created_at, type_=Date)
+        stmt = upsert(db, DailyUserStats).from_select(
+            [
+                "user_id", "day", "checkin_count", "checkout_count", "worked_minutes",
+                "mood_count", "mood_sum", "mood_min", "mood_max", "updated_at",
+            ],
+            select(
+                Mood.user_id,
+                mood_day,
+                literal(0),
+                literal(0),
+                literal(0),
+                func.count(),
+                func.sum(Mood.mood_level),
+                func.min(Mood.mood_level),
+                func.max(Mood.mood_level),
+                func.now(),
+            ).where(and_(true(), *mood_filters)).group_by(Mood.user_id, mood_day)
+        )
+        excluded = stmt.excluded
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id", "day"],
+            set_={
+                "mood_count": excluded.mood_count,
+                "mood_sum": excluded.mood_sum,
+                "mood_min": excluded.mood_min,
+                "mood_max": excluded.mood_max,
+            }
+        ))
+        return db.scalar(
+            select(func.count()).select_from(DailyUserStats).where(*scope)
+        )
+
+
+crud_daily_stats = CRUDDailyStats()
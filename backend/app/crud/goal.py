@@ -1,10 +1,13 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import tuple_
 from app.models import Goal
+from app.crud.base import CRUDBase
+from app.utils.pagination import Cursor
 from uuid import UUID
 import uuid
 
 
-class CRUDGoal:
+class CRUDGoal(CRUDBase):
     def create(
         self,
         db: Session,
@@ -35,12 +38,23 @@ class CRUDGoal:
         db: Session,
         user_id: UUID,
         skip: int = 0,
-        limit: int = 50
+        limit: int = 50,
+        cursor: Cursor = None,
+        is_completed: bool = None
     ) -> list[Goal]:
-        """Get user's goals with pagination."""
-        return db.query(Goal).filter(
-            Goal.user_id == user_id
-        ).order_by(Goal.created_at.desc()).offset(skip).limit(limit).all()
+        """Get user's goals with pagination, newest first.
+        
+        ``cursor`` is the (created_at, id) of the last row already seen;
+        ``is_completed`` optionally filters by completion status.
+        """
+        query = db.query(Goal).filter(Goal.user_id == user_id)
+        if is_completed is not None:
+            query = query.filter(Goal.is_completed == is_completed)
+        if cursor is not None:
+            query = query.filter(tuple_(Goal.created_at, Goal.id) < cursor)
+        return query.order_by(
+            Goal.created_at.desc(), Goal.id.desc()
+        ).offset(skip).limit(limit).all()
     
     def get_user_goals_by_completed(
         self,
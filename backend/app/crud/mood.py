@@ -1,18 +1,22 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import tuple_
 from app.models import Mood
+from app.crud.base import CRUDBase
+from app.crud.daily_stats import crud_daily_stats
+from app.utils.pagination import Cursor
+from datetime import datetime
 from uuid import UUID
 import uuid
 
 
-class CRUDMood:
+class CRUDMood(CRUDBase):
     def create(
         self,
         db: Session,
         user_id: UUID,
         mood_level: int,
         emotion: str = None,
-        notes: str = None,
-        checkin_id: UUID = None
+        notes: str = None
     ) -> Mood:
         """Create a new mood record."""
         mood = Mood(
@@ -21,9 +25,10 @@ class CRUDMood:
             mood_level=mood_level,
             emotion=emotion,
             notes=notes,
-            checkin_id=checkin_id
+            created_at=datetime.utcnow()
         )
         db.add(mood)
+        crud_daily_stats.record_mood(db, mood)
         db.commit()
         db.refresh(mood)
         return mood
@@ -37,12 +42,19 @@ class CRUDMood:
         db: Session,
         user_id: UUID,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Cursor = None
     ) -> list[Mood]:
-        """Get user's mood records with pagination."""
-        return db.query(Mood).filter(
-            Mood.user_id == user_id
-        ).order_by(Mood.created_at.desc()).offset(skip).limit(limit).all()
+        """Get user's mood records with pagination, newest first.
+        
+        ``cursor`` is the (created_at, id) of the last row already seen.
+        """
+        query = db.query(Mood).filter(Mood.user_id == user_id)
+        if cursor is not None:
+            query = query.filter(tuple_(Mood.created_at, Mood.id) < cursor)
+        return query.order_by(
+            Mood.created_at.desc(), Mood.id.desc()
+        ).offset(skip).limit(limit).all()
 
 
 crud_mood = CRUDMood()
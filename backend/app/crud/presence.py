@@ -0,0 +1,158 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import case, delete, func, select
+from datetime import datetime
+from app.models import Checkin, UserPresence
+from app.crud.base import CRUDBase
+from app.db.upsert import upsert
+from uuid import UUID
+
+
+def start_of_today() -> datetime:
+    """Midnight (UTC) of the current day."""
+    return datetime.combine(datetime.utcnow().date(), datetime.min.time())
+
+
+class CRUDPresence(CRUDBase):
+    def get(self, db: Session, user_id: UUID) -> UserPresence | None:
+        """Get a user's presence record (primary-key read)."""
+        return db.get(UserPresence, user_id)
+
+    def get_open_checkin_time(self, db: Session, user_id: UUID) -> datetime | None:
+        """Timestamp of the user's open check-in today, if any."""
+        presence = db.get(UserPresence, user_id, with_for_update=True)
+        if (
+            presence
+            and presence.status == "checked_in"
+            and presence.checked_in_at
+            and presence.checked_in_at >= start_of_today()
+        ):
+            return presence.checked_in_at
+        return None
+
+    def is_checked_in(self, db: Session, user_id: UUID) -> bool:
+        """Check if user is currently checked in (since midnight UTC)."""
+        presence = self.get(db, user_id)
+        return bool(
+            presence
+            and presence.status == "checked_in"
+            and presence.last_transition_at >= start_of_today()
+        )
+
+    def record(self, db: Session, checkin: Checkin) -> None:
+        """Move the user's presence to the state of a new check-in/out row.
+
+        Executes in the caller's transaction; the caller commits.
+        """
+        is_open = checkin.status == "checked_in"
+        values = {
+            "status": checkin.status,
+            "open_checkin_id": checkin.id if is_open else None,
+            "checked_in_at": checkin.timestamp if is_open else None,
+            "last_transition_at": checkin.timestamp,
+            "updated_at": datetime.utcnow(),
+        }
+        stmt = upsert(db, UserPresence).values(user_id=checkin.user_id, **values)
+        db.execute(stmt.on_conflict_do_update(index_elements=["user_id"], set_=values))
+
+    def get_open_checkin_times(
+        self,
+        db: Session,
+        user_ids: list[UUID]
+    ) -> dict[UUID, datetime]:
+        """Timestamps of the open check-ins of several users, by user id."""
+        rows = db.execute(
+            select(UserPresence.user_id, UserPresence.checked_in_at).where(
+                UserPresence.user_id.in_(user_ids),
+                UserPresence.status == "checked_in"
+            )
+        ).all()
+        return {user_id: checked_in_at for user_id, checked_in_at in rows}
+
+    def record_latest(self, db: Session, checkins: list[dict]) -> None:
+        """Move presence to the latest of several check-in/out rows per user.
+
+        ``checkins`` are column dicts, possibly older than what is already
+        recorded (replayed events); a user's presence only ever moves
+        forward in time. Executes in the caller's transaction.
+        """
+        latest = {}
+        for checkin in checkins:
+            current = latest.get(checkin["user_id"])
+            if current is None or checkin["timestamp"] >= current["timestamp"]:
+                latest[checkin["user_id"]] = checkin
+        if not latest:
+            return
+        now = datetime.utcnow()
+        params = [
+            {
+                "user_id": checkin["user_id"],
+                "status": checkin["status"],
+                "open_checkin_id": checkin["id"] if checkin["status"] == "checked_in" else None,
+                "checked_in_at": checkin["timestamp"] if checkin["status"] == "checked_in" else None,
+                "last_transition_at": checkin["timestamp"],
+                "updated_at": now,
+            }
+            for checkin in latest.values()
+        ]
+        stmt = upsert(db, UserPresence)
+        excluded = stmt.excluded
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={
+                "status": excluded.status,
+                "open_checkin_id": excluded.open_checkin_id,
+                "checked_in_at": excluded.checked_in_at,
+                "last_transition_at": excluded.last_transition_at,
+                "updated_at": excluded.updated_at,
+            },
+            where=UserPresence.__table__.c.last_transition_at <= excluded.last_transition_at
+        ), params)
+
+    def rebuild(self, db: Session, user_id: UUID = None) -> int:
+        """Recompute presence from the checkins history.
+
+        Rebuilds every user, or only ``user_id`` when given. Returns the
+        number of presence rows written; the caller commits.
+        """
+        ranked = select(
+            Checkin.id,
+            Checkin.user_id,
+            Checkin.status,
+            Checkin.timestamp,
+            func.row_number().over(
+                partition_by=Checkin.user_id,
+                order_by=(Checkin.timestamp.desc(), Checkin.id.desc())
+            ).label("rank")
+        )
+        clear = delete(UserPresence)
+        if user_id is not None:
+            ranked = ranked.where(Checkin.user_id == user_id)
+            clear = clear.where(UserPresence.user_id == user_id)
+        latest = ranked.subquery()
+        is_open = latest.c.status == "checked_in"
+
+        db.execute(clear)
+        result = db.execute(
+            UserPresence.__table__.insert().from_select(
+                [
+                    "user_id",
+                    "status",
+                    "open_checkin_id",
+                    "checked_in_at",
+                    "last_transition_at",
+                    "updated_at",
+                ],
+                select(
+                    latest.c.user_id,
+                    latest.c.status,
+                    case((is_open, latest.c.id)),
+                    case((is_open, latest.c.timestamp)),
+                    latest.c.timestamp,
+                    func.now(),
+                ).where(latest.c.rank == 1)
+            )
+        )
+        return result.rowcount
+
+
+crud_presence = CRUDPresence()
@@ -1,12 +1,19 @@
-from sqlalchemy.orm import Session
-from app.models import Team, TeamMember, User
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import Row, and_, case, select, tuple_
+from sqlalchemy.engine import RowMapping
+from app.models import Checkin, Mood, Team, TeamMember, User, UserPresence
+from app.crud.base import CRUDBase
+from app.crud.checkin import HISTORY_WINDOW
+from app.crud.presence import start_of_today
+from app.utils.pagination import Cursor
+from datetime import datetime
 from uuid import UUID
 import uuid
 import random
 import string
 
 
-class CRUDTeam:
+class CRUDTeam(CRUDBase):
     def create(
         self,
         db: Session,
@@ -70,10 +77,59 @@ class CRUDTeam:
         db.refresh(member)
         return member
     
+    def get_user_team_ids(self, db: Session, user_id: UUID) -> list[UUID]:
+        """Get the ids of all teams a user belongs to."""
+        return db.scalars(
+            select(TeamMember.team_id).where(TeamMember.user_id == user_id)
+        ).all()
+    
     def get_team_members(self, db: Session, team_id: UUID) -> list[TeamMember]:
         """Get all members of a team."""
         return db.query(TeamMember).filter(TeamMember.team_id == team_id).all()
     
+    def get_member_profiles(self, db: Session, team_id: UUID) -> list[Row]:
+        """(id, email, full_name) of every member of a team, by user id."""
+        return db.execute(
+            select(User.id, User.email, User.full_name)
+            .join(TeamMember, TeamMember.user_id == User.id)
+            .where(TeamMember.team_id == team_id)
+            .order_by(User.id)
+        ).all()
+    
+    def get_team_roster(
+        self,
+        db: Session,
+        team_id: UUID,
+        limit: int = 100,
+        cursor: Cursor = None
+    ) -> list[Row]:
+        """Members of a team with their profiles, in one joined statement.
+        
+        Ordered by join date; ``cursor`` is the (joined_at, id) of the last
+        membership already seen, so large teams page by index seek on
+        (team_id, joined_at, id).
+        """
+        stmt = (
+            select(
+                TeamMember.id,
+                TeamMember.user_id,
+                TeamMember.role,
+                TeamMember.joined_at,
+                User.email,
+                User.full_name,
+                User.avatar_url,
+                User.timezone,
+                User.is_active,
+            )
+            .join(User, User.id == TeamMember.user_id)
+            .where(TeamMember.team_id == team_id)
+        )
+        if cursor is not None:
+            stmt = stmt.where(tuple_(TeamMember.joined_at, TeamMember.id) > cursor)
+        return db.execute(
+            stmt.order_by(TeamMember.joined_at, TeamMember.id).limit(limit)
+        ).all()
+    
     def remove_member(
         self,
         db: Session,
@@ -113,6 +169,68 @@ class CRUDTeam:
             TeamMember.team_id == team_id,
             TeamMember.user_id == user_id
         ).first() is not None
+    
+    def get_team_presence(self, db: Session, team_id: UUID) -> list[RowMapping]:
+        """Live roster of a team in a single statement.
+
+        Each member's latest check-in and latest mood are picked by
+        correlated ``LIMIT 1`` subqueries, which resolve to one index seek
+        per member (``ix_checkins_open_by_user``, ``ix_moods_user_id_created_at``).
+        Check-ins are only looked for in the last HISTORY_WINDOW, in the
+        subquery and in the join, so on a partitioned table both touch the
+        latest few months only; members who have not checked in since
+        have no ``last_checkin_at``.
+        """
+        since = datetime.utcnow() - HISTORY_WINDOW
+        recent_checkin = aliased(Checkin)
+        recent_mood = aliased(Mood)
+        last_checkin_id = (
+            select(recent_checkin.id)
+            .where(
+                recent_checkin.user_id == User.id,
+                recent_checkin.status == "checked_in",
+                recent_checkin.timestamp >= since
+            )
+            .order_by(recent_checkin.timestamp.desc())
+            .limit(1)
+            .correlate(User)
+            .scalar_subquery()
+        )
+        latest_mood_id = (
+            select(recent_mood.id)
+            .where(recent_mood.user_id == User.id)
+            .order_by(recent_mood.created_at.desc(), recent_mood.id.desc())
+            .limit(1)
+            .correlate(User)
+            .scalar_subquery()
+        )
+        is_checked_in = and_(
+            UserPresence.status == "checked_in",
+            UserPresence.last_transition_at >= start_of_today()
+        )
+        stmt = (
+            select(
+                User.id.label("user_id"),
+                User.full_name,
+                User.avatar_url,
+                TeamMember.role,
+                case((is_checked_in, "checked_in"), else_="checked_out").label("status"),
+                UserPresence.last_transition_at,
+                Checkin.timestamp.label("last_checkin_at"),
+                Checkin.location_name,
+                Mood.mood_level,
+                Mood.emotion,
+                Mood.created_at.label("mood_at"),
+            )
+            .select_from(TeamMember)
+            .join(User, User.id == TeamMember.user_id)
+            .outerjoin(UserPresence, UserPresence.user_id == User.id)
+            .outerjoin(Checkin, and_(Checkin.id == last_checkin_id, Checkin.timestamp >= since))
+            .outerjoin(Mood, Mood.id == latest_mood_id)
+            .where(TeamMember.team_id == team_id)
+            .order_by(User.full_name, User.id)
+        )
+        return db.execute(stmt).mappings().all()
 
 
 crud_team = CRUDTeam()
@@ -1,13 +1,27 @@
 from sqlalchemy.orm import Session
 from app.models import User
-from app.core.security import hash_password, verify_password
+from app.crud.base import CRUDBase
+from app.core.security import hash_password
+from app.core.cache import user_cache
 from uuid import UUID
 
 
-class CRUDUser:
-    def create(self, db: Session, email: str, password: str, full_name: str = None) -> User:
-        """Create a new user."""
-        hashed_password = hash_password(password)
+class CRUDUser(CRUDBase):
+    def create(
+        self,
+        db: Session,
+        email: str,
+        password: str = None,
+        full_name: str = None,
+        hashed_password: str = None
+    ) -> User:
+        """Create a new user.
+        
+        Pass ``hashed_password`` instead of ``password`` when the hash was
+        already computed off the request path (see app.core.hashing).
+        """
+        if hashed_password is None:
+            hashed_password = hash_password(password)
         db_user = User(
             email=email,
             hashed_password=hashed_password,
@@ -26,15 +40,6 @@ class CRUDUser:
         """Get user by ID."""
         return db.query(User).filter(User.id == user_id).first()
     
-    def authenticate(self, db: Session, email: str, password: str) -> User | None:
-        """Authenticate user with email and password."""
-        user = self.get_by_email(db, email)
-        if not user:
-            return None
-        if not verify_password(password, user.hashed_password):
-            return None
-        return user
-    
     def update(self, db: Session, user: User, **kwargs) -> User:
         """Update user fields."""
         for key, value in kwargs.items():
@@ -43,6 +48,8 @@ class CRUDUser:
         db.add(user)
         db.commit()
         db.refresh(user)
+        # Drop the cached snapshot so auth sees the change (or deactivation)
+        user_cache.pop(user.id)
         return user
     
     def is_active(self, user: User) -> bool:
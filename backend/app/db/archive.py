@@ -0,0 +1,417 @@
+import gzip
+import os
+import struct
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+from uuid import UUID
+import orjson
+from sqlalchemy import and_, exists, func, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from app.core.config import settings
+from app.db.partitions import add_months, detach_partition, is_partitioned, list_partitions, month_start
+from app.models import Checkin, Mood
+from app.utils.pagination import Cursor
+
+# Cold storage for closed months of checkins and moods, under ARCHIVE_DIR:
+# one segment file per table and month, e.g. checkins/2024-01.ndjson.gz.
+#
+# A segment holds one gzip member per user, with that user's rows as
+# NDJSON in (timestamp, id) order, then a footer member: JSON with the
+# segment's row count and min/max timestamp, and per user the offset,
+# length, row count and min/max timestamp of their member. The file ends
+# with an 8-byte footer offset and a 4-byte magic. A user's history is
+# read by seeking to their member, without inflating the rest of the month.
+#
+# A month is archived whole, so every row of an archived month is older
+# than every live row of the same table. The exception are moods that a
+# check-in of a later, still live month points to (created just before a
+# midnight check-in): they stay live until that check-in is archived, and
+# then go to the segment of their own month.
+ARCHIVED_TABLES = {
+    "checkins": (Checkin.__table__, "timestamp"),
+    "moods": (Mood.__table__, "created_at"),
+}
+SEGMENT_SUFFIX = ".ndjson.gz"
+COMPRESS_LEVEL = 6
+
+_MAGIC = b"CKA1"
+_TRAILER = struct.Struct("<Q4s")
+# Parsed footers kept per process, keyed by path and mtime
+FOOTER_CACHE_SIZE = 128
+# Rows fetched per round trip while archiving a month
+_FETCH_SIZE = 5000
+
+# Serializes archival runs, like partition maintenance
+_ARCHIVE_LOCK = "SELECT pg_advisory_xact_lock(hashtext('history_archive'))"
+
+
+def archive_enabled() -> bool:
+    return bool(settings.ARCHIVE_DIR)
+
+
+def segment_path(table: str, month: date) -> Path:
+    return Path(settings.ARCHIVE_DIR) / table / f"{month:%Y-%m}{SEGMENT_SUFFIX}"
+
+
+def list_segments(table: str) -> list[tuple[date, Path]]:
+    """(month, path) of every segment of ``table``, oldest first."""
+    if not archive_enabled():
+        return []
+    directory = Path(settings.ARCHIVE_DIR) / table
+    if not directory.is_dir():
+        return []
+    segments = []
+    for path in directory.glob(f"*{SEGMENT_SUFFIX}"):
+        try:
+            month = datetime.strptime(path.name[:-len(SEGMENT_SUFFIX)], "%Y-%m").date()
+        except ValueError:
+            continue
+        segments.append((month, path))
+    return sorted(segments)
+
+
+def archive_boundary() -> Optional[date]:
+    """First day after the newest archived month, None if nothing is archived."""
+    months = [month for table in ARCHIVED_TABLES for month, _ in list_segments(table)]
+    return add_months(max(months), 1) if months else None
+
+
+def _decoders(table: str) -> dict:
+    """Column name -> parser for the values JSON does not round-trip."""
+    decoders = {}
+    for column in ARCHIVED_TABLES[table][0].columns:
+        python_type = column.type.python_type
+        if python_type is datetime:
+            decoders[column.name] = datetime.fromisoformat
+        elif python_type is UUID:
+            decoders[column.name] = UUID
+    return decoders
+
+
+def _decode_rows(table: str, body: bytes) -> list[dict]:
+    decoders = _decoders(table)
+    rows = []
+    for line in body.splitlines():
+        row = orjson.loads(line)
+        for name, decode in decoders.items():
+            if row.get(name) is not None:
+                row[name] = decode(row[name])
+        rows.append(row)
+    return rows
+
+
+@lru_cache(maxsize=FOOTER_CACHE_SIZE)
+def _read_footer(path: str, mtime_ns: int) -> dict:
+    with open(path, "rb") as file:
+        file.seek(-_TRAILER.size, os.SEEK_END)
+        end = file.tell()
+        offset, magic = _TRAILER.unpack(file.read(_TRAILER.size))
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not an archive segment")
+        file.seek(offset)
+        return orjson.loads(gzip.decompress(file.read(end - offset)))
+
+
+def read_footer(path: Path) -> dict:
+    return _read_footer(str(path), path.stat().st_mtime_ns)
+
+
+def read_member(table: str, path: Path, user_id: UUID) -> list[dict]:
+    """Rows of one user in a segment, oldest first."""
+    entry = read_footer(path)["users"].get(str(user_id))
+    if entry is None:
+        return []
+    offset, length = entry[0], entry[1]
+    with open(path, "rb") as file:
+        file.seek(offset)
+        return _decode_rows(table, gzip.decompress(file.read(length)))
+
+
+def read_segment(table: str, path: Path) -> dict[UUID, list[dict]]:
+    """Every row of a segment, by user."""
+    return {
+        UUID(user_id): read_member(table, path, UUID(user_id))
+        for user_id in read_footer(path)["users"]
+    }
+
+
+def write_segment(table: str, month: date, groups: Iterable[tuple[UUID, list[dict]]]) -> int:
+    """Write ``(user_id, rows)`` groups as the segment of ``month``; returns the row count.
+
+    The file is written next to its final path, synced and renamed over
+    it, so readers see the old segment or the new one, never a partial one.
+    """
+    _, ts_column = ARCHIVED_TABLES[table]
+    path = segment_path(table, month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+    users, total, oldest, newest = {}, 0, None, None
+    with open(partial, "wb") as file:
+        for user_id, rows in groups:
+            if not rows:
+                continue
+            offset = file.tell()
+            body = b"".join(orjson.dumps(row) + b"\n" for row in rows)
+            # mtime=0 keeps segments of the same rows byte-identical
+            file.write(gzip.compress(body, COMPRESS_LEVEL, mtime=0))
+            first, last = rows[0][ts_column], rows[-1][ts_column]
+            users[str(user_id)] = [offset, file.tell() - offset, len(rows), first.isoformat(), last.isoformat()]
+            total += len(rows)
+            oldest = first if oldest is None else min(oldest, first)
+            newest = last if newest is None else max(newest, last)
+        footer = {
+            "table": table,
+            "month": f"{month:%Y-%m}",
+            "rows": total,
+            "min": oldest.isoformat() if oldest else None,
+            "max": newest.isoformat() if newest else None,
+            "columns": [column.name for column in ARCHIVED_TABLES[table][0].columns],
+            "users": users,
+        }
+        footer_offset = file.tell()
+        file.write(gzip.compress(orjson.dumps(footer), COMPRESS_LEVEL, mtime=0))
+        file.write(_TRAILER.pack(footer_offset, _MAGIC))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(partial, path)
+    directory = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+    return total
+
+
+def user_rows(
+    table: str,
+    user_id: UUID,
+    start: datetime = None,
+    end: datetime = None,
+    newest_first: bool = False
+) -> Iterator[dict]:
+    """Archived rows of one user with ``start <= timestamp < end``.
+
+    Only the segments overlapping the range are opened, and only the
+    user's member of each is read.
+    """
+    _, ts_column = ARCHIVED_TABLES[table]
+    segments = list_segments(table)
+    if newest_first:
+        segments.reverse()
+    for month, path in segments:
+        if start is not None and datetime.combine(add_months(month, 1), datetime.min.time()) <= start:
+            continue
+        if end is not None and datetime.combine(month, datetime.min.time()) >= end:
+            continue
+        rows = [
+            row for row in read_member(table, path, user_id)
+            if (start is None or row[ts_column] >= start) and (end is None or row[ts_column] < end)
+        ]
+        if newest_first:
+            rows.reverse()
+        yield from rows
+
+
+def _page(table: str, user_id: UUID, limit: int, cursor: Cursor = None, exclude=()) -> list[dict]:
+    """Up to ``limit`` archived rows after ``cursor``, newest first."""
+    _, ts_column = ARCHIVED_TABLES[table]
+    end = cursor[0] + timedelta(microseconds=1) if cursor is not None else None
+    page = []
+    if limit <= 0:
+        return page
+    for row in user_rows(table, user_id, end=end, newest_first=True):
+        if cursor is not None and (row[ts_column], row["id"]) >= cursor:
+            continue
+        if row["id"] in exclude:
+            continue
+        page.append(row)
+        if len(page) == limit:
+            break
+    return page
+
+
+def archived_moods(user_id: UUID, limit: int, cursor: Cursor = None, exclude=()) -> list[Mood]:
+    """A page of archived moods, newest first, as detached ``Mood`` objects."""
+    return [Mood(**row) for row in _page("moods", user_id, limit, cursor, exclude)]
+
+
+def _moods_by_id(user_id: UUID, mood_ids: set, start: datetime = None, end: datetime = None) -> dict[UUID, dict]:
+    """Archived moods of a user among ``mood_ids``, created in ``[start, end)``.
+
+    A check-in early in a month may carry a mood created just before it,
+    in the previous month, so that month is read too when moods are missing.
+    """
+    moods = {row["id"]: row for row in user_rows("moods", user_id, start, end) if row["id"] in mood_ids}
+    if start is not None and len(moods) < len(mood_ids):
+        previous = datetime.combine(add_months(start.date().replace(day=1), -1), datetime.min.time())
+        moods.update(
+            (row["id"], row) for row in user_rows("moods", user_id, previous, start)
+            if row["id"] in mood_ids
+        )
+    return moods
+
+
+def archived_checkins(user_id: UUID, limit: int, cursor: Cursor = None, exclude=()) -> list[Checkin]:
+    """A page of archived check-ins, newest first, as detached ``Checkin`` objects.
+
+    Each carries its mood, read from the mood segments of the same months
+    (see ``_moods_by_id``). ``exclude`` holds ids already returned from the
+    live table.
+    """
+    rows = _page("checkins", user_id, limit, cursor, exclude)
+    mood_ids = {row["mood_id"] for row in rows if row["mood_id"] is not None}
+    moods = {}
+    if mood_ids:
+        oldest, newest = rows[-1]["timestamp"], rows[0]["timestamp"]
+        start = datetime.combine(oldest.date().replace(day=1), datetime.min.time())
+        end = datetime.combine(add_months(newest.date().replace(day=1), 1), datetime.min.time())
+        moods = {
+            mood_id: Mood(**row) for mood_id, row in _moods_by_id(user_id, mood_ids, start, end).items()
+        }
+    checkins = []
+    for row in rows:
+        checkin = Checkin(**row)
+        set_committed_value(checkin, "mood", moods.get(row["mood_id"]))
+        checkins.append(checkin)
+    return checkins
+
+
+def _day_bounds(start: date = None, end: date = None) -> tuple:
+    """Datetime bounds of an inclusive day range, as in ``export_query``."""
+    return (
+        datetime.combine(start, datetime.min.time()) if start is not None else None,
+        datetime.combine(end + timedelta(days=1), datetime.min.time()) if end is not None else None,
+    )
+
+
+def archived_users(user_ids: Iterable[UUID], start: date = None, end: date = None) -> set[UUID]:
+    """The users among ``user_ids`` with archived check-ins in the inclusive day range."""
+    first, last = _day_bounds(start, end)
+    wanted = {str(user_id) for user_id in user_ids}
+    found = set()
+    for month, path in list_segments("checkins"):
+        if first is not None and datetime.combine(add_months(month, 1), datetime.min.time()) <= first:
+            continue
+        if last is not None and datetime.combine(month, datetime.min.time()) >= last:
+            continue
+        found.update(wanted.intersection(read_footer(path)["users"]))
+    return {UUID(user_id) for user_id in found}
+
+
+def export_rows(user, columns: list[str], start: date = None, end: date = None) -> list[tuple]:
+    """Archived check-ins of ``user`` as export rows with ``columns``, oldest first.
+
+    ``user`` provides ``id``, ``email`` and ``full_name``; the mood columns
+    come from the archived moods. The day range is inclusive.
+    """
+    first, last = _day_bounds(start, end)
+    checkins = list(user_rows("checkins", user.id, first, last))
+    mood_ids = {row["mood_id"] for row in checkins if row["mood_id"] is not None}
+    moods = _moods_by_id(user.id, mood_ids, first, last) if mood_ids else {}
+    rows = []
+    for checkin in checkins:
+        mood = moods.get(checkin["mood_id"], {})
+        values = {
+            **checkin,
+            "email": user.email,
+            "full_name": user.full_name,
+            "mood_level": mood.get("mood_level"),
+            "emotion": mood.get("emotion"),
+        }
+        rows.append(tuple(values[name] for name in columns))
+    return rows
+
+
+def _live_groups(db: Session, table: str, where) -> Iterator[tuple[UUID, list[dict]]]:
+    """Live rows matching ``where`` grouped by user, each group oldest first."""
+    model_table, ts_column = ARCHIVED_TABLES[table]
+    result = db.execute(
+        select(model_table)
+        .where(where)
+        .order_by(model_table.c.user_id, model_table.c[ts_column], model_table.c.id)
+        .execution_options(yield_per=_FETCH_SIZE)
+    )
+    rows = (dict(row._mapping) for row in result)
+    for user_id, group in groupby(rows, key=itemgetter("user_id")):
+        yield user_id, list(group)
+
+
+def _merged_groups(table: str, live, archived: dict) -> Iterator[tuple[UUID, list[dict]]]:
+    """Live groups merged with an existing segment's rows; live rows win on id."""
+    _, ts_column = ARCHIVED_TABLES[table]
+    for user_id, rows in live:
+        previous = archived.pop(user_id, None)
+        if previous:
+            ids = {row["id"] for row in rows}
+            rows = sorted(
+                [row for row in previous if row["id"] not in ids] + rows,
+                key=itemgetter(ts_column, "id")
+            )
+        yield user_id, rows
+    yield from archived.items()
+
+
+def _month_bounds(month: date) -> tuple[datetime, datetime]:
+    return (
+        datetime.combine(month, datetime.min.time()),
+        datetime.combine(add_months(month, 1), datetime.min.time()),
+    )
+
+
+def _archive_rows(db: Session, table: str, month: date, where) -> int:
+    """Write the live rows matching ``where`` to the segment of ``month``; returns their count."""
+    model_table, _ = ARCHIVED_TABLES[table]
+    count = select(func.count()).select_from(model_table).where(where)
+    live = db.scalar(count)
+    if not live:
+        return 0
+    path = segment_path(table, month)
+    existing = read_segment(table, path) if path.exists() else {}
+    write_segment(table, month, _merged_groups(table, _live_groups(db, table, where), existing))
+    # Rows written to the month since the count stay live until the next run
+    if db.scalar(count) != live:
+        raise RuntimeError(f"{table} rows of {month:%Y-%m} changed while archiving; run again")
+    return live
+
+
+def archive_month(db: Session, month: date) -> dict[str, int]:
+    """Move the checkins and moods of ``month`` to their segments.
+
+    Segments are written first, then the rows are removed from the
+    database: the month's checkins partition is detached and dropped when
+    there is one, other rows are deleted. Rows already in a segment (from
+    an interrupted run, or ingested late) are merged in.
+
+    Moods still referenced by a check-in that stays live are kept. Those
+    of earlier months that no live check-in references any more (their
+    check-in is archived now) go to the segments of their own months.
+    Returns the live rows archived per table; the caller commits.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text(_ARCHIVE_LOCK))
+    start, end = _month_bounds(month)
+    checkins_of_month = and_(Checkin.timestamp >= start, Checkin.timestamp < end)
+    # Check-ins before the month are archived already, those of the month now
+    unreferenced = ~exists().where(Checkin.mood_id == Mood.id, Checkin.timestamp >= end)
+    archived = {"checkins": _archive_rows(db, "checkins", month, checkins_of_month), "moods": 0}
+
+    left_behind = db.scalars(select(Mood.created_at).where(Mood.created_at < start, unreferenced))
+    for mood_month in sorted({month, *(month_start(created_at.date()) for created_at in left_behind)}):
+        mood_start, mood_end = _month_bounds(mood_month)
+        archived["moods"] += _archive_rows(db, "moods", mood_month, and_(
+            Mood.created_at >= mood_start, Mood.created_at < mood_end, unreferenced
+        ))
+
+    # Check-ins first: they reference the moods
+    if archived["checkins"]:
+        if is_partitioned(db) and month in list_partitions(db):
+            detach_partition(db, month, drop=True)
+        db.execute(Checkin.__table__.delete().where(checkins_of_month))
+    if archived["moods"]:
+        db.execute(Mood.__table__.delete().where(Mood.created_at < end, unreferenced))
+    return archived
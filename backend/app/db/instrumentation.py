@@ -0,0 +1,74 @@
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import Scope
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """SQL statements executed on behalf of one request.
+
+    ``shapes`` counts executions per statement text. Statements are
+    compiled with bound parameters, so the text is the same for every
+    row an N+1 loop touches.
+    """
+
+    __slots__ = ("scope", "count", "seconds", "shapes")
+
+    def __init__(self, scope: Optional[Scope] = None):
+        self.scope = scope
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: dict[str, int] = {}
+
+    @property
+    def route(self) -> str:
+        """"METHOD /route/{template}" of the request, once routing has matched."""
+        if self.scope is None:
+            return "-"
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {route.path if route is not None else self.scope['path']}"
+
+    def report_repeats(self, threshold: int) -> None:
+        """Log every statement that ran more than ``threshold`` times."""
+        for statement, runs in self.shapes.items():
+            if runs > threshold:
+                logger.warning(
+                    "Possible N+1 in %s: statement ran %d times: %s",
+                    self.route, runs, " ".join(statement.split())
+                )
+
+
+# Statistics of the request being served, set by QueryTrackingMiddleware.
+# Copied into threadpool workers and run_sync greenlets with the context.
+current_queries: ContextVar[Optional[QueryStats]] = ContextVar("current_queries", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # A connection runs one statement at a time
+    conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop("query_started")
+    stats = current_queries.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.shapes[statement] = stats.shapes.get(statement, 0) + 1
+    if settings.SLOW_QUERY_SECONDS and elapsed >= settings.SLOW_QUERY_SECONDS:
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s",
+            elapsed * 1000, stats.route if stats is not None else "-", " ".join(statement.split())
+        )
+
+
+def instrument(engine: Engine) -> None:
+    """Time every statement of ``engine`` (for an AsyncEngine, pass ``sync_engine``)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import re
+from datetime import date, datetime
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# Monthly range partitions of checkins (PostgreSQL only). Each month is a
+# table named checkins_pYYYYMM covering [first day, first day of next
+# month). checkins_default catches rows outside every monthly partition;
+# it stays empty as long as partitions are created ahead of time.
+PARTITIONED_TABLE = "checkins"
+DEFAULT_PARTITION = "checkins_default"
+PARTITION_NAME = re.compile(r"^checkins_p(\d{4})(\d{2})$")
+
+# Serializes partition maintenance between concurrent runs
+_MAINTENANCE_LOCK = "SELECT pg_advisory_xact_lock(hashtext('checkins_partitions'))"
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITIONED_TABLE}_p{month:%Y%m}"
+
+
+def is_partitioned(db: Session) -> bool:
+    """Whether checkins is a partitioned table on this database."""
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.scalar(text(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"
+    ), {"table": PARTITIONED_TABLE}) or False
+
+
+def list_partitions(db: Session) -> list[date]:
+    """First days of the months that have a partition, oldest first."""
+    names = db.scalars(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid"
+        " WHERE i.inhparent = to_regclass(:table)"
+    ), {"table": PARTITIONED_TABLE})
+    months = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match[1]), int(match[2]), 1))
+    return sorted(months)
+
+
+def create_partition(db: Session, month: date) -> None:
+    """Add the partition of ``month``, moving its rows out of the default one.
+
+    The table is created on its own and then attached, which locks the
+    parent less than ``CREATE TABLE ... PARTITION OF``. Attaching also
+    creates the parent's indexes on it. The caller commits.
+    """
+    name = partition_name(month)
+    bounds = {"start": datetime.combine(month, datetime.min.time()),
+              "end": datetime.combine(add_months(month, 1), datetime.min.time())}
+    db.execute(text(f"CREATE TABLE {name} (LIKE {PARTITIONED_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    in_range = '"timestamp" >= :start AND "timestamp" < :end'
+    if db.scalar(text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})"), bounds):
+        db.execute(text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+        db.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+    # Partition bounds must be literals, not bind parameters
+    db.execute(text(
+        f"ALTER TABLE {PARTITIONED_TABLE} ATTACH PARTITION {name}"
+        f" FOR VALUES FROM ('{bounds['start']:%Y-%m-%d}') TO ('{bounds['end']:%Y-%m-%d}')"
+    ))
+
+
+def ensure_partitions(db: Session, months_ahead: int, since: date = None) -> list[date]:
+    """Create every missing monthly partition from ``since`` to ``months_ahead``.
+
+    ``since`` defaults to the current month. Returns the months created;
+    the caller commits.
+    """
+    db.execute(text(_MAINTENANCE_LOCK))
+    existing = set(list_partitions(db))
+    this_month = month_start(datetime.utcnow().date())
+    month = month_start(since) if since else this_month
+    created = []
+    while month <= add_months(this_month, months_ahead):
+        if month not in existing:
+            create_partition(db, month)
+            created.append(month)
+        month = add_months(month, 1)
+    return created
+
+
+def maintain_partitions(session_factory, months_ahead: int) -> list[date]:
+    """Create the missing partitions up to ``months_ahead``, in a transaction of its own."""
+    with session_factory() as db:
+        if not is_partitioned(db):
+            return []
+        created = ensure_partitions(db, months_ahead)
+        db.commit()
+        return created
+
+
+async def maintain_periodically(session_factory, months_ahead: int, interval: float) -> None:
+    """Run ``maintain_partitions`` every ``interval`` seconds, off the event loop.
+
+    Keeps the next months' partitions in place on servers that run for
+    months without a restart; errors are logged and retried next time.
+    """
+    while True:
+        try:
+            created = await run_in_threadpool(maintain_partitions, session_factory, months_ahead)
+        except Exception as error:
+            logger.warning("Creating checkins partitions failed: %s", error)
+        else:
+            for month in created:
+                logger.info("Created partition for %s", f"{month:%Y-%m}")
+        await asyncio.sleep(interval)
+
+
+def detach_partition(db: Session, month: date, drop: bool = False) -> None:
+    """Detach the partition of ``month``, and drop it with ``drop``. The caller commits."""
+    name = partition_name(month)
+    db.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {name}"))
+    if drop:
+        db.execute(text(f"DROP TABLE {name}"))
+
+
+def retire_partitions(db: Session, before: date, drop: bool = False) -> list[date]:
+    """Detach (and with ``drop``, drop) the partitions of months ending by ``before``.
+
+    A detached partition stays a plain table, out of every query on
+    checkins, until it is archived or dropped. Returns the months retired;
+    the caller commits.
+    """
+    db.execute(text(_MAINTENANCE_LOCK))
+    retired = []
+    for month in list_partitions(db):
+        if add_months(month, 1) > before:
+            break
+        detach_partition(db, month, drop)
+        retired.append(month)
+    return retired
@@ -0,0 +1,170 @@
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# Seconds a replica is behind its primary. On a PostgreSQL standby that has
+# replayed everything it received, the last replay time only shows how long
+# the primary has been idle, so that counts as no lag. Databases without
+# replication (SQLite files standing in for replicas) report none.
+LAG_QUERIES = {
+    "postgresql": """
+        SELECT CASE
+            WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+        END
+    """,
+}
+DEFAULT_LAG_QUERY = "SELECT 0"
+
+# Recent writers remembered per process before expired ones are pruned
+MAX_TRACKED_WRITERS = 10000
+
+
+class RoutingSession(Session):
+    """Session that reads from the replica engine in ``info["replica"]``, if any.
+
+    Flushes and INSERT/UPDATE/DELETE statements always go to the primary,
+    so a session handed to a read-only endpoint cannot write to a replica.
+    After its first write the session reads from the primary too, so it
+    sees what it wrote.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        replica = self.info.get("replica")
+        if replica is not None and (self._flushing or isinstance(clause, UpdateBase)):
+            del self.info["replica"]
+            replica = None
+        if replica is None:
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        return replica
+
+
+class Replica:
+    """One read replica, its engines and its last health check."""
+
+    def __init__(self, name: str, engine: Engine, async_engine: Optional[AsyncEngine] = None):
+        self.name = name
+        self.engine = engine
+        self.async_engine = async_engine
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def bind_for(self, db) -> Engine:
+        """The engine a ``RoutingSession`` (or ``AsyncSession``) reads through."""
+        if isinstance(db, AsyncSession):
+            return self.async_engine.sync_engine
+        return self.engine
+
+    def check(self) -> None:
+        """Measure the replication lag; any error marks the replica unhealthy."""
+        query = LAG_QUERIES.get(self.engine.dialect.name, DEFAULT_LAG_QUERY)
+        try:
+            with self.engine.connect() as connection:
+                self.lag = float(connection.scalar(text(query)))
+            self.healthy, self.error = True, None
+        except Exception as error:
+            if self.healthy or self.checked_at is None:
+                logger.warning("Replica %s failed its health check: %s", self.name, error)
+            self.healthy, self.lag, self.error = False, None, str(error)
+        self.checked_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "url": self.engine.url.render_as_string(hide_password=True),
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "checked_seconds_ago": (
+                time.monotonic() - self.checked_at if self.checked_at is not None else None
+            ),
+            "error": self.error,
+        }
+
+
+class ReplicaSet:
+    """Read replicas in rotation, with read-your-writes pinning.
+
+    A replica serves reads while its last check, at most three intervals
+    old, found it reachable and no more than ``max_lag`` seconds behind.
+    Reads rotate over those replicas and fall back to the primary when
+    there are none.
+
+    A user who wrote within ``max_lag`` plus one check interval reads from
+    the primary, so they see their own writes. Writes are remembered per
+    process: with several workers, a read served by another worker may
+    lag by up to ``max_lag`` seconds.
+    """
+
+    def __init__(self, replicas: list[Replica], max_lag: float, check_interval: float):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.pin_seconds = max_lag + check_interval
+        self._rotation = itertools.count()
+        self._writes: dict[UUID, float] = {}
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def note_write(self, user_id: UUID) -> None:
+        """Read from the primary for this user until replicas have caught up."""
+        now = time.monotonic()
+        with self._lock:
+            self._writes[user_id] = now
+            if len(self._writes) > MAX_TRACKED_WRITERS:
+                self._writes = {
+                    user: at for user, at in self._writes.items() if now - at < self.pin_seconds
+                }
+
+    def choose(self, user_id: Optional[UUID] = None) -> Optional[Replica]:
+        """A replica to read from, or None to read from the primary."""
+        now = time.monotonic()
+        written = self._writes.get(user_id) if user_id is not None else None
+        if written is not None and now - written < self.pin_seconds:
+            return None
+        eligible = [
+            replica for replica in self.replicas
+            if replica.healthy
+            and replica.lag <= self.max_lag
+            and now - replica.checked_at <= 3 * self.check_interval
+        ]
+        if not eligible:
+            return None
+        return eligible[next(self._rotation) % len(eligible)]
+
+    def check(self) -> None:
+        for replica in self.replicas:
+            replica.check()
+
+    async def check_periodically(self) -> None:
+        """Health-check every replica each interval, off the event loop."""
+        while True:
+            await run_in_threadpool(self.check)
+            await asyncio.sleep(self.check_interval)
+
+    def stats(self) -> dict:
+        return {
+            "max_lag_seconds": self.max_lag,
+            "replicas": [replica.stats() for replica in self.replicas],
+        }
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            if replica.async_engine is not None:
+                await replica.async_engine.dispose()
@@ -1,24 +1,189 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from typing import Union
+from uuid import uuid4
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.core.metrics import timed_pool
+from app.db.instrumentation import instrument
+from app.db.replicas import Replica, ReplicaSet, RoutingSession
 
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=settings.SQLALCHEMY_ECHO,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
+# Either session flavour, depending on settings.DATABASE_ASYNC
+DBSession = Union[Session, AsyncSession]
+
+# asyncio DBAPI driver to use for each sync backend
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_url(database_url: str) -> URL:
+    """Swap the sync driver in a database URL for its asyncio counterpart."""
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name())
+    if drivername is None:
+        raise ValueError(f"No async driver configured for '{url.get_backend_name()}'")
+    return url.set(drivername=drivername)
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def engine_options(url: URL, name: str) -> dict:
+    """``create_engine`` arguments for the configured pooling strategy.
+
+    - ``queue``: a QueuePool of DATABASE_POOL_SIZE (+ DATABASE_MAX_OVERFLOW)
+      connections per engine and worker, checked by pre-ping and/or
+      replaced after DATABASE_POOL_RECYCLE_SECONDS
+    - ``null``: a new connection per checkout, closed on return
+    - ``pgbouncer``: ``null``, plus no session state that a transaction
+      pooler could hand to another client: asyncpg's prepared statement
+      caches are off and statement names are unique
+
+    DATABASE_STATEMENT_TIMEOUT_MS is set on PostgreSQL connections when
+    they open, except behind PgBouncer (see ``set_statement_timeout``).
+    """
+    asyncio = url.get_dialect().is_async
+    options = {"echo": settings.SQLALCHEMY_ECHO}
+    connect_args = {}
+    if settings.DATABASE_POOL == "queue":
+        options.update(
+            poolclass=timed_pool(AsyncAdaptedQueuePool if asyncio else QueuePool, name),
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT_SECONDS,
+            pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
+        )
+    else:
+        options["poolclass"] = timed_pool(NullPool, name)
+    if settings.DATABASE_POOL == "pgbouncer" and url.drivername == "postgresql+asyncpg":
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=_unique_statement_name,
+        )
+    timeout = settings.DATABASE_STATEMENT_TIMEOUT_MS
+    if timeout and url.get_backend_name() == "postgresql" and settings.DATABASE_POOL != "pgbouncer":
+        if asyncio:
+            connect_args["server_settings"] = {"statement_timeout": str(timeout)}
+        else:
+            connect_args["options"] = f"-c statement_timeout={timeout}"
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def set_statement_timeout(sync_engine: Engine) -> None:
+    """Behind PgBouncer, apply the statement timeout to each transaction.
+
+    PgBouncer rejects the startup option, and a session-level SET would
+    leak to other clients of the server connection. ``SET LOCAL`` costs a
+    round trip per transaction; a timeout set on the database role is free.
+    """
+    timeout = settings.DATABASE_STATEMENT_TIMEOUT_MS
+
+    @event.listens_for(sync_engine, "begin")
+    def begin(connection):
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+
+
+def create_engines(url: str, name: str = "") -> tuple:
+    """Sync engine and, with DATABASE_ASYNC, async engine for a database URL.
+
+    ``name`` prefixes the pool names in the metrics.
+    """
+    sync_url = make_url(url)
+    sync_engine = create_engine(sync_url, **engine_options(sync_url, f"{name}sync"))
+    asyncio_engine = None
+    if settings.DATABASE_ASYNC:
+        async_url = get_async_url(url)
+        asyncio_engine = create_async_engine(async_url, **engine_options(async_url, f"{name}async"))
+    for created in (sync_engine, asyncio_engine and asyncio_engine.sync_engine):
+        if created is None:
+            continue
+        instrument(created)
+        if (
+            settings.DATABASE_POOL == "pgbouncer"
+            and settings.DATABASE_STATEMENT_TIMEOUT_MS
+            and created.dialect.name == "postgresql"
+        ):
+            set_statement_timeout(created)
+    return sync_engine, asyncio_engine
+
+
+# Create database engine (the primary; async_engine is None unless DATABASE_ASYNC)
+engine, async_engine = create_engines(settings.DATABASE_URL)
+
+# Read replicas, used by read-only endpoints through get_read_db
+replicas = ReplicaSet(
+    [
+        Replica(f"replica{index}", *create_engines(url, f"replica{index}-"))
+        for index, url in enumerate(settings.DATABASE_REPLICA_URLS, start=1)
+    ],
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_CHECK_SECONDS,
 )
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+
+# Async session factory (used by the API when DATABASE_ASYNC is on)
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False
+    )
+
+
+async def ping_database() -> None:
+    """Run a trivial query on the primary; raises if it does not answer."""
+    if async_engine is not None:
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        return
+
+    def ping():
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    await run_in_threadpool(ping)
 
 
-def get_db():
-    """Dependency for getting a database session."""
+async def release_connection(db: DBSession) -> None:
+    """Hand the session's connection back to the pool ahead of a long wait.
+
+    The session stays usable: its next statement checks a connection out
+    again. Loaded objects are detached; ``db.add`` (as the CRUD updates
+    do) attaches them again.
+    """
+    if isinstance(db, AsyncSession):
+        await db.close()
+    else:
+        await run_in_threadpool(db.close)
+
+
+def get_sync_db():
+    """Dependency for getting a blocking database session."""
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency for getting an asyncio database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependency for getting a database session
+get_db = get_async_db if settings.DATABASE_ASYNC else get_sync_db
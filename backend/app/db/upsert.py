@@ -0,0 +1,17 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# INSERT constructs that support ON CONFLICT ... DO UPDATE
+DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def upsert(db: Session, table):
+    """Return an INSERT for table that supports ``on_conflict_do_update``."""
+    dialect = db.get_bind().dialect.name
+    try:
+        return DIALECT_INSERTS[dialect](table)
+    except KeyError:
+        raise NotImplementedError(f"Upsert is not supported on '{dialect}'")
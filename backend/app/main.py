@@ -1,38 +1,72 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from app.core.config import settings
+from app.core.cache import team_analytics_cache, team_presence_cache, user_cache
+from app.core.security import token_cache
+from app.core.hashing import password_hasher
+from app.core.metrics import CONTENT_TYPE, collect, flush_periodically, pool_stats
+from app.middleware.admission import AdmissionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.queries import QueryTrackingMiddleware
+from app.utils.pagination import NEXT_CURSOR_HEADER
 from app.api.v1.endpoints import auth, checkins, users, teams, goals
-from app.db.session import engine
-from app.models import Base
-
-# Create database tables (handle race conditions in multi-worker deployments)
-try:
-    # Check if any table exists before attempting to create all
-    from sqlalchemy import inspect
-    inspector = inspect(engine)
-    if not inspector.get_table_names():
-        # No tables exist, create all
-        Base.metadata.create_all(bind=engine)
-except Exception as e:
-    # Tables may already exist or other issues, continue anyway
-    print(f"Database initialization note: {str(e)}")
+from app.db.partitions import maintain_periodically
+from app.db.session import SessionLocal, async_engine, ping_database, replicas
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown."""
+    tasks = []
+    if settings.METRICS_ENABLED and settings.METRICS_DIR:
+        tasks.append(asyncio.create_task(flush_periodically()))
+    if replicas:
+        tasks.append(asyncio.create_task(replicas.check_periodically()))
+    if settings.PARTITION_CHECK_SECONDS > 0:
+        tasks.append(asyncio.create_task(maintain_periodically(
+            SessionLocal, settings.PARTITION_MONTHS_AHEAD, settings.PARTITION_CHECK_SECONDS
+        )))
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    password_hasher.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+    await replicas.dispose()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="Check-in/Check-out System API",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-# CORS middleware (must be added before other middleware)
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+app.add_middleware(QueryTrackingMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# CORS middleware (added last, so it wraps the others: shed 503s carry its headers too)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
@@ -43,6 +77,56 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/ready", tags=["Health"])
+async def readiness_check(response: Response):
+    """Whether this worker can reach the primary database, with its pool statistics.
+
+    Responds 503 when the database does not answer, so load balancers
+    stop routing here. Statistics are per worker and per engine.
+    """
+    state = "ready"
+    try:
+        await ping_database()
+    except Exception as error:
+        logger.warning("Readiness check failed: %s", error)
+        response.status_code = 503
+        state = "unavailable"
+    return {
+        "status": state,
+        "pool": settings.DATABASE_POOL,
+        "pools": pool_stats(),
+    }
+
+
+@app.get("/health/cache", tags=["Health"])
+def cache_stats():
+    """Hit/miss counters for the in-process caches."""
+    return {
+        "user": user_cache.stats(),
+        "token": token_cache.stats(),
+        "team_presence": team_presence_cache.stats(),
+        "team_analytics": team_analytics_cache.stats(),
+    }
+
+
+@app.get("/health/hashing", tags=["Health"])
+def hashing_stats():
+    """Queue depth and wait time of the password hashing pool."""
+    return password_hasher.stats()
+
+
+@app.get("/health/replicas", tags=["Health"])
+def replica_stats():
+    """Health and replication lag of the read replicas, as last checked."""
+    return replicas.stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request, latency and connection pool metrics in Prometheus text format."""
+    return Response(content=await collect(), media_type=CONTENT_TYPE)
+
+
 # Root endpoint
 @app.get("/", tags=["Root"])
 def root():
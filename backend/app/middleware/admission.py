@@ -0,0 +1,80 @@
+import math
+from time import perf_counter
+from typing import Optional
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.admission import Overloaded, RouteLimiter
+from app.core.config import settings
+
+API_PREFIX = "/api/"
+AUTH_PREFIX = "/api/v1/auth/"
+READ_METHODS = ("GET", "HEAD")
+
+# Route classes, each with its own limits in the ADMISSION_* settings
+ROUTE_CLASSES = ("auth", "write", "read", "export")
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    """Class of a request, or None when it is never throttled.
+
+    Decided from the raw path, since routing has not run yet: login,
+    registration and token refresh are "auth" (bcrypt-bound), CSV exports
+    are "export" (long streams), and the rest of the API is "read" or
+    "write" by method. Health checks, metrics, docs and CORS preflights
+    are exempt.
+    """
+    if not path.startswith(API_PREFIX) or method == "OPTIONS":
+        return None
+    if path.startswith(AUTH_PREFIX):
+        return "auth"
+    if path.endswith("/export"):
+        return "export"
+    return "read" if method in READ_METHODS else "write"
+
+
+class AdmissionMiddleware:
+    """Per route class concurrency limits with early load shedding.
+
+    Requests of a class beyond its ADMISSION_CONCURRENCY wait in a queue of
+    at most ADMISSION_QUEUE_SIZE, for at most ADMISSION_MAX_WAIT_SECONDS.
+    Requests that would wait longer are answered 503 with Retry-After right
+    away, so a login storm or a burst of exports cannot take the capacity
+    that check-ins need. The slot is held until the response is fully sent,
+    streamed exports included. Limits apply per worker process.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.limiters = {
+            name: RouteLimiter(
+                name,
+                settings.ADMISSION_CONCURRENCY[name],
+                settings.ADMISSION_QUEUE_SIZE[name],
+                settings.ADMISSION_MAX_WAIT_SECONDS[name],
+            )
+            for name in ROUTE_CLASSES
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        name = route_class(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[name]
+        try:
+            await limiter.acquire()
+        except Overloaded as exc:
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry later"},
+                status_code=503,
+                headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(perf_counter() - started)
@@ -0,0 +1,51 @@
+from time import perf_counter
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import request_metrics
+
+
+class MetricsMiddleware:
+    """Records latency, response size and status of every HTTP request.
+
+    A plain ASGI middleware rather than ``BaseHTTPMiddleware``, so it adds
+    no task or stream per request. Requests are labelled with the path
+    template of the route that served them (``/api/v1/checkins/{checkin_id}``,
+    not the raw path) and "unmatched" when no route matched, which keeps
+    the number of series bounded. Latency runs until the last body chunk
+    is sent, so streamed responses count in full.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500  # unless the app gets as far as starting a response
+        size = 0
+
+        async def send_and_measure(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            else:
+                size += len(message.get("body", b""))
+            await send(message)
+
+        metrics = request_metrics
+        metrics.in_flight += 1
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            elapsed = perf_counter() - started
+            metrics.in_flight -= 1
+            route = scope.get("route")
+            metrics.observe(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status,
+                elapsed,
+                size
+            )
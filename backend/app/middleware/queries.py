@@ -0,0 +1,45 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.db.instrumentation import QueryStats, current_queries
+
+# Debug response headers: statements run and their total time in milliseconds
+DB_QUERIES_HEADER = "X-DB-Queries"
+DB_TIME_HEADER = "X-DB-Time"
+
+
+class QueryTrackingMiddleware:
+    """Attributes the SQL statements of each HTTP request to that request.
+
+    Statements slower than SLOW_QUERY_SECONDS are logged with the route as
+    they finish. When the response is done, any statement that ran more
+    than N_PLUS_ONE_THRESHOLD times is logged as a likely N+1. With
+    SQL_DEBUG_HEADERS on, the count and time so far are added to the
+    response headers (statements run while a body streams are not in them).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (DB_QUERIES_HEADER.lower().encode(), str(stats.count).encode()),
+                    (DB_TIME_HEADER.lower().encode(), f"{stats.seconds * 1000:.1f}".encode()),
+                ]
+            await send(message)
+
+        token = current_queries.set(stats)
+        try:
+            await self.app(scope, receive, send_with_headers if settings.SQL_DEBUG_HEADERS else send)
+        finally:
+            current_queries.reset(token)
+            if settings.N_PLUS_ONE_THRESHOLD:
+                stats.report_repeats(settings.N_PLUS_ONE_THRESHOLD)
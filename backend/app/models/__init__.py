@@ -1,5 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, func, Float, Integer, ForeignKey, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Date, DateTime, Boolean, func, Float, Integer, ForeignKey, UniqueConstraint, Index, Uuid, DDL, event
 from sqlalchemy.orm import declarative_base, relationship
 import uuid
 from datetime import datetime
@@ -10,7 +9,7 @@ Base = declarative_base()
 class User(Base):
     __tablename__ = "users"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String(255), unique=True, nullable=False, index=True)
     hashed_password = Column(String(255), nullable=False)
     full_name = Column(String(255))
@@ -31,11 +30,11 @@ class User(Base):
 class Team(Base):
     __tablename__ = "teams"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
     code = Column(String(10), unique=True, nullable=False)
     description = Column(String(500), nullable=True)
-    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    created_by = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -49,9 +48,9 @@ class TeamMember(Base):
     __tablename__ = "team_members"
     __table_args__ = (UniqueConstraint("user_id", "team_id", name="unique_user_team"),)
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    team_id = Column(UUID(as_uuid=True), ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    team_id = Column(Uuid(as_uuid=True), ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
     role = Column(String(50), default="member")  # 'owner', 'manager', 'member'
     joined_at = Column(DateTime, default=datetime.utcnow)
     
@@ -61,12 +60,21 @@ class TeamMember(Base):
 
 
 class Checkin(Base):
+    """A check-in or check-out event.
+
+    On PostgreSQL the table is range-partitioned by month on ``timestamp``
+    (see ``app.db.partitions``), which is why ``timestamp`` is part of the
+    primary key. Nothing in the database keeps ``id`` unique on its own
+    any more (a unique index on a partitioned table must include the
+    partition key); that relies on ids being random UUIDs.
+    """
     __tablename__ = "checkins"
+    __table_args__ = {"postgresql_partition_by": "RANGE (timestamp)"}
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     status = Column(String(20), nullable=False)  # 'checked_in', 'checked_out'
-    timestamp = Column(DateTime, nullable=False, index=True)
+    timestamp = Column(DateTime, primary_key=True, nullable=False, index=True)
     location_latitude = Column(Float, nullable=True)
     location_longitude = Column(Float, nullable=True)
     location_name = Column(String(255), nullable=True)
@@ -76,8 +84,8 @@ class Checkin(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Foreign keys
-    mood_id = Column(UUID(as_uuid=True), ForeignKey("moods.id", ondelete="SET NULL"), nullable=True)
-    goal_id = Column(UUID(as_uuid=True), ForeignKey("goals.id", ondelete="SET NULL"), nullable=True)
+    mood_id = Column(Uuid(as_uuid=True), ForeignKey("moods.id", ondelete="SET NULL"), nullable=True)
+    goal_id = Column(Uuid(as_uuid=True), ForeignKey("goals.id", ondelete="SET NULL"), nullable=True)
     
     # Relationships
     user = relationship("User", back_populates="checkins")
@@ -85,11 +93,55 @@ class Checkin(Base):
     goal = relationship("Goal", back_populates="checkins")
 
 
+class UserPresence(Base):
+    """Current check-in state of a user, maintained on every check-in/out.
+
+    ``open_checkin_id`` deliberately has no foreign key: the row is derived
+    data and is rebuilt from ``checkins`` by ``python -m app.commands
+    rebuild-presence``.
+    """
+    __tablename__ = "user_presence"
+    
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String(20), nullable=False)  # 'checked_in', 'checked_out'
+    open_checkin_id = Column(Uuid(as_uuid=True), nullable=True)
+    checked_in_at = Column(DateTime, nullable=True)  # timestamp of the open check-in
+    last_transition_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class DailyUserStats(Base):
+    """Per-user, per-day (UTC) rollup of check-ins and moods.
+
+    Upserted incrementally alongside every check-in, check-out and mood.
+    Like ``user_presence`` it is derived data and is rebuilt from the raw
+    tables by ``python -m app.commands backfill-daily-stats``.
+    """
+    __tablename__ = "daily_user_stats"
+    
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    checkin_count = Column(Integer, nullable=False, default=0)
+    checkout_count = Column(Integer, nullable=False, default=0)
+    worked_minutes = Column(Integer, nullable=False, default=0)
+    first_in = Column(DateTime, nullable=True)
+    last_out = Column(DateTime, nullable=True)
+    mood_count = Column(Integer, nullable=False, default=0)
+    mood_sum = Column(Integer, nullable=False, default=0)  # average is mood_sum / mood_count
+    mood_min = Column(Integer, nullable=True)
+    mood_max = Column(Integer, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @property
+    def mood_avg(self) -> float | None:
+        return self.mood_sum / self.mood_count if self.mood_count else None
+
+
 class Mood(Base):
     __tablename__ = "moods"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     mood_level = Column(Integer, nullable=False)  # 1-5 scale
     emotion = Column(String(50), nullable=True)  # 'happy', 'stressed', 'focused', 'tired', 'neutral'
     notes = Column(String(500), nullable=True)
@@ -103,8 +155,8 @@ class Mood(Base):
 class Goal(Base):
     __tablename__ = "goals"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     title = Column(String(255), nullable=False)
     description = Column(String(1000), nullable=True)
     is_completed = Column(Boolean, default=False)
@@ -115,3 +167,32 @@ class Goal(Base):
     # Relationships
     user = relationship("User", back_populates="goals")
     checkins = relationship("Checkin", back_populates="goal")
+
+
+# A partitioned table needs somewhere for rows outside the monthly partitions
+event.listen(
+    Checkin.__table__,
+    "after_create",
+    DDL("CREATE TABLE checkins_default PARTITION OF checkins DEFAULT").execute_if(dialect="postgresql"),
+)
+
+
+# Composite indexes for the hot paths (see migrations/versions/0002)
+Index("ix_team_members_team_id_joined_at", TeamMember.team_id, TeamMember.joined_at, TeamMember.id)
+Index("ix_checkins_user_id_timestamp", Checkin.user_id, Checkin.timestamp.desc(), Checkin.id.desc())
+Index(
+    "ix_checkins_open_by_user",
+    Checkin.user_id,
+    Checkin.timestamp.desc(),
+    postgresql_where=Checkin.status == "checked_in",
+    sqlite_where=Checkin.status == "checked_in",
+)
+Index("ix_moods_user_id_created_at", Mood.user_id, Mood.created_at.desc(), Mood.id.desc())
+Index("ix_goals_user_id_created_at", Goal.user_id, Goal.created_at.desc(), Goal.id.desc())
+Index(
+    "ix_goals_user_id_is_completed_created_at",
+    Goal.user_id,
+    Goal.is_completed,
+    Goal.created_at.desc(),
+    Goal.id.desc(),
+)
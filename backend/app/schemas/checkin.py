@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, Field, field_validator
+from typing import Literal, Optional
+from datetime import date, datetime, timezone
 from uuid import UUID
 
 
@@ -130,4 +130,66 @@ class DailyStatsResponse(BaseModel):
     is_checked_in: bool
     latest_checkin: Optional[CheckinResponse] = None
     total_duration_minutes: int
+    first_in: Optional[datetime] = None
+    last_out: Optional[datetime] = None
+    mood_min: Optional[int] = None
+    mood_avg: Optional[float] = None
+    mood_max: Optional[int] = None
     mood_history: list[MoodResponse] = []
+
+
+class DaySummaryResponse(BaseModel):
+    day: date
+    checkin_count: int
+    checkout_count: int
+    worked_minutes: int
+    first_in: Optional[datetime]
+    last_out: Optional[datetime]
+    mood_min: Optional[int]
+    mood_avg: Optional[float]
+    mood_max: Optional[int]
+    
+    class Config:
+        from_attributes = True
+
+
+class SummaryResponse(BaseModel):
+    start: date
+    end: date
+    days_worked: int
+    total_checkins: int
+    total_duration_minutes: int
+    mood_avg: Optional[float] = None
+    days: list[DaySummaryResponse] = []
+
+
+class CheckinEvent(BaseModel):
+    """One check-in/out event of a bulk ingestion batch."""
+    user_id: UUID
+    status: Literal["checked_in", "checked_out"]
+    timestamp: datetime
+    location_latitude: Optional[float] = None
+    location_longitude: Optional[float] = None
+    location_name: Optional[str] = Field(None, max_length=255)
+    notes: Optional[str] = Field(None, max_length=1000)
+    
+    @field_validator("timestamp")
+    @classmethod
+    def to_naive_utc(cls, value: datetime) -> datetime:
+        """Store timestamps as naive UTC, like the rest of the API."""
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
+class IngestError(BaseModel):
+    line: int
+    error: str
+
+
+class IngestResponse(BaseModel):
+    received: int
+    inserted: int
+    rejected: int
+    errors: list[IngestError] = []
+    errors_truncated: bool = False
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
 
 
@@ -13,6 +13,73 @@ class TeamMemberResponse(BaseModel):
         from_attributes = True
 
 
+class TeamMemberProfileResponse(TeamMemberResponse):
+    email: str
+    full_name: Optional[str]
+    avatar_url: Optional[str]
+    timezone: Optional[str] = None
+    is_active: Optional[bool] = None
+
+
+class MemberPresenceResponse(BaseModel):
+    user_id: UUID
+    full_name: Optional[str]
+    avatar_url: Optional[str]
+    role: str
+    status: str  # 'checked_in', 'checked_out'
+    last_transition_at: Optional[datetime]
+    last_checkin_at: Optional[datetime]
+    location_name: Optional[str]
+    mood_level: Optional[int]
+    emotion: Optional[str]
+    mood_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+
+class TeamPresenceResponse(BaseModel):
+    team_id: UUID
+    checked_in_count: int
+    members: List[MemberPresenceResponse]
+
+
+class PeriodStatsResponse(BaseModel):
+    period_start: date
+    worked_hours: float
+    days_worked: int
+    attendance_rate: Optional[float]
+    mood_avg: Optional[float]
+
+
+class TeamPeriodStatsResponse(BaseModel):
+    period_start: date
+    worked_hours: float
+    active_members: int
+    attendance_rate: Optional[float]
+    mood_avg: Optional[float]
+
+
+class MemberAnalyticsResponse(BaseModel):
+    user_id: UUID
+    full_name: Optional[str]
+    worked_hours: float
+    days_worked: int
+    attendance_rate: Optional[float]
+    mood_avg: Optional[float]
+    periods: List[PeriodStatsResponse] = []
+
+
+class TeamAnalyticsResponse(BaseModel):
+    team_id: UUID
+    start: date
+    end: date
+    granularity: str  # 'week', 'month'
+    team_size: int
+    periods: List[TeamPeriodStatsResponse] = []
+    members: List[MemberAnalyticsResponse] = []
+
+
 class TeamCreate(BaseModel):
     name: str
     description: Optional[str] = None
@@ -32,7 +99,7 @@ class TeamResponse(BaseModel):
     code: str
     description: Optional[str]
     created_by: UUID
-    is_active: bool
+    is_active: Optional[bool] = None
     created_at: datetime
     updated_at: datetime
     
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import AsyncIterator, Callable, Iterable, Optional
+from uuid import UUID
+from sqlalchemy import Row
+from starlette.concurrency import run_in_threadpool
+
+# Rows fetched from the server-side cursor and encoded per chunk
+PARTITION_SIZE = 1000
+
+# Response media type per export format
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _plain(value):
+    """JSON/CSV representation of a column value."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def export_filename(name: str, fmt: str, start: Optional[date], end: Optional[date]) -> str:
+    """Attachment filename such as ``checkins-2024-01-01-2024-01-31.csv``."""
+    parts = [name] + [day.isoformat() for day in (start, end) if day is not None]
+    return f"{'-'.join(parts)}.{fmt}"
+
+
+async def with_archived(
+    partitions: AsyncIterator[list[Row]],
+    users: list,
+    load: Callable[[object], list[tuple]]
+) -> AsyncIterator[list]:
+    """Interleave archived rows into a live export grouped by user.
+
+    ``partitions`` yields live rows ordered by ``user_id``, ``users`` (with
+    an ``id``) are in the same order, and ``load(user)`` returns a user's
+    archived rows, read in the threadpool. They come right before that
+    user's live rows, which are all newer.
+    """
+    pending = list(reversed(users))
+    async for partition in partitions:
+        merged = []
+        for row in partition:
+            while pending and pending[-1].id <= row.user_id:
+                merged += await run_in_threadpool(load, pending.pop())
+            merged.append(row)
+        yield merged
+    while pending:
+        rows = await run_in_threadpool(load, pending.pop())
+        if rows:
+            yield rows
+
+
+async def encode_rows(
+    partitions: AsyncIterator[list[Row]],
+    columns: Iterable[str],
+    fmt: str
+) -> AsyncIterator[str]:
+    """Encode row partitions as CSV (with a header) or NDJSON, one chunk each."""
+    columns = list(columns)
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield buffer.getvalue()
+        async for partition in partitions:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_plain(value) for value in row] for row in partition)
+            yield buffer.getvalue()
+        return
+
+    async for partition in partitions:
+        yield "".join(
+            json.dumps(dict(zip(columns, map(_plain, row)))) + "\n" for row in partition
+        )
@@ -0,0 +1,137 @@
+import csv
+import json
+from collections import deque
+from typing import AsyncIterator, Optional
+from pydantic import TypeAdapter, ValidationError
+
+# Accepted Content-Type values, by parser
+FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+
+
+def ingest_format(content_type: Optional[str]) -> Optional[str]:
+    """Parser name for a request Content-Type, or None if unsupported."""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return FORMATS.get(media_type)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a stream of body chunks into lines without buffering the body."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+class _LineFeed:
+    """Body lines waiting for the CSV reader, which pulls them as it needs them.
+
+    Unlike a generator the feed can run dry and be refilled, so a single
+    reader parses the whole body, quoted line breaks included.
+    """
+
+    def __init__(self):
+        self.pending: deque[tuple[int, str]] = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.pending:
+            raise StopIteration
+        return self.pending.popleft()[1]
+
+
+async def iter_records(
+    chunks: AsyncIterator[bytes],
+    fmt: str
+) -> AsyncIterator[tuple[int, Optional[dict], Optional[str]]]:
+    """Parse NDJSON or CSV (with a header row) into ``(line, record, error)``.
+
+    Exactly one of ``record`` and ``error`` is set. Blank lines are skipped,
+    and empty CSV cells are left out of the record. A CSV record whose
+    quoted fields span several lines is reported by its first line.
+    """
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    header = None
+    quotes = 0
+    line_no = 0
+    async for raw in iter_lines(chunks):
+        line_no += 1
+        try:
+            text = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            yield line_no, None, "Line is not valid UTF-8"
+            continue
+        if not quotes and not text.strip():
+            continue
+
+        if fmt == "ndjson":
+            try:
+                record = json.loads(text)
+            except ValueError:
+                yield line_no, None, "Invalid JSON"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "Expected a JSON object"
+                continue
+            yield line_no, record, None
+            continue
+
+        # Quotes pair up within a record, so an odd count means a quoted
+        # field is still open and the reader must wait for more lines
+        feed.pending.append((line_no, text + "\n"))
+        quotes += text.count('"')
+        if quotes % 2:
+            continue
+        quotes = 0
+        while feed.pending:
+            first_line = feed.pending[0][0]
+            values = next(reader)
+            if not values:
+                continue
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            if len(values) != len(header):
+                yield first_line, None, f"Expected {len(header)} columns, got {len(values)}"
+                continue
+            yield first_line, {name: value for name, value in zip(header, values) if value != ""}, None
+
+    if feed.pending:
+        yield feed.pending[0][0], None, "Unterminated quoted field"
+
+
+def validate_batch(
+    adapter: TypeAdapter,
+    batch: list[tuple[int, dict]]
+) -> tuple[list[tuple[int, object]], list[tuple[int, str]]]:
+    """Validate ``(line, record)`` pairs with one list-level Pydantic call.
+
+    Returns the valid ``(line, model)`` pairs and ``(line, message)`` errors.
+    Only when the batch has errors are the remaining rows validated again.
+    """
+    records = [record for _, record in batch]
+    try:
+        models = adapter.validate_python(records)
+    except ValidationError as exc:
+        messages = {}
+        for error in exc.errors():
+            index, *field = error["loc"]
+            location = ".".join(str(part) for part in field)
+            messages.setdefault(index, f"{location}: {error['msg']}" if location else error["msg"])
+        remaining = [i for i in range(len(batch)) if i not in messages]
+        models = adapter.validate_python([records[i] for i in remaining])
+        return (
+            [(batch[i][0], model) for i, model in zip(remaining, models)],
+            [(batch[i][0], message) for i, message in sorted(messages.items())],
+        )
+    return [(line, model) for (line, _), model in zip(batch, models)], []
@@ -0,0 +1,42 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from fastapi import Response
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+Cursor = tuple[datetime, UUID]
+
+
+def encode_cursor(sort_value: datetime, row_id: UUID) -> str:
+    """Encode the (sort value, id) of a row as an opaque cursor token."""
+    raw = json.dumps([sort_value.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """Decode a cursor token; raises ValueError if it is malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), UUID(row_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def paginate(response: Response, rows: list, limit: int, sort_attr: str) -> list:
+    """Trim a page fetched with ``limit + 1`` rows and set the next cursor.
+
+    The extra row only tells us whether another page exists; the cursor
+    points at the last row actually returned.
+    """
+    page = rows[:limit]
+    if len(rows) > limit:
+        last = page[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            getattr(last, sort_attr), last.id
+        )
+    return page
@@ -0,0 +1,28 @@
+from typing import Any, Optional
+from fastapi import Response
+from pydantic import TypeAdapter
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def json_response(
+    adapter: TypeAdapter,
+    data: Any,
+    response: Optional[Response] = None,
+    status_code: int = 200
+) -> Response:
+    """Validate ``data`` with a prebuilt adapter and render it to JSON bytes.
+
+    Validation and encoding both run in pydantic-core, and the returned
+    Response bypasses the ``response_model`` pass FastAPI would otherwise
+    make (validate, dump to a JSON-compatible dict, then encode that dict).
+    Headers set on the endpoint's ``response`` parameter, such as the next
+    page cursor, are carried over.
+    """
+    body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type=JSON_MEDIA_TYPE,
+        headers=dict(response.headers) if response is not None else None
+    )
@@ -0,0 +1,371 @@
+"""Load test: the API hot paths under realistic traffic, as machine-readable results.
+
+Seeds users (one shared password hash) and check-in history, then runs
+these scenarios against the real FastAPI app:
+
+- ``checkin_burst``: every user checks in, with a mood, at once
+- ``dashboard_polling``: every user polls ``GET /checkins/today`` repeatedly
+- ``login_storm``: users log in concurrently (bcrypt in the hashing pool)
+- ``overload``: a login storm while every user checks out and polls
+  ``/today``, showing whether logins degrade the check-in path
+- ``history_paging``: users with long histories walk every cursor page
+  of ``GET /checkins``
+
+Requests go through ``httpx.AsyncClient``, in-process over ASGI by
+default, or to a running server with ``--url`` (then ``--database-url``
+must point at that server's database, with the schema in place). Each
+endpoint reports requests, errors, status codes, throughput and
+p50/p95/p99/max latency. The JSON goes to stdout or ``--output``, and a
+summary table goes to stderr. With ``--baseline`` a previous JSON result
+is compared per endpoint. The run exits non-zero when p95 or throughput
+is worse than the baseline by more than ``--tolerance``.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_api_load [--users N] [--concurrency N] \\
+        [--output results.json] [--baseline previous.json]
+
+Defaults to an in-process app on a throwaway SQLite file. Point
+``--database-url`` at an empty Postgres database for production-like
+numbers.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+PASSWORD = "load-test-password"
+
+
+class Recorder:
+    """Latency and status of every request, per endpoint label."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.elapsed = {}
+
+    async def request(self, client, label: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = response.status_code
+        except Exception as exc:  # transport failure: count it, keep going
+            response, status = None, type(exc).__name__
+        self.latencies[label].append(time.perf_counter() - started)
+        self.statuses[label][status] += 1
+        return response
+
+    def results(self) -> dict:
+        results = {}
+        for label, latencies in self.latencies.items():
+            ordered = sorted(latencies)
+            statuses = self.statuses[label]
+            errors = sum(
+                count for status, count in statuses.items()
+                if not (isinstance(status, int) and status < 400)
+            )
+            results[label] = {
+                "requests": len(ordered),
+                "errors": errors,
+                "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+                "throughput_rps": len(ordered) / self.elapsed[label],
+                "p50_ms": percentile(ordered, 50) * 1000,
+                "p95_ms": percentile(ordered, 95) * 1000,
+                "p99_ms": percentile(ordered, 99) * 1000,
+                "max_ms": ordered[-1] * 1000,
+            }
+        return results
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+async def gather_limited(concurrency: int, jobs) -> None:
+    """Run coroutines with at most ``concurrency`` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(job):
+        async with semaphore:
+            await job
+
+    await asyncio.gather(*(limited(job) for job in jobs))
+
+
+def seed(database_url: str, users: int, pagers: int, history_days: int) -> list[dict]:
+    """Insert the load-test users and the histories of the first ``pagers``."""
+    from sqlalchemy import create_engine, insert
+    from app.core.security import hash_password
+    from app.crud.daily_stats import crud_daily_stats
+    from app.crud.presence import crud_presence
+    from app.models import Checkin, User
+
+    run_id = uuid.uuid4().hex[:8]
+    hashed = hash_password(PASSWORD)
+    accounts = [
+        {"id": uuid.uuid4(), "email": f"load-{run_id}-{i}@example.com", "full_name": f"Load {i}"}
+        for i in range(users)
+    ]
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    checkins = []
+    for account in accounts[:pagers]:
+        for day in range(history_days, 0, -1):
+            start = today - timedelta(days=day) + timedelta(hours=9)
+            checkins.append({
+                "id": uuid.uuid4(), "user_id": account["id"], "status": "checked_in", "timestamp": start,
+            })
+            checkins.append({
+                "id": uuid.uuid4(), "user_id": account["id"], "status": "checked_out",
+                "timestamp": start + timedelta(hours=8), "duration_minutes": 480,
+            })
+
+    engine = create_engine(database_url)
+    try:
+        with engine.begin() as connection:
+            connection.execute(insert(User), [
+                {**account, "hashed_password": hashed} for account in accounts
+            ])
+            if checkins:
+                connection.execute(insert(Checkin), checkins)
+        from sqlalchemy.orm import Session
+        with Session(engine) as db:
+            crud_presence.rebuild(db)
+            crud_daily_stats.rebuild(db)
+            db.commit()
+    finally:
+        engine.dispose()
+    return accounts
+
+
+async def run_scenarios(client, accounts: list[dict], args) -> dict:
+    from app.core.security import create_access_token
+
+    headers = {
+        account["id"]: {"Authorization": f"Bearer {create_access_token({'sub': str(account['id'])})}"}
+        for account in accounts
+    }
+    scenarios = {}
+
+    async def scenario(name: str, concurrency: int, jobs) -> None:
+        recorder = Recorder()
+        started = time.perf_counter()
+        await gather_limited(concurrency, jobs(recorder))
+        elapsed = time.perf_counter() - started
+        recorder.elapsed = dict.fromkeys(recorder.latencies, elapsed)
+        scenarios[name] = recorder.results()
+
+    await scenario("checkin_burst", args.concurrency, lambda r: (
+        r.request(
+            client, "POST /api/v1/checkins/check-in", "POST", "/api/v1/checkins/check-in",
+            json={"location_name": "Office", "mood": {"mood_level": 4, "emotion": "focused"}},
+            headers=headers[account["id"]],
+        )
+        for account in accounts
+    ))
+
+    await scenario("dashboard_polling", args.concurrency, lambda r: (
+        r.request(
+            client, "GET /api/v1/checkins/today", "GET", "/api/v1/checkins/today",
+            headers=headers[account["id"]],
+        )
+        for _ in range(args.polls)
+        for account in accounts
+    ))
+
+    await scenario("login_storm", args.concurrency, lambda r: (
+        r.request(
+            client, "POST /api/v1/auth/login", "POST", "/api/v1/auth/login",
+            json={"email": accounts[i % len(accounts)]["email"], "password": PASSWORD},
+        )
+        for i in range(args.logins)
+    ))
+
+    async def overload(recorder) -> None:
+        await asyncio.gather(
+            gather_limited(args.concurrency, (
+                recorder.request(
+                    client, "POST /api/v1/auth/login", "POST", "/api/v1/auth/login",
+                    json={"email": accounts[i % len(accounts)]["email"], "password": PASSWORD},
+                )
+                for i in range(args.logins)
+            )),
+            gather_limited(args.concurrency, (
+                recorder.request(
+                    client, "POST /api/v1/checkins/check-out", "POST", "/api/v1/checkins/check-out",
+                    json={"mood": {"mood_level": 3}}, headers=headers[account["id"]],
+                )
+                for account in accounts
+            )),
+            gather_limited(args.concurrency, (
+                recorder.request(
+                    client, "GET /api/v1/checkins/today", "GET", "/api/v1/checkins/today",
+                    headers=headers[account["id"]],
+                )
+                for account in accounts
+            )),
+        )
+
+    await scenario("overload", 1, lambda r: [overload(r)])
+
+    async def walk_history(recorder, account) -> None:
+        cursor = None
+        while True:
+            params = {"limit": args.page_size}
+            if cursor:
+                params["cursor"] = cursor
+            response = await recorder.request(
+                client, "GET /api/v1/checkins", "GET", "/api/v1/checkins",
+                params=params, headers=headers[account["id"]],
+            )
+            cursor = response.headers.get("x-next-cursor") if response is not None else None
+            if not cursor:
+                return
+
+    await scenario("history_paging", args.concurrency, lambda r: (
+        walk_history(r, account) for account in accounts[:args.pagers]
+    ))
+    return scenarios
+
+
+async def run(args, database_url: str) -> dict:
+    import httpx
+
+    accounts = seed(database_url, args.users, args.pagers, args.history_days)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+            return await run_scenarios(client, accounts, args)
+
+    from app.core.hashing import password_hasher
+    from app.db.session import async_engine
+    from app.main import app
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=60) as client:
+            return await run_scenarios(client, accounts, args)
+    finally:
+        password_hasher.shutdown()
+        if async_engine is not None:
+            await async_engine.dispose()
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Endpoints whose p95 or throughput regressed beyond ``tolerance``."""
+    regressions = []
+    for name, endpoints in results["scenarios"].items():
+        for label, current in endpoints.items():
+            previous = baseline.get("scenarios", {}).get(name, {}).get(label)
+            if previous is None:
+                continue
+            if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{name} {label}: p95 {previous['p95_ms']:.1f} -> {current['p95_ms']:.1f} ms"
+                )
+            if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+                regressions.append(
+                    f"{name} {label}: throughput {previous['throughput_rps']:.0f}"
+                    f" -> {current['throughput_rps']:.0f} req/s"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="database to seed (default: temporary SQLite file)")
+    parser.add_argument("--url", help="base URL of a running server (default: in-process app)")
+    parser.add_argument("--sync-db", action="store_true", help="in-process app with DATABASE_ASYNC=False")
+    parser.add_argument("--users", type=int, default=200, help="users checking in and polling")
+    parser.add_argument("--concurrency", type=int, default=50, help="requests in flight")
+    parser.add_argument("--polls", type=int, default=5, help="/today polls per user")
+    parser.add_argument("--logins", type=int, default=50, help="logins in the storm")
+    parser.add_argument("--pagers", type=int, default=10, help="users walking their history")
+    parser.add_argument("--history-days", type=int, default=365, help="days of history per pager")
+    parser.add_argument("--page-size", type=int, default=50, help="history page size")
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="previous JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression ratio")
+    args = parser.parse_args()
+
+    scratch = None
+    database_url = args.database_url
+    if database_url is None:
+        if args.url:
+            parser.error("--url needs the server's --database-url to seed it")
+        fd, scratch = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        database_url = f"sqlite:///{scratch}"
+    if not args.url:
+        # The in-process app builds its engines from these at import time
+        os.environ["DATABASE_URL"] = database_url
+        os.environ["DATABASE_ASYNC"] = str(not args.sync_db)
+        os.environ.setdefault("METRICS_DIR", "")
+        from sqlalchemy import create_engine
+        from app.models import Base
+        engine = create_engine(database_url)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+
+    try:
+        from app.core.config import settings
+        started = datetime.utcnow()
+        scenarios = asyncio.run(run(args, database_url))
+    finally:
+        if scratch:
+            os.remove(scratch)
+
+    results = {
+        "meta": {
+            "started_at": started.isoformat(),
+            "target": args.url or "in-process",
+            "database": database_url.split("@")[-1] if scratch is None else "sqlite (temporary)",
+            "database_async": settings.DATABASE_ASYNC if not args.url else None,
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS if not args.url else None,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {
+                key: getattr(args, key)
+                for key in ("users", "concurrency", "polls", "logins", "pagers", "history_days", "page_size")
+            },
+        },
+        "scenarios": scenarios,
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    print(
+        f"{'scenario':<18} {'endpoint':<32} {'req':>6} {'err':>5} {'req/s':>8}"
+        f" {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}",
+        file=sys.stderr,
+    )
+    for name, endpoints in scenarios.items():
+        for label, r in endpoints.items():
+            print(
+                f"{name:<18} {label:<32} {r['requests']:>6} {r['errors']:>5} {r['throughput_rps']:>8.0f}"
+                f" {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}",
+                file=sys.stderr,
+            )
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Benchmark: bulk NDJSON ingestion vs one check-in request per event.
+
+Replays badge-reader events for a set of users into a scratch database, once
+through the per-event write path (``create_checkin``/``create_checkout``,
+one commit each) and once through the bulk path used by
+``POST /api/v1/checkins/bulk`` (streamed parsing, list-level validation,
+one multi-row INSERT per batch).
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_bulk_ingest [--database-url URL] [--events N]
+
+Defaults to a throwaway SQLite file; point ``--database-url`` at an empty
+Postgres database for production-like numbers.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from app.api.v1.endpoints.checkins import checkin_events
+from app.core.config import settings
+from app.crud.checkin import crud_checkin
+from app.models import Base, User
+from app.utils.ingest import iter_records, validate_batch
+
+USERS = 500
+
+
+def make_events(user_ids: list[uuid.UUID], count: int) -> list[dict]:
+    """Alternating check-in/check-out events, one pair per user and day."""
+    start = datetime.utcnow().replace(microsecond=0) - timedelta(days=count // (2 * len(user_ids)) + 1)
+    events = []
+    day = 0
+    while len(events) < count:
+        for user_id in user_ids:
+            at = start + timedelta(days=day, hours=9)
+            events.append({"user_id": str(user_id), "status": "checked_in", "timestamp": at.isoformat()})
+            events.append({
+                "user_id": str(user_id),
+                "status": "checked_out",
+                "timestamp": (at + timedelta(hours=8)).isoformat(),
+            })
+        day += 1
+    return events[:count]
+
+
+def per_event(session_factory, events: list[dict]) -> float:
+    started = time.perf_counter()
+    with session_factory() as db:
+        for event in events:
+            user_id = uuid.UUID(event["user_id"])
+            if event["status"] == "checked_in":
+                crud_checkin.create_checkin(db, user_id=user_id)
+            else:
+                crud_checkin.create_checkout(db, user_id=user_id)
+    return time.perf_counter() - started
+
+
+def bulk(session_factory, body: bytes, batch_size: int) -> float:
+    async def chunks():
+        for offset in range(0, len(body), 64 * 1024):
+            yield body[offset:offset + 64 * 1024]
+
+    async def ingest(db):
+        batch = []
+        inserted = 0
+        async for line, record, error in iter_records(chunks(), "ndjson"):
+            batch.append((line, record))
+            if len(batch) >= batch_size:
+                events, _ = validate_batch(checkin_events, batch)
+                inserted += crud_checkin.bulk_create(db, events)[0]
+                batch.clear()
+        if batch:
+            events, _ = validate_batch(checkin_events, batch)
+            inserted += crud_checkin.bulk_create(db, events)[0]
+        return inserted
+
+    started = time.perf_counter()
+    with session_factory() as db:
+        asyncio.run(ingest(db))
+    return time.perf_counter() - started
+
+
+def run(database_url: str, events: int, per_event_sample: int, batch_size: int) -> dict:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    try:
+        user_ids = [uuid.uuid4() for _ in range(USERS)]
+        with session_factory() as db:
+            db.execute(insert(User), [
+                {"id": user_id, "email": f"{user_id}@example.com", "hashed_password": "x"}
+                for user_id in user_ids
+            ])
+            db.commit()
+
+        sample = make_events(user_ids, per_event_sample)
+        body = "\n".join(json.dumps(event) for event in make_events(user_ids, events)).encode()
+        slow = per_event(session_factory, sample)
+        fast = bulk(session_factory, body, batch_size)
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+    return {
+        "per_event": per_event_sample / slow,
+        "bulk": events / fast,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="scratch database (default: temporary SQLite file)")
+    parser.add_argument("--events", type=int, default=50000, help="events sent through the bulk path")
+    parser.add_argument("--per-event-sample", type=int, default=1000, help="events sent one at a time")
+    parser.add_argument("--batch-size", type=int, default=settings.INGEST_BATCH_SIZE)
+    args = parser.parse_args()
+
+    scratch = None
+    database_url = args.database_url
+    if database_url is None:
+        fd, scratch = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        database_url = f"sqlite:///{scratch}"
+    try:
+        results = run(database_url, args.events, args.per_event_sample, args.batch_size)
+    finally:
+        if scratch:
+            os.remove(scratch)
+
+    print(f"per event: {results['per_event']:>10,.0f} events/s")
+    print(f"     bulk: {results['bulk']:>10,.0f} events/s")
+    print(f"  speedup: {results['bulk'] / results['per_event']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
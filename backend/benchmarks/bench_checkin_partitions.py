@@ -0,0 +1,185 @@
+"""Benchmark: /today and history queries as the partitioned checkins table grows.
+
+Grows the history of a fixed population month by month, backwards from
+the current month, so the newest partitions keep a constant size while
+the table passes 100M rows (10,000 users x 40 rows x 250 months by
+default). At each checkpoint it times the queries behind the hot
+endpoints:
+
+- ``today``: ``get_user_checkins_today``
+- ``latest``: ``get_latest_checkin`` since midnight (``/checkins/today``)
+- ``history``: the first page of ``get_user_checkins``
+- ``deep page``: the page after a cursor one year back
+- ``team presence``: ``get_team_presence`` of a team of TEAM_SIZE users
+
+It also counts the partitions each plan touches. Flat timings and a
+constant partition count mean pruning works.
+
+Run from the backend directory, against an empty PostgreSQL database:
+
+    python -m benchmarks.bench_checkin_partitions --database-url postgresql://... \\
+        [--users N] [--rows-per-month N] [--checkpoints 12,60,250]
+
+Rows are generated server-side with ``generate_series``. Budget about
+20 GB of disk and an hour or more for the default 100M rows. The schema
+is created with ``create_all`` and dropped afterwards.
+"""
+import argparse
+import re
+import statistics
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from app.crud.checkin import crud_checkin
+from app.crud.presence import start_of_today
+from app.crud.team import crud_team
+from app.db.partitions import add_months, create_partition, month_start
+from app.models import Base
+
+PARTITION = re.compile(r"\bcheckins_(?:p\d{6}|default)\b")
+
+# Members of the team whose roster is timed
+TEAM_SIZE = 100
+
+
+def load_month(connection, month, users: int, rows_per_month: int) -> None:
+    """Check-in/check-out pairs on the first days of ``month`` for every user."""
+    connection.execute(text("""
+        INSERT INTO checkins (id, user_id, status, "timestamp", duration_minutes, created_at, updated_at)
+        SELECT gen_random_uuid(),
+               md5('user' || u)::uuid,
+               CASE WHEN n % 2 = 0 THEN 'checked_in' ELSE 'checked_out' END,
+               ts,
+               CASE WHEN n % 2 = 1 THEN 480 END,
+               ts,
+               ts
+        FROM generate_series(0, :users - 1) AS u,
+             generate_series(0, :rows - 1) AS n,
+             LATERAL (SELECT CAST(:month AS timestamp)
+                      + (n / 2 % 27) * interval '1 day'
+                      + interval '9 hours'
+                      + (n % 2) * interval '8 hours'
+                      + (n / 54) * interval '1 minute' AS ts) AS t
+    """), {"users": users, "rows": rows_per_month, "month": month})
+
+
+def time_queries(session_factory, user_ids: list, team_id, repeat: int) -> dict:
+    """Median milliseconds and partitions touched, per query."""
+    cursor_at = datetime.utcnow() - timedelta(days=365)
+    queries = {
+        "today": lambda db, uid: crud_checkin.get_user_checkins_today(db, uid, options=()),
+        "latest": lambda db, uid: crud_checkin.get_latest_checkin(db, uid, since=start_of_today(), options=()),
+        "history": lambda db, uid: crud_checkin.get_user_checkins(db, uid, limit=51, options=()),
+        "deep page": lambda db, uid: crud_checkin.get_user_checkins(
+            db, uid, limit=51, cursor=(cursor_at, uid), options=()
+        ),
+        "team presence": lambda db, uid: crud_team.get_team_presence(db, team_id),
+    }
+    results = {}
+    with session_factory() as db:
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        bind = db.get_bind()
+        for name, query in queries.items():
+            samples = []
+            for _ in range(repeat):
+                for uid in user_ids:
+                    started = time.perf_counter()
+                    query(db, uid)
+                    samples.append(time.perf_counter() - started)
+            # Plan of one execution; a page may be two statements
+            statements.clear()
+            event.listen(bind, "before_cursor_execute", capture)
+            try:
+                query(db, user_ids[0])
+            finally:
+                event.remove(bind, "before_cursor_execute", capture)
+            touched = set()
+            for statement, parameters in statements:
+                plan = db.connection().exec_driver_sql(f"EXPLAIN {statement}", parameters).scalars()
+                touched.update(PARTITION.findall("\n".join(plan)))
+            results[name] = {"ms": statistics.median(samples) * 1000, "partitions": len(touched)}
+    return results
+
+
+def run(database_url: str, users: int, rows_per_month: int, checkpoints: list[int], repeat: int) -> list[dict]:
+    engine = create_engine(database_url)
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Partitioning needs PostgreSQL: pass a postgresql:// --database-url")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("""
+                INSERT INTO users (id, email, hashed_password, full_name)
+                SELECT md5('user' || u)::uuid, 'bench-' || u || '@example.com', 'x', 'Bench ' || u
+                FROM generate_series(0, :users - 1) AS u
+            """), {"users": users})
+            connection.execute(text("""
+                INSERT INTO teams (id, name, code, created_by)
+                VALUES (md5('team')::uuid, 'Bench', 'BENCH', md5('user' || 0)::uuid)
+            """))
+            connection.execute(text("""
+                INSERT INTO team_members (id, team_id, user_id, role)
+                SELECT gen_random_uuid(), md5('team')::uuid, id, 'member'
+                FROM users ORDER BY id LIMIT :members
+            """), {"members": TEAM_SIZE})
+        with engine.connect() as connection:
+            user_ids = list(connection.scalars(text("SELECT id FROM users ORDER BY id LIMIT 20")))
+            team_id = connection.scalar(text("SELECT id FROM teams"))
+
+        results = []
+        this_month = month_start(datetime.utcnow().date())
+        loaded = 0
+        for checkpoint in checkpoints:
+            while loaded < checkpoint:
+                month = add_months(this_month, -loaded)
+                with session_factory() as db:
+                    create_partition(db, month)
+                    db.commit()
+                with engine.begin() as connection:
+                    load_month(connection, month, users, rows_per_month)
+                loaded += 1
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                connection.execute(text("VACUUM ANALYZE checkins"))
+            results.append({
+                "months": loaded,
+                "rows": loaded * users * rows_per_month,
+                "queries": time_queries(session_factory, user_ids, team_id, repeat),
+            })
+            print_checkpoint(results[-1])
+        return results
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+def print_checkpoint(result: dict) -> None:
+    cells = "  ".join(
+        f"{name} {q['ms']:>7.2f} ms /{q['partitions']:>2}p" for name, q in result["queries"].items()
+    )
+    print(f"{result['rows']:>12,} rows {result['months']:>4} months  {cells}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True, help="empty PostgreSQL database")
+    parser.add_argument("--users", type=int, default=10_000, help="users with history")
+    parser.add_argument("--rows-per-month", type=int, default=40, help="check-ins per user per month")
+    parser.add_argument(
+        "--checkpoints", default="12,60,250",
+        help="months of history at which to measure, comma-separated",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per query and user")
+    args = parser.parse_args()
+
+    checkpoints = sorted(int(months) for months in args.checkpoints.split(","))
+    run(args.database_url, args.users, args.rows_per_month, checkpoints, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Microbenchmark: cached vs uncached JWT decoding.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_decode_token [--tokens N] [--rounds N]
+"""
+import argparse
+import timeit
+from app.core.security import create_access_token, decode_token, token_cache, verify_token
+
+
+def run(tokens: int, rounds: int) -> dict:
+    pool = [
+        create_access_token({"sub": f"user-{i}", "email": f"user-{i}@example.com"})
+        for i in range(tokens)
+    ]
+
+    def uncached():
+        for token in pool:
+            verify_token(token)
+
+    def cached():
+        for token in pool:
+            decode_token(token)
+
+    token_cache.clear()
+    cached()  # warm the cache
+
+    results = {}
+    for name, fn in (("uncached", uncached), ("cached", cached)):
+        best = min(timeit.repeat(fn, number=rounds, repeat=5))
+        calls = tokens * rounds
+        results[name] = {
+            "ops_per_sec": calls / best,
+            "usec_per_op": best / calls * 1e6,
+        }
+    results["speedup"] = results["cached"]["ops_per_sec"] / results["uncached"]["ops_per_sec"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=100, help="distinct tokens in rotation")
+    parser.add_argument("--rounds", type=int, default=100, help="passes over the token pool")
+    args = parser.parse_args()
+
+    results = run(args.tokens, args.rounds)
+    for name in ("uncached", "cached"):
+        r = results[name]
+        print(f"{name:>9}: {r['ops_per_sec']:>12,.0f} ops/s  {r['usec_per_op']:8.2f} us/op")
+    print(f"  speedup: {results['speedup']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
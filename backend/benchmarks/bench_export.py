@@ -0,0 +1,128 @@
+"""Benchmark: memory of the streaming export vs loading history into a list.
+
+Exports check-in histories of increasing size from a scratch database and
+reports peak Python memory (tracemalloc) and throughput. The streaming path
+is the one behind ``GET /api/v1/checkins/export``; the list path is what
+paging through the ORM amounts to.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_export [--database-url URL] [--sizes 10000,100000]
+
+Defaults to a throwaway SQLite file; point ``--database-url`` at an empty
+Postgres database to exercise a real server-side cursor.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+import anyio
+from sqlalchemy import create_engine, delete, insert
+from sqlalchemy.orm import sessionmaker
+from app.crud.base import stream_partitions
+from app.crud.checkin import crud_checkin
+from app.models import Base, Checkin, User
+from app.utils.export import PARTITION_SIZE, encode_rows
+
+
+def seed(db, user_id: uuid.UUID, rows: int) -> None:
+    start = datetime.utcnow() - timedelta(hours=rows)
+    db.execute(delete(Checkin))
+    for offset in range(0, rows, 10000):
+        db.execute(insert(Checkin.__table__), [
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "status": "checked_in" if i % 2 == 0 else "checked_out",
+                "timestamp": start + timedelta(hours=i),
+                "duration_minutes": None if i % 2 == 0 else 60,
+                "notes": "badge",
+            }
+            for i in range(offset, min(offset + 10000, rows))
+        ])
+    db.commit()
+
+
+def measure(fn) -> dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"mb": peak / 2**20, "seconds": elapsed, "bytes": size}
+
+
+def run(database_url: str, sizes: list[int]) -> dict:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    user_id = uuid.uuid4()
+    results = {}
+    try:
+        with session_factory() as db:
+            db.execute(insert(User), [{"id": user_id, "email": "export@example.com", "hashed_password": "x"}])
+            db.commit()
+        for rows in sizes:
+            with session_factory() as db:
+                seed(db, user_id, rows)
+            stmt = crud_checkin.export_query(user_id=user_id)
+
+            def streamed():
+                async def consume():
+                    size = 0
+                    with session_factory() as db:
+                        chunks = encode_rows(
+                            stream_partitions(db, stmt, PARTITION_SIZE),
+                            stmt.selected_columns.keys(),
+                            "csv"
+                        )
+                        async for chunk in chunks:
+                            size += len(chunk)  # a response would send it here
+                    return size
+                return anyio.run(consume)
+
+            def listed():
+                with session_factory() as db:
+                    checkins = crud_checkin.get_user_checkins(db, user_id, limit=rows)
+                    return len(checkins)
+
+            results[rows] = {"stream": measure(streamed), "list": measure(listed)}
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="scratch database (default: temporary SQLite file)")
+    parser.add_argument("--sizes", default="10000,100000", help="comma-separated row counts")
+    args = parser.parse_args()
+
+    scratch = None
+    database_url = args.database_url
+    if database_url is None:
+        fd, scratch = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        database_url = f"sqlite:///{scratch}"
+    try:
+        results = run(database_url, [int(size) for size in args.sizes.split(",")])
+    finally:
+        if scratch:
+            os.remove(scratch)
+
+    print(f"{'rows':>10} {'stream peak':>12} {'rows/s':>10} {'list peak':>10}")
+    for rows, r in results.items():
+        stream, listed = r["stream"], r["list"]
+        print(
+            f"{rows:>10,} {stream['mb']:>9.1f} MB {rows / stream['seconds']:>10,.0f}"
+            f" {listed['mb']:>7.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
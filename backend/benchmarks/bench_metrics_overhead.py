@@ -0,0 +1,87 @@
+"""Benchmark: per-request overhead of the metrics middleware.
+
+Drives a minimal ASGI app (one route, a small JSON body) directly, with
+and without ``MetricsMiddleware`` in front of it, and reports the added
+time per request. No server, network or framework routing is involved,
+so the difference is the middleware's own cost: wrapping ``send``, two
+clock reads and recording the series. Also times rendering ``/metrics``.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_metrics_overhead [--requests N] [--series N]
+"""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+from app.core import metrics
+from app.middleware.metrics import MetricsMiddleware
+
+ROUTE = SimpleNamespace(path="/api/v1/checkins/{checkin_id}")
+START = {"type": "http.response.start", "status": 200, "headers": []}
+BODY = {"type": "http.response.body", "body": b'{"status":"ok"}'}
+
+
+async def endpoint(scope, receive, send):
+    scope["route"] = ROUTE  # what the router sets on a match
+    await send(START)
+    await send(BODY)
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def drive(app, requests: int) -> float:
+    """Mean seconds per request through ``app``."""
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/checkins/1"}
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+def run(requests: int, repeat: int, series: int) -> dict:
+    loop = asyncio.new_event_loop()
+    try:
+        wrapped = MetricsMiddleware(endpoint)
+        bare = min(loop.run_until_complete(drive(endpoint, requests)) for _ in range(repeat))
+        measured = min(loop.run_until_complete(drive(wrapped, requests)) for _ in range(repeat))
+    finally:
+        loop.close()
+
+    # Scrape cost with a realistic number of distinct series
+    for i in range(series):
+        metrics.request_metrics.observe("GET", f"/route/{i}", 200, 0.01, 1000)
+    started = time.perf_counter()
+    body = metrics.render([(metrics.snapshot(), True)])
+    render_ms = (time.perf_counter() - started) * 1000
+    return {
+        "bare_us": bare * 1e6,
+        "middleware_us": measured * 1e6,
+        "overhead_us": (measured - bare) * 1e6,
+        "render_ms": render_ms,
+        "render_bytes": len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100_000, help="requests per timed run")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (best is kept)")
+    parser.add_argument("--series", type=int, default=200, help="series in the rendered scrape")
+    args = parser.parse_args()
+
+    r = run(args.requests, args.repeat, args.series)
+    print(f"bare app           {r['bare_us']:>8.2f} us/request")
+    print(f"with middleware    {r['middleware_us']:>8.2f} us/request")
+    print(f"overhead           {r['overhead_us']:>8.2f} us/request")
+    print(f"render /metrics    {r['render_ms']:>8.2f} ms for {args.series} series ({r['render_bytes']} bytes)")
+
+
+if __name__ == "__main__":
+    main()
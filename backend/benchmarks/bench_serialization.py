@@ -0,0 +1,126 @@
+"""Benchmark: rendering a list response, FastAPI's default path vs prebuilt adapters.
+
+Builds a page of check-ins (ORM instances, each with a nested mood, as
+``GET /api/v1/checkins`` returns them) and times turning it into response
+bytes three ways:
+
+- ``default``: what FastAPI does for ``response_model=list[CheckinResponse]``
+  with the stdlib ``JSONResponse``: validate from attributes, dump to a
+  JSON-compatible structure, then ``json.dumps``
+- ``orjson``: the same ``response_model`` pass, rendered by ``ORJSONResponse``
+  (the application's default response class)
+- ``adapter``: ``json_response`` with a prebuilt ``TypeAdapter``, validating
+  and encoding straight to bytes in pydantic-core
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_serialization [--items N] [--repeat N]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.api.v1.endpoints.checkins import checkin_list
+from app.models import Checkin, Mood
+from app.schemas.checkin import CheckinResponse
+from app.utils.serialization import json_response
+
+
+def build_page(items: int) -> list[Checkin]:
+    """``items`` check-ins with their moods attached, newest first."""
+    now = datetime.utcnow().replace(microsecond=0)
+    user_id = uuid.uuid4()
+    page = []
+    for i in range(items):
+        timestamp = now - timedelta(hours=4 * i)
+        checked_in = i % 2 == 1
+        mood = Mood(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            mood_level=1 + i % 5,
+            emotion="focused",
+            notes="Feeling productive",
+            created_at=timestamp,
+        )
+        page.append(Checkin(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            status="checked_in" if checked_in else "checked_out",
+            timestamp=timestamp,
+            location_latitude=13.7563 if checked_in else None,
+            location_longitude=100.5018 if checked_in else None,
+            location_name="Office" if checked_in else None,
+            notes="Starting work" if checked_in else "Great day!",
+            duration_minutes=None if checked_in else 480,
+            mood_id=mood.id,
+            mood=mood,
+            created_at=timestamp,
+            updated_at=timestamp,
+        ))
+    return page
+
+
+async def render_response_model(field, page, response_class) -> bytes:
+    content = await serialize_response(field=field, response_content=page)
+    return response_class(content).body
+
+
+def best_of(fn, repeat: int, number: int) -> float:
+    """Best mean time of ``fn()`` in microseconds over ``repeat`` rounds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best * 1e6
+
+
+def run(items: int, repeat: int, number: int) -> dict:
+    page = build_page(items)
+    field = create_response_field(name="Response", type_=list[CheckinResponse])
+    loop = asyncio.new_event_loop()
+    try:
+        cases = {
+            "default": lambda: loop.run_until_complete(
+                render_response_model(field, page, JSONResponse)
+            ),
+            "orjson": lambda: loop.run_until_complete(
+                render_response_model(field, page, ORJSONResponse)
+            ),
+            "adapter": lambda: json_response(checkin_list, page).body,
+        }
+        bodies = {name: fn() for name, fn in cases.items()}
+        results = {
+            name: {"us": best_of(fn, repeat, number), "bytes": len(bodies[name])}
+            for name, fn in cases.items()
+        }
+    finally:
+        loop.close()
+    # Same document whichever way it was encoded
+    documents = {name: checkin_list.validate_json(body) for name, body in bodies.items()}
+    assert documents["default"] == documents["orjson"] == documents["adapter"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100, help="check-ins per response")
+    parser.add_argument("--repeat", type=int, default=5, help="timed rounds (best is kept)")
+    parser.add_argument("--number", type=int, default=200, help="renders per round")
+    args = parser.parse_args()
+
+    results = run(args.items, args.repeat, args.number)
+    baseline = results["default"]["us"]
+    print(f"{args.items} x CheckinResponse with nested MoodResponse")
+    print(f"{'path':<10} {'per response':>14} {'bytes':>8} {'speedup':>8}")
+    for name, r in results.items():
+        print(f"{name:<10} {r['us']:>11.1f} us {r['bytes']:>8} {baseline / r['us']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark: team analytics over a year of history.
+
+Seeds a team (50 members, 365 days of check-ins and moods by default) into a
+scratch database, builds the daily rollup and times
+``crud_analytics.get_team_analytics`` for weekly and monthly granularity.
+The target is well under 100 ms per call.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_team_analytics [--database-url URL] [--members N] [--days N]
+
+Defaults to a throwaway SQLite file; point ``--database-url`` at an empty
+Postgres database for production-like numbers.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.crud.analytics import GRANULARITIES, crud_analytics
+from app.crud.daily_stats import crud_daily_stats
+from app.models import Base
+from benchmarks.bench_team_presence import seed_team
+
+
+def run(database_url: str, members: int, days: int, repeat: int) -> dict:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    end = datetime.utcnow().date()
+    start = end - timedelta(days=days - 1)
+    results = {}
+    try:
+        with session_factory() as db:
+            team_id = seed_team(db, members, days)
+            crud_daily_stats.rebuild(db)
+            db.commit()
+        for granularity in GRANULARITIES:
+            timings = []
+            for _ in range(repeat):
+                with session_factory() as db:
+                    started = time.perf_counter()
+                    analytics = crud_analytics.get_team_analytics(
+                        db, team_id, start, end, granularity
+                    )
+                    timings.append(time.perf_counter() - started)
+            results[granularity] = {
+                "ms": min(timings) * 1000,
+                "periods": len(analytics["periods"]),
+                "members": analytics["team_size"],
+            }
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="scratch database (default: temporary SQLite file)")
+    parser.add_argument("--members", type=int, default=50, help="team size")
+    parser.add_argument("--days", type=int, default=365, help="days of history per member")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (best is kept)")
+    args = parser.parse_args()
+
+    scratch = None
+    database_url = args.database_url
+    if database_url is None:
+        fd, scratch = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        database_url = f"sqlite:///{scratch}"
+    try:
+        results = run(database_url, args.members, args.days, args.repeat)
+    finally:
+        if scratch:
+            os.remove(scratch)
+
+    for granularity, r in results.items():
+        print(
+            f"{granularity:>6}: {r['ms']:7.1f} ms"
+            f"  ({r['members']} members x {r['periods']} periods)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Benchmark: team live roster in one query vs per-member lookups.
+
+Seeds teams of 10, 100 and 1,000 members (each with check-in history and
+moods) into a scratch database and times ``crud_team.get_team_presence``
+against the per-member N+1 pattern it replaces.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_team_presence [--database-url URL] [--days N]
+
+Defaults to a throwaway SQLite file; point ``--database-url`` at an empty
+Postgres database for production-like numbers. The schema is created with
+``create_all`` and dropped afterwards.
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+from app.crud.checkin import HISTORY_WINDOW, crud_checkin
+from app.crud.mood import crud_mood
+from app.crud.presence import crud_presence
+from app.crud.team import crud_team
+from app.models import Base, Checkin, Mood, Team, TeamMember, User
+
+TEAM_SIZES = (10, 100, 1000)
+
+
+def seed_team(db, size: int, days: int) -> uuid.UUID:
+    """Insert a team of ``size`` members with ``days`` of check-in/out pairs."""
+    now = datetime.utcnow().replace(microsecond=0)
+    users, members, checkins, moods = [], [], [], []
+    team_id = uuid.uuid4()
+    for i in range(size):
+        user_id = uuid.uuid4()
+        users.append({
+            "id": user_id,
+            "email": f"{team_id.hex[:8]}-{i}@example.com",
+            "hashed_password": "x",
+            "full_name": f"Member {i:04d}",
+        })
+        members.append({
+            "id": uuid.uuid4(),
+            "team_id": team_id,
+            "user_id": user_id,
+            "role": "owner" if i == 0 else "member",
+        })
+        for day in range(days, -1, -1):
+            start = now - timedelta(days=day, hours=8)
+            checkins.append({
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "status": "checked_in",
+                "timestamp": start,
+                "location_name": "Office" if i % 3 else "Home",
+            })
+            # Half of the team is still checked in today
+            if day or i % 2:
+                checkins.append({
+                    "id": uuid.uuid4(),
+                    "user_id": user_id,
+                    "status": "checked_out",
+                    "timestamp": start + timedelta(hours=8),
+                    "duration_minutes": 480,
+                })
+            moods.append({
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "mood_level": 1 + (i + day) % 5,
+                "emotion": "focused",
+                "created_at": start,
+            })
+
+    db.execute(insert(User), users)
+    db.execute(insert(Team), [{
+        "id": team_id,
+        "name": f"Team of {size}",
+        "code": team_id.hex[:6].upper(),
+        "created_by": users[0]["id"],
+    }])
+    db.execute(insert(TeamMember), members)
+    db.execute(insert(Checkin), checkins)
+    db.execute(insert(Mood), moods)
+    crud_presence.rebuild(db)
+    db.commit()
+    return team_id
+
+
+def roster_n_plus_one(db, team_id: uuid.UUID) -> list[dict]:
+    """What a client had to do before: one round of lookups per member."""
+    roster = []
+    for member in crud_team.get_team_members(db, team_id):
+        user = db.get(User, member.user_id)
+        latest = crud_checkin.get_latest_checkin(
+            db, member.user_id, since=datetime.utcnow() - HISTORY_WINDOW
+        )
+        moods = crud_mood.get_user_moods(db, member.user_id, limit=1)
+        roster.append({
+            "user_id": user.id,
+            "full_name": user.full_name,
+            "status": "checked_in" if crud_checkin.is_checked_in(db, user.id) else "checked_out",
+            "location_name": latest.location_name if latest else None,
+            "mood_level": moods[0].mood_level if moods else None,
+        })
+    return roster
+
+
+def measure(session_factory, fn, team_id, repeat: int) -> dict:
+    timings, statements = [], []
+    for _ in range(repeat):
+        with session_factory() as db:
+            count = 0
+
+            def on_execute(*args):
+                nonlocal count
+                count += 1
+
+            event.listen(db.get_bind(), "before_cursor_execute", on_execute)
+            try:
+                started = time.perf_counter()
+                rows = fn(db, team_id)
+                timings.append(time.perf_counter() - started)
+            finally:
+                event.remove(db.get_bind(), "before_cursor_execute", on_execute)
+            statements.append(count)
+    return {"ms": min(timings) * 1000, "statements": max(statements), "rows": len(rows)}
+
+
+def run(database_url: str, days: int, repeat: int) -> dict:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    results = {}
+    try:
+        for size in TEAM_SIZES:
+            with session_factory() as db:
+                team_id = seed_team(db, size, days)
+            results[size] = {
+                "one_query": measure(session_factory, crud_team.get_team_presence, team_id, repeat),
+                "n_plus_one": measure(session_factory, roster_n_plus_one, team_id, repeat),
+            }
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="scratch database (default: temporary SQLite file)")
+    parser.add_argument("--days", type=int, default=30, help="days of history per member")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (best is kept)")
+    args = parser.parse_args()
+
+    scratch = None
+    database_url = args.database_url
+    if database_url is None:
+        fd, scratch = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        database_url = f"sqlite:///{scratch}"
+    try:
+        results = run(database_url, args.days, args.repeat)
+    finally:
+        if scratch:
+            os.remove(scratch)
+
+    print(f"{'members':>8} {'one query':>18} {'N+1':>22} {'speedup':>8}")
+    for size, r in results.items():
+        one, naive = r["one_query"], r["n_plus_one"]
+        print(
+            f"{size:>8} {one['ms']:>9.1f} ms {one['statements']:>3} stmt"
+            f" {naive['ms']:>11.1f} ms {naive['statements']:>5} stmt"
+            f" {naive['ms'] / one['ms']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
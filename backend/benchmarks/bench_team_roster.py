@@ -0,0 +1,95 @@
+"""Benchmark: enriched team roster in one joined query vs a profile lookup per member.
+
+Seeds teams of 10, 100 and 1,000 members into a scratch database and times
+building the roster response (rows to JSON bytes) with
+``crud_team.get_team_roster`` against what the frontend did before: the
+member list, then one user profile lookup per member.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_team_roster [--database-url URL]
+
+Defaults to a throwaway SQLite file; point ``--database-url`` at an empty
+Postgres database for production-like numbers.
+"""
+import argparse
+import os
+import tempfile
+import uuid
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.api.v1.endpoints.teams import roster_list
+from app.crud.team import crud_team
+from app.crud.user import crud_user
+from app.models import Base
+from app.schemas.user import UserResponse
+from app.utils.serialization import json_response
+from benchmarks.bench_team_presence import TEAM_SIZES, measure, seed_team
+
+
+def roster_one_query(db, team_id: uuid.UUID) -> list:
+    members = crud_team.get_team_roster(db, team_id, limit=1000)
+    json_response(roster_list, members)
+    return members
+
+
+def roster_per_member(db, team_id: uuid.UUID) -> list:
+    """Member list, then ``GET /users/{user_id}`` for every member."""
+    members = crud_team.get_team_members(db, team_id)
+    profiles = []
+    for member in members:
+        user = crud_user.get_by_id(db, member.user_id)
+        profiles.append(UserResponse.model_validate(user).model_dump_json())
+    return profiles
+
+
+def run(database_url: str, repeat: int) -> dict:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    results = {}
+    try:
+        for size in TEAM_SIZES:
+            with session_factory() as db:
+                team_id = seed_team(db, size, days=0)
+            results[size] = {
+                "one_query": measure(session_factory, roster_one_query, team_id, repeat),
+                "per_member": measure(session_factory, roster_per_member, team_id, repeat),
+            }
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="scratch database (default: temporary SQLite file)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (best is kept)")
+    args = parser.parse_args()
+
+    scratch = None
+    database_url = args.database_url
+    if database_url is None:
+        fd, scratch = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        database_url = f"sqlite:///{scratch}"
+    try:
+        results = run(database_url, args.repeat)
+    finally:
+        if scratch:
+            os.remove(scratch)
+
+    print(f"{'members':>8} {'one query':>18} {'per member':>22} {'speedup':>8}")
+    for size, r in results.items():
+        one, naive = r["one_query"], r["per_member"]
+        print(
+            f"{size:>8} {one['ms']:>9.1f} ms {one['statements']:>3} stmt"
+            f" {naive['ms']:>11.1f} ms {naive['statements']:>5} stmt"
+            f" {naive['ms'] / one['ms']:>7.1f}x"
+        )
+    print("(per member also costs the client one HTTP request, with authentication, per member)")
+
+
+if __name__ == "__main__":
+    main()
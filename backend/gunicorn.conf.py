@@ -0,0 +1,19 @@
+"""Gunicorn settings, read from the working directory.
+
+Command-line flags (see the Dockerfile) still take precedence.
+"""
+import glob
+import os
+from app.core.config import settings
+
+
+def on_starting(server):
+    """Start each deployment with fresh metrics.
+
+    Worker snapshots in METRICS_DIR from a previous run would otherwise be
+    merged into /metrics as workers that have exited.
+    """
+    if settings.METRICS_DIR:
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, "*.json")):
+            os.remove(path)
@@ -0,0 +1,113 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-01-01 00:00:00
+
+Matches what Base.metadata.create_all used to build at worker startup.
+Databases created that way already have these tables, so the upgrade
+adopts them as-is instead of failing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("users", "teams", "team_members", "moods", "goals", "checkins")
+
+
+def upgrade() -> None:
+    if not op.get_context().as_sql:
+        existing = set(sa.inspect(op.get_bind()).get_table_names())
+        if existing.issuperset(TABLES):
+            return
+
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("full_name", sa.String(255)),
+        sa.Column("avatar_url", sa.String(500), nullable=True),
+        sa.Column("timezone", sa.String(50)),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "teams",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("code", sa.String(10), nullable=False, unique=True),
+        sa.Column("description", sa.String(500), nullable=True),
+        sa.Column("created_by", sa.Uuid(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+
+    op.create_table(
+        "team_members",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("user_id", sa.Uuid(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("team_id", sa.Uuid(), sa.ForeignKey("teams.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("role", sa.String(50)),
+        sa.Column("joined_at", sa.DateTime()),
+        sa.UniqueConstraint("user_id", "team_id", name="unique_user_team"),
+    )
+
+    op.create_table(
+        "moods",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("user_id", sa.Uuid(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("mood_level", sa.Integer(), nullable=False),
+        sa.Column("emotion", sa.String(50), nullable=True),
+        sa.Column("notes", sa.String(500), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_moods_user_id", "moods", ["user_id"])
+
+    op.create_table(
+        "goals",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("user_id", sa.Uuid(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.String(1000), nullable=True),
+        sa.Column("is_completed", sa.Boolean()),
+        sa.Column("priority", sa.String(20)),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_goals_user_id", "goals", ["user_id"])
+
+    op.create_table(
+        "checkins",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("user_id", sa.Uuid(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("location_latitude", sa.Float(), nullable=True),
+        sa.Column("location_longitude", sa.Float(), nullable=True),
+        sa.Column("location_name", sa.String(255), nullable=True),
+        sa.Column("notes", sa.String(1000), nullable=True),
+        sa.Column("duration_minutes", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("mood_id", sa.Uuid(), sa.ForeignKey("moods.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("goal_id", sa.Uuid(), sa.ForeignKey("goals.id", ondelete="SET NULL"), nullable=True),
+    )
+    op.create_index("ix_checkins_user_id", "checkins", ["user_id"])
+    op.create_index("ix_checkins_timestamp", "checkins", ["timestamp"])
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_table(table)
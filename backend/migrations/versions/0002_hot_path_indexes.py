@@ -0,0 +1,80 @@
+"""Composite indexes for the hot query paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-01-02 00:00:00
+
+Every history query filters on user and orders by time (plus id as the
+keyset tie-breaker), so the single-column user_id indexes are replaced by
+composite ones that serve the filter and the sort from one index scan.
+Indexes are built CONCURRENTLY on Postgres so the tables stay writable.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_checkins_user_id_timestamp",
+            "checkins",
+            ["user_id", sa.text("timestamp DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_checkins_open_by_user",
+            "checkins",
+            ["user_id", sa.text("timestamp DESC")],
+            postgresql_where=sa.text("status = 'checked_in'"),
+            sqlite_where=sa.text("status = 'checked_in'"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_moods_user_id_created_at",
+            "moods",
+            ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_goals_user_id_created_at",
+            "goals",
+            ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_goals_user_id_is_completed_created_at",
+            "goals",
+            ["user_id", "is_completed", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_team_members_team_id",
+            "team_members",
+            ["team_id"],
+            postgresql_concurrently=True,
+        )
+
+        # Superseded by the composite indexes above
+        op.drop_index("ix_checkins_user_id", "checkins", postgresql_concurrently=True)
+        op.drop_index("ix_moods_user_id", "moods", postgresql_concurrently=True)
+        op.drop_index("ix_goals_user_id", "goals", postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.create_index("ix_checkins_user_id", "checkins", ["user_id"])
+    op.create_index("ix_moods_user_id", "moods", ["user_id"])
+    op.create_index("ix_goals_user_id", "goals", ["user_id"])
+    op.drop_index("ix_team_members_team_id", "team_members")
+    op.drop_index("ix_goals_user_id_is_completed_created_at", "goals")
+    op.drop_index("ix_goals_user_id_created_at", "goals")
+    op.drop_index("ix_moods_user_id_created_at", "moods")
+    op.drop_index("ix_checkins_open_by_user", "checkins")
+    op.drop_index("ix_checkins_user_id_timestamp", "checkins")
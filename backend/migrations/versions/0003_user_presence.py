@@ -0,0 +1,58 @@
+"""Materialized per-user presence
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-01-03 00:00:00
+
+One row per user with the current check-in state, maintained by the
+check-in/check-out write path. Backfilled here from each user's latest
+checkins row; ``python -m app.commands rebuild-presence`` does the same
+at any later time.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_presence",
+        sa.Column("user_id", sa.Uuid(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("open_checkin_id", sa.Uuid(), nullable=True),
+        sa.Column("checked_in_at", sa.DateTime(), nullable=True),
+        sa.Column("last_transition_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.execute(
+        """
+        INSERT INTO user_presence
+            (user_id, status, open_checkin_id, checked_in_at, last_transition_at, updated_at)
+        SELECT
+            user_id,
+            status,
+            CASE WHEN status = 'checked_in' THEN id END,
+            CASE WHEN status = 'checked_in' THEN timestamp END,
+            timestamp,
+            CURRENT_TIMESTAMP
+        FROM (
+            SELECT id, user_id, status, timestamp,
+                   row_number() OVER (
+                       PARTITION BY user_id ORDER BY timestamp DESC, id DESC
+                   ) AS rank
+            FROM checkins
+        ) latest
+        WHERE rank = 1
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_presence")
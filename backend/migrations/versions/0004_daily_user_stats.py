@@ -0,0 +1,43 @@
+"""Daily per-user rollup of check-ins and moods
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2024-01-04 00:00:00
+
+Maintained by the check-in, check-out and mood write paths. The table is
+created empty; fill it from existing history once after upgrading with
+``python -m app.commands backfill-daily-stats``, which rebuilds chunks of
+days in parallel instead of one long statement inside the migration.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_user_stats",
+        sa.Column("user_id", sa.Uuid(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("checkin_count", sa.Integer(), nullable=False),
+        sa.Column("checkout_count", sa.Integer(), nullable=False),
+        sa.Column("worked_minutes", sa.Integer(), nullable=False),
+        sa.Column("first_in", sa.DateTime(), nullable=True),
+        sa.Column("last_out", sa.DateTime(), nullable=True),
+        sa.Column("mood_count", sa.Integer(), nullable=False),
+        sa.Column("mood_sum", sa.Integer(), nullable=False),
+        sa.Column("mood_min", sa.Integer(), nullable=True),
+        sa.Column("mood_max", sa.Integer(), nullable=True),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_user_stats")
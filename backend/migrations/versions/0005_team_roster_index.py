@@ -0,0 +1,36 @@
+"""Keyset index for the paged team roster
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-01-05 00:00:00
+
+GET /teams/{team_id}/members pages through a team ordered by
+(joined_at, id). The composite index serves the team filter, the order
+and the cursor seek from one scan, and supersedes the team_id-only index.
+Built CONCURRENTLY on Postgres so the table stays writable.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_team_members_team_id_joined_at",
+            "team_members",
+            ["team_id", "joined_at", "id"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index("ix_team_members_team_id", "team_members", postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.create_index("ix_team_members_team_id", "team_members", ["team_id"])
+    op.drop_index("ix_team_members_team_id_joined_at", "team_members")
@@ -0,0 +1,101 @@
+"""Partition checkins by month
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2024-01-06 00:00:00
+
+On PostgreSQL, checkins becomes a table range-partitioned by month on
+timestamp, so each index and each vacuum covers one month, and queries
+bounded in time only touch the months they need. The primary key becomes
+(id, timestamp), as a partitioned table's unique constraints must contain
+the partition key. Existing rows are copied into one partition per month,
+from the oldest row through three months ahead, plus a default partition
+for anything outside them. Later months are added by
+``python -m app.commands partition-checkins``.
+
+The copy rewrites the whole table under an exclusive lock: run it in a
+maintenance window. Other databases keep a plain table.
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _constrain(table: str) -> None:
+    """Foreign keys and indexes of checkins, on ``table``."""
+    op.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT checkins_user_id_fkey"
+        " FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE"
+    )
+    op.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT checkins_mood_id_fkey"
+        " FOREIGN KEY (mood_id) REFERENCES moods (id) ON DELETE SET NULL"
+    )
+    op.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT checkins_goal_id_fkey"
+        " FOREIGN KEY (goal_id) REFERENCES goals (id) ON DELETE SET NULL"
+    )
+    op.create_index("ix_checkins_timestamp", table, ["timestamp"])
+    op.create_index(
+        "ix_checkins_user_id_timestamp",
+        table,
+        ["user_id", sa.text("timestamp DESC"), sa.text("id DESC")],
+    )
+    op.create_index(
+        "ix_checkins_open_by_user",
+        table,
+        ["user_id", sa.text("timestamp DESC")],
+        postgresql_where=sa.text("status = 'checked_in'"),
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute('CREATE TABLE checkins_new (LIKE checkins INCLUDING DEFAULTS) PARTITION BY RANGE ("timestamp")')
+    op.execute("CREATE TABLE checkins_default PARTITION OF checkins_new DEFAULT")
+    oldest = bind.scalar(sa.text('SELECT min("timestamp") FROM checkins'))
+    this_month = datetime.utcnow().date().replace(day=1)
+    month = oldest.date().replace(day=1) if oldest else this_month
+    while month <= _add_months(this_month, MONTHS_AHEAD):
+        end = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE checkins_p{month:%Y%m} PARTITION OF checkins_new"
+            f" FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+        )
+        month = end
+    op.execute("INSERT INTO checkins_new SELECT * FROM checkins")
+
+    op.drop_table("checkins")
+    op.rename_table("checkins_new", "checkins")
+    op.execute('ALTER TABLE checkins ADD CONSTRAINT checkins_pkey PRIMARY KEY (id, "timestamp")')
+    _constrain("checkins")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE TABLE checkins_old (LIKE checkins INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO checkins_old SELECT * FROM checkins")
+    op.drop_table("checkins")  # with its partitions
+    op.rename_table("checkins_old", "checkins")
+    op.execute("ALTER TABLE checkins ADD CONSTRAINT checkins_pkey PRIMARY KEY (id)")
+    _constrain("checkins")
@@ -0,0 +1,102 @@
+"""Shared fixtures: the application on a scratch SQLite database.
+
+The settings are read when ``app`` is first imported, so the database is
+chosen here, before any test module imports it. Each test gets empty
+tables and empty in-process caches.
+"""
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+
+_scratch = tempfile.mkdtemp(prefix="checkin-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_scratch, 'test.sqlite')}"
+os.environ["DATABASE_ASYNC"] = "False"
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+os.environ["ARCHIVE_DIR"] = ""
+os.environ["METRICS_DIR"] = ""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+from app.core.cache import team_analytics_cache, team_presence_cache, user_cache
+from app.core.security import create_access_token, token_cache
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models import Base, User
+
+
+class StatementCount:
+    """Statements and commits seen on the engine inside ``count_statements``."""
+
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+
+
+@pytest.fixture(autouse=True)
+def database():
+    Base.metadata.create_all(engine)
+    yield engine
+    for cache in (user_cache, token_cache, team_presence_cache, team_analytics_cache):
+        cache.clear()
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def db(database):
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def client(database):
+    # Without the lifespan: it shuts the password hashing pool down on exit
+    return TestClient(app)
+
+
+@pytest.fixture
+def count_statements(database):
+    """Context manager counting what the application sends to the database.
+
+    Usage: ``with count_statements() as count: ...``, then
+    ``count.statements`` and ``count.commits``.
+    """
+    @contextmanager
+    def counting():
+        count = StatementCount()
+
+        def on_execute(*args):
+            count.statements += 1
+
+        def on_commit(*args):
+            count.commits += 1
+
+        event.listen(database, "before_cursor_execute", on_execute)
+        event.listen(database, "commit", on_commit)
+        try:
+            yield count
+        finally:
+            event.remove(database, "before_cursor_execute", on_execute)
+            event.remove(database, "commit", on_commit)
+
+    return counting
+
+
+@pytest.fixture
+def user_id(db) -> uuid.UUID:
+    """An active user, straight in the database."""
+    user_id = uuid.uuid4()
+    db.execute(insert(User), [{
+        "id": user_id,
+        "email": f"{user_id.hex}@example.com",
+        "hashed_password": "x",
+        "full_name": "Test User",
+    }])
+    db.commit()
+    return user_id
+
+
+@pytest.fixture
+def auth_headers(user_id) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
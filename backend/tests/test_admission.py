@@ -0,0 +1,60 @@
+"""Admission control: shed responses and the slot accounting of RouteLimiter."""
+import asyncio
+from contextlib import suppress
+import pytest
+from app.core.admission import RouteLimiter
+from app.core.metrics import admission_metrics
+from app.main import app
+from app.middleware.admission import AdmissionMiddleware
+
+ORIGIN = "http://localhost:5173"
+
+
+def admission_middleware() -> AdmissionMiddleware:
+    layer = app.middleware_stack
+    while not isinstance(layer, AdmissionMiddleware):
+        layer = layer.app
+    return layer
+
+
+@pytest.fixture
+def limiter():
+    limiter = RouteLimiter("test", concurrency=1, queue_size=10, max_wait=5.0)
+    yield limiter
+    admission_metrics.pop("test", None)
+
+
+def test_shed_response_carries_cors_headers(client, auth_headers):
+    client.get("/health")  # builds the middleware stack
+    limiter = admission_middleware().limiters["read"]
+    saved = limiter.active, limiter.queue_size
+    limiter.active, limiter.queue_size = limiter.concurrency, 0  # full, nowhere to wait
+    try:
+        response = client.get("/api/v1/checkins", headers={**auth_headers, "Origin": ORIGIN})
+    finally:
+        limiter.active, limiter.queue_size = saved
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert response.headers["Access-Control-Allow-Origin"] == ORIGIN
+
+
+def test_slot_handed_to_cancelled_waiter_is_not_lost(limiter):
+    async def scenario():
+        await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.queued == 1
+
+        limiter.release(0.01)  # hands the slot to the waiting request...
+        waiting.cancel()       # ...which is cancelled before it runs again
+        with suppress(asyncio.CancelledError):
+            await waiting
+        if not waiting.cancelled():
+            limiter.release(0.01)  # it was served after all (asyncio.wait_for before 3.12)
+
+        assert limiter.active == 0
+        assert limiter.queued == 0
+        await asyncio.wait_for(limiter.acquire(), 0.1)
+
+    asyncio.run(scenario())
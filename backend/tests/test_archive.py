@@ -0,0 +1,60 @@
+"""Archiving closed months of check-ins and moods."""
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert, select
+from app.core.config import settings
+from app.db.archive import archive_month, archived_checkins, export_rows, read_segment, segment_path
+from app.db.partitions import add_months, month_start
+from app.models import Checkin, Mood, User
+
+
+@pytest.fixture(autouse=True)
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path))
+
+
+@pytest.fixture
+def months() -> tuple:
+    month = add_months(month_start(datetime.utcnow().date()), -3)
+    return month, add_months(month, 1)
+
+
+def test_mood_of_a_live_checkin_stays_until_that_checkin_is_archived(db, user_id, months):
+    month, next_month = months
+    midnight = datetime.combine(next_month, datetime.min.time())
+    mood_ids = {"mid-month": uuid.uuid4(), "before midnight": uuid.uuid4()}
+    checkin_ids = {"mid-month": uuid.uuid4(), "after midnight": uuid.uuid4()}
+    db.execute(insert(Mood), [
+        {"id": mood_ids["mid-month"], "user_id": user_id, "mood_level": 3,
+         "created_at": midnight - timedelta(days=15)},
+        {"id": mood_ids["before midnight"], "user_id": user_id, "mood_level": 5,
+         "created_at": midnight - timedelta(microseconds=5)},
+    ])
+    db.execute(insert(Checkin), [
+        {"id": checkin_ids["mid-month"], "user_id": user_id, "status": "checked_in",
+         "timestamp": midnight - timedelta(days=15), "mood_id": mood_ids["mid-month"]},
+        {"id": checkin_ids["after midnight"], "user_id": user_id, "status": "checked_in",
+         "timestamp": midnight + timedelta(microseconds=5), "mood_id": mood_ids["before midnight"]},
+    ])
+    db.commit()
+
+    assert archive_month(db, month) == {"checkins": 1, "moods": 1}
+    db.commit()
+    live = db.execute(select(Checkin.mood_id).where(Checkin.id == checkin_ids["after midnight"])).scalar()
+    assert live == mood_ids["before midnight"]
+    assert db.get(Mood, mood_ids["before midnight"]) is not None
+
+    assert archive_month(db, next_month) == {"checkins": 1, "moods": 1}
+    db.commit()
+    assert db.scalar(select(Mood.id)) is None
+    # The mood went to the segment of the month it was created in
+    [archived_moods] = read_segment("moods", segment_path("moods", month)).values()
+    assert {mood["id"] for mood in archived_moods} == set(mood_ids.values())
+
+    checkins = archived_checkins(user_id, limit=10)
+    assert [checkin.id for checkin in checkins] == [checkin_ids["after midnight"], checkin_ids["mid-month"]]
+    assert [checkin.mood.mood_level for checkin in checkins] == [5, 3]
+    user = db.get(User, user_id)
+    assert [row[0] for row in export_rows(user, ["mood_level"])] == [3, 5]
+    assert [row[0] for row in export_rows(user, ["mood_level"], start=next_month)] == [5]
@@ -0,0 +1,94 @@
+"""Login and token decoding."""
+import hashlib
+import time
+from datetime import timedelta
+from passlib.hash import bcrypt
+from sqlalchemy import select, update
+from app.core.hashing import password_hasher
+from app.core.security import create_access_token, decode_token, token_cache
+from app.db.session import engine
+from app.models import User
+
+PASSWORD = "correct horse battery staple"
+
+
+def test_inactive_user_is_refused_without_rehashing(client, db, user_id):
+    outdated = bcrypt.using(rounds=4).hash(PASSWORD)  # flagged for rehash at BCRYPT_ROUNDS
+    db.execute(update(User).where(User.id == user_id).values(hashed_password=outdated, is_active=False))
+    db.commit()
+    email = db.scalar(select(User.email).where(User.id == user_id))
+
+    response = client.post("/api/v1/auth/login", json={"email": email, "password": PASSWORD})
+
+    assert response.status_code == 403
+    db.expire_all()
+    assert db.scalar(select(User.hashed_password).where(User.id == user_id)) == outdated
+
+
+def test_active_user_is_rehashed(client, db, user_id):
+    outdated = bcrypt.using(rounds=4).hash(PASSWORD)
+    db.execute(update(User).where(User.id == user_id).values(hashed_password=outdated))
+    db.commit()
+    email = db.scalar(select(User.email).where(User.id == user_id))
+
+    response = client.post("/api/v1/auth/login", json={"email": email, "password": PASSWORD})
+
+    assert response.status_code == 200
+    db.expire_all()
+    assert db.scalar(select(User.hashed_password).where(User.id == user_id)) != outdated
+
+
+def test_no_connection_held_while_hashing(client, db, user_id, monkeypatch):
+    hashed = bcrypt.using(rounds=4).hash(PASSWORD)
+    db.execute(update(User).where(User.id == user_id).values(hashed_password=hashed))
+    db.commit()
+    email = db.scalar(select(User.email).where(User.id == user_id))
+    db.close()
+    checked_out = []
+    verify_and_update = password_hasher.verify_and_update
+
+    async def verify_and_count(*args):
+        checked_out.append(engine.pool.checkedout())
+        return await verify_and_update(*args)
+
+    monkeypatch.setattr(password_hasher, "verify_and_update", verify_and_count)
+
+    response = client.post("/api/v1/auth/login", json={"email": email, "password": PASSWORD})
+
+    assert response.status_code == 200
+    assert checked_out == [0]
+
+
+def shift_clock(monkeypatch, seconds: float, monotonic: bool = False) -> None:
+    """Move the wall clock (token expiry) and, with ``monotonic``, the caches' clock."""
+    wall = time.time
+    monkeypatch.setattr(time, "time", lambda: wall() + seconds)
+    if monotonic:
+        steady = time.monotonic
+        monkeypatch.setattr(time, "monotonic", lambda: steady() + seconds)
+
+
+def cache_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def test_expired_token_is_rejected_on_a_cache_hit(monkeypatch):
+    token = create_access_token({"sub": "user"}, expires_delta=timedelta(seconds=30))
+    assert decode_token(token)["sub"] == "user"
+
+    # The cache entry is still there, only the token has expired
+    shift_clock(monkeypatch, 31)
+    assert token_cache.get(cache_key(token)) is not None
+
+    assert decode_token(token) is None
+    assert token_cache.get(cache_key(token)) is None
+
+
+def test_cache_entry_never_outlives_the_token(monkeypatch):
+    token = create_access_token({"sub": "user"}, expires_delta=timedelta(seconds=30))
+    decode_token(token)
+
+    shift_clock(monkeypatch, 31, monotonic=True)
+
+    assert token_cache.get(cache_key(token)) is None
+    assert decode_token(token) is None
@@ -0,0 +1,78 @@
+"""Parsing and check-out pairing of bulk ingested (possibly replayed) events."""
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from app.crud.checkin import crud_checkin
+from app.models import Checkin
+from app.schemas.checkin import CheckinEvent
+from app.utils.ingest import iter_records
+
+DAY = datetime.combine(datetime.utcnow().date() - timedelta(days=1), datetime.min.time())
+
+
+def event(user_id, status: str, hour: int) -> CheckinEvent:
+    return CheckinEvent(user_id=user_id, status=status, timestamp=DAY + timedelta(hours=hour))
+
+
+def parse(body: bytes, fmt: str = "csv", chunk_size: int = 7) -> list:
+    async def chunks():
+        for i in range(0, len(body), chunk_size):
+            yield body[i:i + chunk_size]
+
+    async def collect():
+        return [item async for item in iter_records(chunks(), fmt)]
+
+    return asyncio.run(collect())
+
+
+def durations(db, user_id) -> dict:
+    rows = db.execute(
+        select(Checkin.timestamp, Checkin.duration_minutes).where(
+            Checkin.user_id == user_id, Checkin.status == "checked_out"
+        )
+    ).all()
+    return {timestamp.hour: duration for timestamp, duration in rows}
+
+
+def test_checkout_paired_with_checkin_of_same_batch(db, user_id):
+    crud_checkin.bulk_create(db, [
+        (2, event(user_id, "checked_out", 17)),
+        (1, event(user_id, "checked_in", 9)),
+    ])
+
+    assert durations(db, user_id) == {17: 8 * 60}
+
+
+def test_replayed_older_checkout_keeps_open_checkin(db, user_id):
+    crud_checkin.bulk_create(db, [(1, event(user_id, "checked_in", 10))])
+
+    # A check-out from before the open check-in arrives late, with the real one
+    crud_checkin.bulk_create(db, [
+        (1, event(user_id, "checked_out", 9)),
+        (2, event(user_id, "checked_out", 17)),
+    ])
+
+    assert durations(db, user_id) == {9: None, 17: 7 * 60}
+
+
+def test_csv_quoted_field_spans_lines_and_chunks():
+    body = (
+        b'user_id,status,notes\n'
+        b'u1,checked_in,"front desk, ""east""\r\nbadge replaced"\n'
+        b'\n'
+        b'u2,checked_out,\n'
+        b'u3,checked_in\n'
+    )
+
+    assert parse(body) == [
+        (2, {"user_id": "u1", "status": "checked_in", "notes": 'front desk, "east"\r\nbadge replaced'}, None),
+        (5, {"user_id": "u2", "status": "checked_out"}, None),
+        (6, None, "Expected 3 columns, got 2"),
+    ]
+
+
+def test_csv_unterminated_quote_is_reported_at_its_first_line():
+    assert parse(b'user_id,notes\nu1,ok\nu2,"never closed\nu3,x\n') == [
+        (2, {"user_id": "u1", "notes": "ok"}, None),
+        (3, None, "Unterminated quoted field"),
+    ]
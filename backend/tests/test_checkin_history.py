@@ -0,0 +1,48 @@
+"""History pages across the HISTORY_WINDOW boundary."""
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert
+from app.crud.checkin import HISTORY_WINDOW, crud_checkin
+from app.models import Checkin
+
+
+@pytest.fixture
+def history(db, user_id) -> list[uuid.UUID]:
+    """Ids of three recent and three older check-ins, newest first."""
+    now = datetime.utcnow().replace(microsecond=0)
+    timestamps = [now - timedelta(days=days) for days in (1, 2, 3)]
+    timestamps += [now - HISTORY_WINDOW - timedelta(days=days) for days in (1, 2, 3)]
+    rows = [
+        {"id": uuid.uuid4(), "user_id": user_id, "status": "checked_in", "timestamp": timestamp}
+        for timestamp in timestamps
+    ]
+    db.execute(insert(Checkin), rows)
+    db.commit()
+    return [row["id"] for row in rows]
+
+
+@pytest.mark.parametrize("skip", range(7))
+@pytest.mark.parametrize("limit", (1, 2, 4))
+def test_skip_pages_span_the_window(db, user_id, history, skip, limit):
+    page = crud_checkin.get_user_checkins(db, user_id, skip=skip, limit=limit, options=())
+
+    assert [checkin.id for checkin in page] == history[skip:skip + limit]
+
+
+def test_cursor_pages_span_the_window(db, user_id, history):
+    seen, cursor = [], None
+    while True:
+        page = crud_checkin.get_user_checkins(db, user_id, limit=2, cursor=cursor, options=())
+        if not page:
+            break
+        seen += [checkin.id for checkin in page]
+        cursor = (page[-1].timestamp, page[-1].id)
+
+    assert seen == history
+
+
+def test_get_by_id_finds_recent_and_older_checkins(db, history):
+    for checkin_id in (history[0], history[-1]):
+        assert crud_checkin.get_by_id(db, checkin_id, options=()).id == checkin_id
+    assert crud_checkin.get_by_id(db, uuid.uuid4(), options=()) is None
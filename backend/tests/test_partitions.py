@@ -0,0 +1,27 @@
+"""Scheduled partition maintenance."""
+import asyncio
+from contextlib import suppress
+from app.db.partitions import maintain_partitions, maintain_periodically
+from app.db.session import SessionLocal
+
+
+def test_nothing_to_do_without_partitioning():
+    assert maintain_partitions(SessionLocal, months_ahead=3) == []
+
+
+def test_periodic_maintenance_survives_errors():
+    calls = []
+
+    def broken_session():
+        calls.append(1)
+        raise RuntimeError("database is down")
+
+    async def scenario():
+        task = asyncio.create_task(maintain_periodically(broken_session, 3, interval=0.01))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert len(calls) > 1
@@ -0,0 +1,100 @@
+"""Read replica routing, with a second SQLite file standing in for the replica."""
+import time
+import uuid
+import pytest
+from sqlalchemy import create_engine, insert, select
+from app.api import deps
+from app.db import replicas as replicas_module
+from app.db.replicas import Replica, ReplicaSet
+from app.db.session import SessionLocal
+from app.models import Base, Goal, User
+
+
+@pytest.fixture
+def replica_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'replica.sqlite'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def replica_set(replica_engine, monkeypatch) -> ReplicaSet:
+    """One checked, healthy replica, used by the API's read-only endpoints."""
+    replica_set = ReplicaSet([Replica("replica1", replica_engine)], max_lag=5.0, check_interval=5.0)
+    replica_set.check()
+    monkeypatch.setattr(deps, "replicas", replica_set)
+    return replica_set
+
+
+def add_goal(engine, user_id, title: str) -> None:
+    """A goal, and its user where missing, in one database only."""
+    with engine.begin() as connection:
+        if connection.scalar(select(User.id).where(User.id == user_id)) is None:
+            connection.execute(insert(User), [{
+                "id": user_id, "email": f"{user_id.hex}@example.com", "hashed_password": "x",
+            }])
+        connection.execute(insert(Goal), [{"id": uuid.uuid4(), "user_id": user_id, "title": title}])
+
+
+def goal_titles(client, auth_headers) -> list[str]:
+    return [goal["title"] for goal in client.get("/api/v1/goals", headers=auth_headers).json()]
+
+
+def test_reads_go_to_the_replica(client, database, user_id, auth_headers, replica_engine, replica_set):
+    add_goal(database, user_id, "on the primary")
+    add_goal(replica_engine, user_id, "on the replica")
+
+    assert goal_titles(client, auth_headers) == ["on the replica"]
+
+
+def test_reads_after_a_write_stay_on_the_primary(
+    client, database, user_id, auth_headers, replica_engine, replica_set
+):
+    add_goal(replica_engine, user_id, "on the replica")
+
+    response = client.post("/api/v1/goals", json={"title": "just written"}, headers=auth_headers)
+    assert response.status_code == 201
+
+    # The writer is pinned to the primary, for the next requests as well
+    assert goal_titles(client, auth_headers) == ["just written"]
+
+
+def test_session_reads_its_own_writes(database, user_id, replica_engine, replica_set):
+    with SessionLocal() as db:
+        db.info["replica"] = replica_set.replicas[0].bind_for(db)
+        assert db.scalars(select(Goal.title)).all() == []  # the replica is empty
+        db.add(Goal(user_id=user_id, title="just written"))
+        db.flush()
+
+        assert db.scalars(select(Goal.title)).all() == ["just written"]
+
+
+def test_lagging_replica_is_skipped(client, database, user_id, auth_headers, replica_engine,
+                                    replica_set, monkeypatch):
+    add_goal(database, user_id, "on the primary")
+    add_goal(replica_engine, user_id, "on the replica")
+    monkeypatch.setattr(replicas_module, "DEFAULT_LAG_QUERY", "SELECT 60")
+    replica_set.check()
+
+    assert replica_set.replicas[0].lag == 60
+    assert goal_titles(client, auth_headers) == ["on the primary"]
+
+
+def test_unreachable_replica_is_skipped(client, database, user_id, auth_headers, tmp_path, monkeypatch):
+    add_goal(database, user_id, "on the primary")
+    down = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.sqlite'}")
+    replica_set = ReplicaSet([Replica("replica1", down)], max_lag=5.0, check_interval=5.0)
+    replica_set.check()
+    monkeypatch.setattr(deps, "replicas", replica_set)
+
+    assert not replica_set.replicas[0].healthy
+    assert goal_titles(client, auth_headers) == ["on the primary"]
+
+
+def test_stale_health_check_is_not_trusted(replica_set):
+    assert replica_set.choose() is replica_set.replicas[0]
+
+    replica_set.replicas[0].checked_at = time.monotonic() - 4 * replica_set.check_interval
+
+    assert replica_set.choose() is None
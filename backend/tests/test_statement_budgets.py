@@ -0,0 +1,86 @@
+"""Statements per request of the list endpoints.
+
+One user has a full page of check-ins (each with its own mood), moods,
+goals and a team. A request over its budget is what an N+1 regression
+looks like: a relationship that is no longer loaded with the page is then
+lazy-loaded once per row while the response is serialized.
+
+Counts are taken after a warm-up request, so the current user comes from
+the user cache. Budgets do not depend on the page size.
+"""
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert
+from app.models import Checkin, Goal, Mood, Team, TeamMember
+
+ROWS = 100
+
+# (path, statement budget); {checkin_id} and {team_id} are filled in
+BUDGETS = (
+    ("/api/v1/checkins?limit=100", 3),          # recent page + older history + moods by id
+    ("/api/v1/checkins/moods?limit=100", 1),
+    ("/api/v1/checkins/today", 3),              # rollup + latest check-in + moods
+    ("/api/v1/checkins/{checkin_id}", 1),       # row joined with its mood
+    ("/api/v1/goals?limit=100", 1),
+    ("/api/v1/teams", 1),
+    ("/api/v1/teams/{team_id}", 3),             # team + membership + members
+)
+
+
+@pytest.fixture
+def seeded(db, user_id) -> dict:
+    """``ROWS`` check-ins, moods and goals of the user, who owns one team."""
+    now = datetime.utcnow().replace(microsecond=0)
+    team_id = uuid.uuid4()
+    checkins, moods, goals = [], [], []
+    for i in range(ROWS):
+        timestamp = now - timedelta(minutes=10 * i)
+        mood_id = uuid.uuid4()
+        moods.append({
+            "id": mood_id,
+            "user_id": user_id,
+            "mood_level": 1 + i % 5,
+            "created_at": timestamp,
+        })
+        checkins.append({
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "status": "checked_in" if i % 2 else "checked_out",
+            "timestamp": timestamp,
+            "mood_id": mood_id,
+        })
+        goals.append({
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "title": f"Goal {i}",
+            "created_at": timestamp,
+        })
+    db.execute(insert(Mood), moods)
+    db.execute(insert(Checkin), checkins)
+    db.execute(insert(Goal), goals)
+    db.execute(insert(Team), [{
+        "id": team_id,
+        "name": "Budgets",
+        "code": "BUDGET",
+        "created_by": user_id,
+    }])
+    db.execute(insert(TeamMember), [{
+        "id": uuid.uuid4(),
+        "team_id": team_id,
+        "user_id": user_id,
+        "role": "owner",
+    }])
+    db.commit()
+    return {"team_id": team_id, "checkin_id": checkins[0]["id"]}
+
+
+@pytest.mark.parametrize("path, budget", BUDGETS, ids=[path for path, _ in BUDGETS])
+def test_statement_budget(client, auth_headers, seeded, count_statements, path, budget):
+    client.get("/api/v1/users/me", headers=auth_headers)  # warm the user cache
+
+    with count_statements() as count:
+        response = client.get(path.format(**seeded), headers=auth_headers)
+
+    assert response.status_code == 200
+    assert count.statements <= budget
@@ -0,0 +1,32 @@
+"""Team analytics from the daily rollup."""
+from datetime import date, timedelta
+from sqlalchemy import insert
+from app.crud.analytics import crud_analytics
+from app.crud.team import crud_team
+from app.models import DailyUserStats
+
+MONDAY = date(2024, 1, 1)
+
+
+def test_weekend_work_counts_in_days_worked_not_in_attendance(db, user_id):
+    team = crud_team.create(db, name="Analytics", created_by=user_id)
+    # Every day of the first week, none in the second
+    db.execute(insert(DailyUserStats), [
+        {"user_id": user_id, "day": MONDAY + timedelta(days=offset), "checkin_count": 1, "worked_minutes": 60}
+        for offset in range(7)
+    ])
+    db.commit()
+
+    analytics = crud_analytics.get_team_analytics(
+        db, team.id, MONDAY, MONDAY + timedelta(days=13), granularity="week"
+    )
+
+    [member] = analytics["members"]
+    assert member["days_worked"] == 7
+    assert member["attendance_rate"] == 5 / 10
+    [period] = member["periods"]  # the week without activity is left out
+    assert period["period_start"] == MONDAY
+    assert period["days_worked"] == 7
+    assert period["attendance_rate"] == 1.0
+    [team_period] = analytics["periods"]
+    assert team_period["attendance_rate"] == 1.0
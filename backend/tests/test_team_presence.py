@@ -0,0 +1,54 @@
+"""Team roster and live presence."""
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import insert, update
+from app.crud.checkin import HISTORY_WINDOW
+from app.crud.team import crud_team
+from app.models import Checkin, TeamMember, User
+
+
+def test_roster_shows_latest_recent_checkin(db, user_id):
+    team = crud_team.create(db, name="Roster", created_by=user_id)  # the owner is a member
+    now = datetime.utcnow().replace(microsecond=0)
+    db.execute(insert(Checkin), [
+        {"id": uuid.uuid4(), "user_id": user_id, "status": "checked_in",
+         "timestamp": now - HISTORY_WINDOW - timedelta(days=1), "location_name": "Old office"},
+        {"id": uuid.uuid4(), "user_id": user_id, "status": "checked_in",
+         "timestamp": now - timedelta(days=1), "location_name": "Office"},
+    ])
+    db.commit()
+
+    [member] = crud_team.get_team_presence(db, team.id)
+
+    assert member["last_checkin_at"] == now - timedelta(days=1)
+    assert member["location_name"] == "Office"
+
+
+def test_roster_leaves_out_checkins_older_than_the_window(db, user_id):
+    team = crud_team.create(db, name="Roster", created_by=user_id)  # the owner is a member
+    db.execute(insert(Checkin), [{
+        "id": uuid.uuid4(), "user_id": user_id, "status": "checked_in",
+        "timestamp": datetime.utcnow() - HISTORY_WINDOW - timedelta(days=1),
+    }])
+    db.commit()
+
+    [member] = crud_team.get_team_presence(db, team.id)
+
+    assert member["last_checkin_at"] is None
+    assert member["location_name"] is None
+
+
+def test_roster_tolerates_missing_profile_fields(client, db, user_id, auth_headers):
+    team = crud_team.create(db, name="Roster", created_by=user_id)
+    other_id = uuid.uuid4()
+    db.execute(insert(User), [{"id": other_id, "email": "other@example.com", "hashed_password": "x"}])
+    db.execute(update(User).where(User.id == other_id).values(timezone=None, is_active=None))
+    db.execute(insert(TeamMember), [{"id": uuid.uuid4(), "team_id": team.id, "user_id": other_id}])
+    db.commit()
+
+    response = client.get(f"/api/v1/teams/{team.id}/members", headers=auth_headers)
+
+    assert response.status_code == 200
+    [other] = [member for member in response.json() if member["user_id"] == str(other_id)]
+    assert other["timezone"] is None
+    assert other["is_active"] is None
@@ -0,0 +1,24 @@
+"""The per-worker user cache behind get_current_user."""
+from app.core.cache import user_cache
+from app.crud.user import crud_user
+from app.models import User
+
+
+def test_update_is_visible_on_the_next_request(client, db, user_id, auth_headers):
+    assert client.get("/api/v1/users/me", headers=auth_headers).json()["full_name"] == "Test User"
+    assert user_cache.get(user_id) is not None
+
+    crud_user.update(db, db.get(User, user_id), full_name="Renamed")
+
+    assert client.get("/api/v1/users/me", headers=auth_headers).json()["full_name"] == "Renamed"
+
+
+def test_deactivated_user_is_refused_right_away(client, db, user_id, auth_headers):
+    assert client.get("/api/v1/users/me", headers=auth_headers).status_code == 200
+
+    crud_user.update(db, db.get(User, user_id), is_active=False)
+
+    # Within the cache TTL: the inactive-account rejection, not the cached user
+    response = client.get("/api/v1/users/me", headers=auth_headers)
+    assert response.status_code == 403
+    assert response.json()["detail"] == "User account is inactive"
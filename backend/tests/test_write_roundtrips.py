@@ -0,0 +1,48 @@
+"""Database round trips of the check-in/check-out write path.
+
+Budgets:
+
+- check-in:  mood INSERT, check-in INSERT ... RETURNING, presence upsert,
+  daily rollup upsert
+- check-out: the same, plus the presence read for the open check-in
+
+and exactly one commit each. Any refresh or lazy load sneaking back into
+the path shows up as an extra statement.
+"""
+import pytest
+from app.crud.checkin import crud_checkin
+from app.db.session import SessionLocal
+from app.schemas.checkin import MoodCreate
+
+# (label, writes before the counted one, counted write, statement budget)
+CASES = (
+    ("check-in", (), lambda db, user_id: crud_checkin.create_checkin(
+        db, user_id, location_name="Office"
+    ), 3),
+    ("check-in + mood", (), lambda db, user_id: crud_checkin.create_checkin(
+        db, user_id, location_name="Office", mood=MoodCreate(mood_level=4, emotion="focused")
+    ), 4),
+    ("check-out", ("check-in",), lambda db, user_id: crud_checkin.create_checkout(db, user_id), 4),
+    ("check-out + mood", ("check-in",), lambda db, user_id: crud_checkin.create_checkout(
+        db, user_id, mood=MoodCreate(mood_level=3)
+    ), 5),
+)
+WRITES = {label: write for label, _, write, _ in CASES}
+
+
+@pytest.mark.parametrize(
+    "before, write, budget", [case[1:] for case in CASES], ids=[case[0] for case in CASES]
+)
+def test_write_round_trips(user_id, count_statements, before, write, budget):
+    for label in before:
+        with SessionLocal() as db:
+            WRITES[label](db, user_id)
+
+    with SessionLocal() as db, count_statements() as count:
+        checkin = write(db, user_id)
+        # Reading the response fields must not hit the database again
+        checkin.mood, checkin.created_at, checkin.updated_at
+
+    assert count.statements <= budget
+    assert count.commits == 1
+    assert checkin.mood is None or checkin.mood_id == checkin.mood.id
@@ -39,6 +39,9 @@ if not exist "venv" (
     call venv\Scripts\activate.bat
 )
 
+echo Applying database migrations...
+alembic upgrade head
+
 echo OK - Starting FastAPI server on http://localhost:8000
 start cmd /k "python -m uvicorn app.main:app --reload --host 0.0.0.0 --port 8000"
 
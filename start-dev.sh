@@ -37,6 +37,9 @@ else
     source venv/bin/activate
 fi
 
+echo "Applying database migrations..."
+alembic upgrade head
+
 echo "✓ Starting FastAPI server on http://localhost:8000"
 python -m uvicorn app.main:app --reload --host 0.0.0.0 --port 8000 &
 BACKEND_PID=$!